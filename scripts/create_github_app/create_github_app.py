@@ -15,13 +15,13 @@ import time
 import webbrowser
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Protocol
+from typing import TYPE_CHECKING, Any, Protocol
 
-import requests
-import uvicorn
-from fastapi import FastAPI
-from fastapi.responses import HTMLResponse, JSONResponse
-from github import Auth, GithubIntegration
+# FastAPI, uvicorn, PyGithub and requests are imported in the functions that
+# use them, so --help, argument errors and --dry-run return without loading them.
+if TYPE_CHECKING:
+    import uvicorn
+    from fastapi import FastAPI
 
 SCRIPT_DIR = Path(__file__).parent
 
@@ -147,8 +147,11 @@ class CodeHolder:
     installation_url: str | None = None
 
 
-def create_callback_app() -> tuple[FastAPI, CodeHolder]:
+def create_callback_app() -> tuple["FastAPI", CodeHolder]:
     """Create a FastAPI app with /callback and /installation-url endpoints."""
+    from fastapi import FastAPI
+    from fastapi.responses import HTMLResponse, JSONResponse
+
     app = FastAPI()
     code_holder = CodeHolder()
 
@@ -211,13 +214,15 @@ setTimeout(checkInstallUrl, 500);
 class ServerHandle:
     """Handle for managing a running uvicorn server."""
 
-    def __init__(self, server: uvicorn.Server, thread: threading.Thread):
+    def __init__(self, server: "uvicorn.Server", thread: threading.Thread):
         self.server = server
         self.thread = thread
 
 
 def start_callback_server(port: int = 80) -> tuple[ServerHandle, CodeHolder]:
     """Start the callback server in a background thread."""
+    import uvicorn
+
     app, code_holder = create_callback_app()
     config = uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning")
     server = uvicorn.Server(config)
@@ -236,6 +241,8 @@ def stop_callback_server(handle: ServerHandle) -> None:
 
 def exchange_code_for_credentials(code: str) -> dict:
     """Exchange the temporary code for app credentials."""
+    import requests
+
     response = requests.post(
         f"https://api.github.com/app-manifests/{code}/conversions",
         headers={"Accept": "application/vnd.github+json"},
@@ -251,6 +258,8 @@ def wait_for_app_installation(
     poll_interval: float = 5.0,
 ) -> bool:
     """Poll GitHub API until the app has at least one installation or timeout."""
+    from github import Auth, GithubIntegration
+
     try:
         auth = Auth.AppAuth(app_id, private_key)
         gi = GithubIntegration(auth=auth)
@@ -6,6 +6,7 @@
 """Unit tests for create_github_app.py."""
 
 import os
+import subprocess
 import sys
 import threading
 import time
@@ -119,7 +120,7 @@ def mock_main_dependencies(response_data: dict, code: str = "test-code", install
     with patch("create_github_app.start_callback_server", return_value=(server_handle, code_holder)) as mock_start:
         with patch("create_github_app.open_manifest_in_browser") as mock_browser:
             with patch("create_github_app.stop_callback_server") as mock_stop:
-                with patch("create_github_app.requests.post", return_value=mock_response) as mock_post:
+                with patch("requests.post", return_value=mock_response) as mock_post:
                     with patch("create_github_app.wait_for_app_installation", return_value=installation_found) as mock_wait:
                         with patch("create_github_app.webbrowser.open") as mock_wb:
                             yield {
@@ -330,7 +331,7 @@ class TestExchangeCodeForCredentials:
         mock_response.json.return_value = {"id": 123, "client_secret": "secret"}
         mock_response.raise_for_status = MagicMock()
 
-        with patch("create_github_app.requests.post", return_value=mock_response) as mock_post:
+        with patch("requests.post", return_value=mock_response) as mock_post:
             exchange_code_for_credentials("test-code")
             mock_post.assert_called_once_with(
                 "https://api.github.com/app-manifests/test-code/conversions",
@@ -350,7 +351,7 @@ class TestExchangeCodeForCredentials:
         mock_response.json.return_value = expected
         mock_response.raise_for_status = MagicMock()
 
-        with patch("create_github_app.requests.post", return_value=mock_response):
+        with patch("requests.post", return_value=mock_response):
             result = exchange_code_for_credentials("test-code")
             assert result == expected
 
@@ -418,6 +419,26 @@ class TestDryRun:
         assert "example.com" in captured.out
         assert "Would create" in captured.out
 
+    def test_dry_run_does_not_import_server_or_api_dependencies(self):
+        """Test that a dry run from the command line never loads FastAPI, uvicorn, PyGithub or requests.
+
+        TDD Rationale:
+        These imports take most of a cold start. A dry run only formats a
+        message, so it must not wait for them.
+        """
+        check = (
+            "import runpy, sys\n"
+            "sys.argv = ['create_github_app.py', '--dry-run', '--base-domain', 'example.com']\n"
+            "runpy.run_path(sys.argv[0], run_name='__main__')\n"
+            "print(sorted({'fastapi', 'uvicorn', 'github', 'requests'} & set(sys.modules)))\n"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", check], cwd=SCRIPT_DIR, capture_output=True, text=True, check=True
+        )
+
+        assert "Would create GitHub App" in result.stdout
+        assert result.stdout.splitlines()[-1] == "[]"
+
 
 class TestMainInteractiveFlow:
     """Tests for main() interactive flow using callback server and user's default browser."""
@@ -734,7 +755,7 @@ class TestMainWithCallbackServer:
         with patch("create_github_app.start_callback_server", side_effect=track_start_server):
             with patch("create_github_app.open_manifest_in_browser", side_effect=track_open_browser):
                 with patch("create_github_app.stop_callback_server"):
-                    with patch("create_github_app.requests.post", return_value=mock_response):
+                    with patch("requests.post", return_value=mock_response):
                         with patch("create_github_app.wait_for_app_installation", return_value=True):
                             with patch("create_github_app.webbrowser.open"):
                                 main(base_domain="example.com", dry_run=False, app_name="my-app")
@@ -776,7 +797,7 @@ class TestWaitForAppInstallation:
 
     def test_returns_false_when_github_authentication_fails(self, capsys):
         """Test that authentication errors are surfaced as warnings instead of crashing."""
-        with patch("create_github_app.Auth.AppAuth", side_effect=RuntimeError("bad auth")):
+        with patch("github.Auth.AppAuth", side_effect=RuntimeError("bad auth")):
             assert wait_for_app_installation(app_id=123, private_key="pem", timeout=1) is False
 
         captured = capsys.readouterr()
@@ -788,8 +809,8 @@ class TestWaitForAppInstallation:
         mock_integration = MagicMock()
         mock_integration.get_installations.side_effect = RuntimeError("api unavailable")
 
-        with patch("create_github_app.Auth.AppAuth"):
-            with patch("create_github_app.GithubIntegration", return_value=mock_integration):
+        with patch("github.Auth.AppAuth"):
+            with patch("github.GithubIntegration", return_value=mock_integration):
                 with patch("create_github_app.time.time", side_effect=[0, 0]):
                     with patch("create_github_app.time.sleep"):
                         assert wait_for_app_installation(app_id=123, private_key="pem", timeout=1) is False
@@ -9,8 +9,6 @@ import argparse
 import os
 from typing import Any
 
-import requests
-
 SLACK_MANIFEST_API = "https://slack.com/api/apps.manifest.create"
 
 
@@ -95,6 +93,9 @@ def build_app_manifest(
 
 
 def create_slack_app(manifest: dict[str, Any], token: str) -> dict:
+    # Imported here so --help, a missing token and --dry-run never load requests
+    import requests
+
     response = requests.post(
         SLACK_MANIFEST_API,
         headers={"Authorization": f"Bearer {token}"},
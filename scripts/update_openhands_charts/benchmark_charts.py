@@ -0,0 +1,328 @@
+#!/usr/bin/env -S uv run
+# /// script
+# requires-python = ">=3.12"
+# dependencies = ["ruamel.yaml", "requests"]
+# ///
+"""Benchmarks for the chart update engine on synthetic large charts.
+
+Each size copies the Chart.yaml and values.yaml of every chart under charts/
+and inflates them:
+
+- the openhands and runtime-api values.yaml get extra top-level sections
+  holding `keys` scalar keys in total;
+- their warmRuntimes.configs lists get `warm_runtimes` extra configs;
+- every Chart.yaml gets `dependencies` extra third-party dependencies.
+
+Runtime images in the copies use ghcr.io/openhands/runtime, the image the
+tag rules follow, so the values rewrites do real work.
+
+"realistic" is the charts as they are. The copies are timed with
+update_openhands_values, update_runtime_api_values, update_openhands_chart
+(all as dry runs) and a full dry-run process_updates against the local
+GitHub API stand-in, so no network is needed. Parse caches are cleared
+before every run, so each timing includes composing the YAML.
+
+    uv run scripts/update_openhands_charts/benchmark_charts.py --save baseline.json
+    uv run scripts/update_openhands_charts/benchmark_charts.py --compare baseline.json
+
+With --compare, a benchmark whose median is more than --threshold slower
+than in the baseline is reported as a regression and the exit status is 1.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import re
+import statistics
+import sys
+import tempfile
+import time
+from collections.abc import Callable, Iterator
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+import update_openhands_charts
+from chart_graph import clear_graph_cache
+from fake_github_api import FakeGitHubAPI
+from github_api import GitHubClient
+from yaml_paths import clear_document_cache
+
+CHARTS_DIR = Path(__file__).parent.parent.parent / "charts"
+DEFAULT_RUNS = 5
+DEFAULT_THRESHOLD = 0.25
+BASELINE_FORMAT = 1
+# The appVersion written into the synthetic openhands chart, older than any fixture tag
+SYNTHETIC_APP_VERSION = "cloud-1.0.0"
+KEYS_PER_SECTION = 50
+AGENT_SERVER_REPOSITORY = "ghcr.io/openhands/agent-server"
+
+
+@dataclass(frozen=True)
+class ChartSize:
+    """How much to inflate the real charts by."""
+
+    keys: int  # extra scalar keys in each of the openhands and runtime-api values.yaml
+    warm_runtimes: int  # extra warmRuntimes configs in each of them
+    dependencies: int  # extra third-party dependencies in every Chart.yaml
+
+
+SIZES = {
+    "realistic": ChartSize(keys=0, warm_runtimes=0, dependencies=0),
+    "large": ChartSize(keys=5_000, warm_runtimes=200, dependencies=50),
+    "huge": ChartSize(keys=50_000, warm_runtimes=2_000, dependencies=500),
+}
+
+
+@dataclass
+class BenchmarkResult:
+    """Wall times of one benchmark, in milliseconds."""
+
+    median_ms: float
+    min_ms: float
+    times_ms: list[float]
+
+
+def padding_sections(keys: int) -> str:
+    """Return top-level YAML sections holding `keys` scalar keys in total."""
+    lines = []
+    for section in range(0, keys, KEYS_PER_SECTION):
+        lines.append(f"benchmarkSection{section // KEYS_PER_SECTION}:")
+        for key in range(section, min(section + KEYS_PER_SECTION, keys)):
+            lines.append(f"  setting{key}: \"value-{key}\"  # synthetic")
+    return "".join(line + "\n" for line in lines)
+
+
+def add_warm_runtimes(content: str, count: int) -> str:
+    """Insert count extra configs at the top of the warmRuntimes.configs list."""
+    match = re.search(r"^( *)warmRuntimes:\n(?:\1 .*\n|\n)*?(\1 +)configs:\n", content, re.MULTILINE)
+    if not match or not count:
+        return content
+    indent = match.group(2) + "  "
+    configs = "".join(
+        f"{indent}- name: warm-{index}\n"
+        f"{indent}  image: \"ghcr.io/openhands/runtime:synthetic-{index}\"\n"
+        f"{indent}  working_dir: \"/workspace\"\n"
+        for index in range(count)
+    )
+    return content[:match.end()] + configs + content[match.end():]
+
+
+def add_dependencies(content: str, count: int) -> str:
+    """Insert count extra third-party dependencies at the top of the dependencies list."""
+    if not count:
+        return content
+    entries = "".join(
+        f"  - name: synthetic-{index}\n"
+        f"    version: {index % 20}.x.x\n"
+        f"    repository: https://charts.example.com/synthetic\n"
+        f"    condition: synthetic-{index}.enabled\n"
+        for index in range(count)
+    )
+    match = re.search(r"^dependencies:[ \t]*\n", content, re.MULTILINE)
+    if match is None:
+        return content.rstrip("\n") + "\ndependencies:\n" + entries
+    return content[:match.end()] + entries + content[match.end():]
+
+
+def generate_charts(directory: Path, size: ChartSize, source: Path = CHARTS_DIR) -> Path:
+    """Write inflated copies of every chart's Chart.yaml and values.yaml under directory/charts."""
+    charts_dir = directory / "charts"
+    for chart_yaml in sorted(source.glob("*/Chart.yaml")):
+        chart = chart_yaml.parent.name
+        (charts_dir / chart).mkdir(parents=True, exist_ok=True)
+        content = add_dependencies(chart_yaml.read_text(), size.dependencies)
+        if chart == "openhands":
+            content = re.sub(r"^appVersion: .*$", f"appVersion: {SYNTHETIC_APP_VERSION}", content, flags=re.MULTILINE)
+        (charts_dir / chart / "Chart.yaml").write_text(content)
+
+        values_path = chart_yaml.parent / "values.yaml"
+        if values_path.exists():
+            values = values_path.read_text()
+            if chart in ("openhands", "runtime-api"):
+                # The charts may pin agent-server runtimes, which the tag rules skip;
+                # point them at the runtime image so every size times the rewrite
+                values = values.replace(AGENT_SERVER_REPOSITORY, update_openhands_charts.RUNTIME_IMAGE_REPOSITORY)
+                values = add_warm_runtimes(values, size.warm_runtimes)
+                values = values.rstrip("\n") + "\n" + padding_sections(size.keys)
+            (charts_dir / chart / "values.yaml").write_text(values)
+    return charts_dir
+
+
+@contextlib.contextmanager
+def use_charts_dir(charts_dir: Path) -> Iterator[None]:
+    """Point the update script's chart paths at charts_dir for the duration of the block."""
+    paths = {
+        "CHARTS_DIR": charts_dir,
+        "CHART_PATH": charts_dir / "openhands" / "Chart.yaml",
+        "VALUES_PATH": charts_dir / "openhands" / "values.yaml",
+        "RUNTIME_API_CHART_PATH": charts_dir / "runtime-api" / "Chart.yaml",
+        "RUNTIME_API_VALUES_PATH": charts_dir / "runtime-api" / "values.yaml",
+    }
+    saved = {name: getattr(update_openhands_charts, name) for name in paths}
+    for name, path in paths.items():
+        setattr(update_openhands_charts, name, path)
+    try:
+        yield
+    finally:
+        for name, path in saved.items():
+            setattr(update_openhands_charts, name, path)
+
+
+def time_runs(func: Callable[[], object], runs: int) -> BenchmarkResult:
+    """Call func runs times with cold parse caches; return its wall times."""
+    times = []
+    for _ in range(runs):
+        clear_document_cache()
+        clear_graph_cache()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            func()
+        times.append((time.perf_counter() - start) * 1000)
+    return BenchmarkResult(round(statistics.median(times), 3), round(min(times), 3), [round(t, 3) for t in times])
+
+
+def benchmark_size(charts_dir: Path, runs: int, api_url: str) -> dict[str, BenchmarkResult]:
+    """Time every benchmark against the charts in charts_dir."""
+    module = update_openhands_charts
+    version, image_tag, runtime_api_sha = "cloud-1.30.0", "cloud-1.30.0-nikolaik", "c4b5a6978d8e9f0"
+    with use_charts_dir(charts_dir), GitHubClient("benchmark-token", base_url=api_url) as client:
+        return {
+            "update_openhands_values": time_runs(
+                lambda: module.update_openhands_values(module.VALUES_PATH, version, image_tag, dry_run=True), runs
+            ),
+            "update_runtime_api_values": time_runs(
+                lambda: module.update_runtime_api_values(
+                    module.RUNTIME_API_VALUES_PATH, runtime_api_sha, image_tag, dry_run=True
+                ),
+                runs,
+            ),
+            "update_openhands_chart": time_runs(
+                lambda: module.update_openhands_chart(module.CHART_PATH, version, "0.2.7", dry_run=True), runs
+            ),
+            "process_updates": time_runs(
+                lambda: module.process_updates(
+                    client, dry_run=True, env_cache=module.DeployEnvCache(directory=None)
+                ),
+                runs,
+            ),
+        }
+
+
+def run_benchmarks(sizes: dict[str, ChartSize], runs: int = DEFAULT_RUNS) -> dict[str, BenchmarkResult]:
+    """Run every benchmark for every size; keys are "<size>/<benchmark>"."""
+    results = {}
+    with tempfile.TemporaryDirectory() as directory, FakeGitHubAPI.from_fixture() as api:
+        for name, size in sizes.items():
+            charts_dir = generate_charts(Path(directory) / name, size)
+            for benchmark, result in benchmark_size(charts_dir, runs, api.url).items():
+                results[f"{name}/{benchmark}"] = result
+    return results
+
+
+def save_baseline(path: Path, results: dict[str, BenchmarkResult], runs: int) -> None:
+    baseline = {
+        "format": BASELINE_FORMAT,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "runs": runs,
+        "results": {name: asdict(result) for name, result in results.items()},
+    }
+    path.write_text(json.dumps(baseline, indent=2) + "\n")
+
+
+def load_baseline(path: Path) -> dict[str, BenchmarkResult]:
+    baseline = json.loads(path.read_text())
+    if baseline.get("format") != BASELINE_FORMAT:
+        raise ValueError(f"Unsupported baseline format in {path}: {baseline.get('format')!r}")
+    return {name: BenchmarkResult(**result) for name, result in baseline["results"].items()}
+
+
+def compare_results(
+    baseline: dict[str, BenchmarkResult],
+    current: dict[str, BenchmarkResult],
+    threshold: float = DEFAULT_THRESHOLD,
+) -> list[str]:
+    """Return the benchmarks whose median grew by more than threshold (0.25 = 25%)."""
+    return [
+        name
+        for name, result in current.items()
+        if name in baseline and result.median_ms > baseline[name].median_ms * (1 + threshold)
+    ]
+
+
+def print_results(
+    results: dict[str, BenchmarkResult],
+    baseline: dict[str, BenchmarkResult] | None = None,
+    regressions: list[str] | None = None,
+) -> None:
+    for name, result in results.items():
+        line = f"{name:<40} {result.median_ms:>10.1f}ms median {result.min_ms:>10.1f}ms min"
+        if baseline and name in baseline:
+            change = result.median_ms / baseline[name].median_ms - 1 if baseline[name].median_ms else 0.0
+            line += f"  {change:+.0%} vs baseline"
+            if name in (regressions or []):
+                line += "  REGRESSION"
+        print(line)
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Benchmark the chart update engine on synthetic large charts.")
+    parser.add_argument(
+        "--sizes",
+        default="realistic,large",
+        help=f"Comma-separated chart sizes to run, from {', '.join(SIZES)} (default: realistic,large).",
+    )
+    parser.add_argument(
+        "--runs",
+        type=int,
+        default=DEFAULT_RUNS,
+        help=f"Timed runs per benchmark (default: {DEFAULT_RUNS}).",
+    )
+    parser.add_argument(
+        "--save",
+        type=Path,
+        default=None,
+        metavar="FILE",
+        help="Write the results to FILE as a JSON baseline.",
+    )
+    parser.add_argument(
+        "--compare",
+        type=Path,
+        default=None,
+        metavar="FILE",
+        help="Compare the results with the JSON baseline in FILE and exit 1 on regressions.",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help=f"Slowdown of the median that counts as a regression (default: {DEFAULT_THRESHOLD}, i.e. 25%%).",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    names = [name.strip() for name in args.sizes.split(",") if name.strip()]
+    unknown = [name for name in names if name not in SIZES]
+    if unknown:
+        print(f"Error: unknown sizes: {', '.join(unknown)} (choose from {', '.join(SIZES)})")
+        sys.exit(2)
+
+    results = run_benchmarks({name: SIZES[name] for name in names}, args.runs)
+    baseline = load_baseline(args.compare) if args.compare else None
+    regressions = compare_results(baseline, results, args.threshold) if baseline else []
+    print_results(results, baseline, regressions)
+    if args.save:
+        save_baseline(args.save, results, args.runs)
+        print(f"Wrote baseline to {args.save}")
+    if regressions:
+        print(f"{len(regressions)} regressions over {args.threshold:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
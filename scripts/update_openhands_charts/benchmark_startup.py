@@ -0,0 +1,211 @@
+#!/usr/bin/env -S uv run
+# /// script
+# requires-python = ">=3.12"
+# dependencies = []
+# ///
+"""Cold-start benchmark for the update, GitHub-app and Slack-app CLIs.
+
+Each case runs one script in a fresh interpreter with -X importtime, the way
+a CI job or someone typing --help does, and records:
+
+- the wall time of the whole process;
+- the import time the interpreter reported, and the slowest top-level imports;
+- which heavy dependencies (requests, ruamel.yaml, FastAPI, uvicorn, PyGithub,
+  asyncio) were loaded.
+
+The cases are the paths that never need those dependencies: --help, an
+argument error and, for the app scripts, --dry-run. Each case is run once
+untimed first, so bytecode compilation is not counted.
+
+    uv run scripts/update_openhands_charts/benchmark_startup.py
+    uv run scripts/update_openhands_charts/benchmark_startup.py --check --python .venv/bin/python
+
+With --check, a case that loads a heavy dependency or exits with an
+unexpected status is reported and the exit status is 1. --python selects
+the interpreter, so the scripts can be measured with their dependencies
+installed; this script itself needs none.
+"""
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).parent.parent
+UPDATE_SCRIPT = SCRIPTS_DIR / "update_openhands_charts" / "update_openhands_charts.py"
+GITHUB_APP_SCRIPT = SCRIPTS_DIR / "create_github_app" / "create_github_app.py"
+SLACK_APP_SCRIPT = SCRIPTS_DIR / "create_slack_app" / "create_slack_app.py"
+DEFAULT_RUNS = 10
+SLOWEST_IMPORTS = 3
+# Packages none of the cases may load
+HEAVY_MODULES = ("requests", "ruamel.yaml", "fastapi", "uvicorn", "github", "asyncio")
+# "import time: <self us> | <cumulative us> | <two spaces per nesting level><module>"
+IMPORTTIME_PATTERN = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)")
+
+
+@dataclass(frozen=True)
+class StartupCase:
+    """One command line to start, and the exit status it should end with."""
+
+    name: str
+    script: Path
+    args: tuple[str, ...]
+    exit_code: int = 0
+
+
+CASES = [
+    StartupCase("update --help", UPDATE_SCRIPT, ("--help",)),
+    StartupCase("update argument error", UPDATE_SCRIPT, ("--jobs", "many"), exit_code=2),
+    StartupCase("github-app --help", GITHUB_APP_SCRIPT, ("--help",)),
+    StartupCase("github-app --dry-run", GITHUB_APP_SCRIPT, ("--dry-run", "--base-domain", "example.com")),
+    StartupCase("github-app argument error", GITHUB_APP_SCRIPT, (), exit_code=2),
+    StartupCase("slack-app --help", SLACK_APP_SCRIPT, ("--help",)),
+    StartupCase(
+        "slack-app --dry-run",
+        SLACK_APP_SCRIPT,
+        ("--base-domain", "example.com", "--slack-token", "xoxe-benchmark", "--dry-run"),
+    ),
+    StartupCase("slack-app missing token", SLACK_APP_SCRIPT, ("--base-domain", "example.com"), exit_code=1),
+]
+
+
+@dataclass(frozen=True)
+class ImportTime:
+    """One line of -X importtime output, times in microseconds."""
+
+    name: str
+    self_us: int
+    cumulative_us: int
+    depth: int  # 0 for modules imported directly by the script or interpreter startup
+
+
+@dataclass
+class StartupResult:
+    """Wall and import times of one case, in milliseconds."""
+
+    median_ms: float
+    min_ms: float
+    import_ms: float  # median of the summed top-level cumulative import times
+    slowest: list[tuple[str, float]]  # slowest top-level imports of the last run
+    heavy: list[str]  # heavy dependencies the case loaded
+    exit_code: int  # exit status of the last run
+
+
+def parse_importtime(stderr: str) -> list[ImportTime]:
+    """Return the import records in stderr, ignoring any other output."""
+    records = []
+    for line in stderr.splitlines():
+        match = IMPORTTIME_PATTERN.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            records.append(ImportTime(name, int(self_us), int(cumulative_us), len(indent) // 2))
+    return records
+
+
+def heavy_imports(records: list[ImportTime]) -> list[str]:
+    """Return the heavy dependencies that appear in records."""
+    names = {record.name for record in records}
+    return [
+        module for module in HEAVY_MODULES
+        if any(name == module or name.startswith(module + ".") for name in names)
+    ]
+
+
+def run_case(case: StartupCase, python: str) -> tuple[float, list[ImportTime], int]:
+    """Start the case once; return its wall time in ms, its imports and its exit status."""
+    env = {name: value for name, value in os.environ.items() if name != "SLACK_CONFIG_TOKEN"}
+    start = time.perf_counter()
+    completed = subprocess.run(
+        [python, "-X", "importtime", str(case.script), *case.args],
+        cwd=case.script.parent,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    wall_ms = (time.perf_counter() - start) * 1000
+    return wall_ms, parse_importtime(completed.stderr), completed.returncode
+
+
+def measure(case: StartupCase, runs: int = DEFAULT_RUNS, python: str = sys.executable) -> StartupResult:
+    """Run the case once untimed, then runs times; return the timings of the timed runs."""
+    run_case(case, python)
+    times = []
+    import_times = []
+    for _ in range(runs):
+        wall_ms, records, exit_code = run_case(case, python)
+        top_level = [record for record in records if record.depth == 0]
+        times.append(wall_ms)
+        import_times.append(sum(record.cumulative_us for record in top_level) / 1000)
+    slowest = sorted(top_level, key=lambda record: record.cumulative_us, reverse=True)[:SLOWEST_IMPORTS]
+    return StartupResult(
+        median_ms=round(statistics.median(times), 3),
+        min_ms=round(min(times), 3),
+        import_ms=round(statistics.median(import_times), 3),
+        slowest=[(record.name, round(record.cumulative_us / 1000, 3)) for record in slowest],
+        heavy=heavy_imports(records),
+        exit_code=exit_code,
+    )
+
+
+def check_results(cases: list[StartupCase], results: dict[str, StartupResult]) -> list[str]:
+    """Return a message for every case that loaded a heavy dependency or exited unexpectedly."""
+    problems = []
+    for case in cases:
+        result = results[case.name]
+        if result.heavy:
+            problems.append(f"{case.name} imported {', '.join(result.heavy)}")
+        if result.exit_code != case.exit_code:
+            problems.append(f"{case.name} exited with {result.exit_code}, expected {case.exit_code}")
+    return problems
+
+
+def print_results(results: dict[str, StartupResult]) -> None:
+    for name, result in results.items():
+        slowest = ", ".join(f"{module} {ms:.1f}ms" for module, ms in result.slowest)
+        line = f"{name:<28} {result.median_ms:>8.1f}ms median {result.import_ms:>8.1f}ms imports  ({slowest})"
+        if result.heavy:
+            line += f"  HEAVY: {', '.join(result.heavy)}"
+        print(line)
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Measure cold start of the update, GitHub-app and Slack-app CLIs.")
+    parser.add_argument(
+        "--runs",
+        type=int,
+        default=DEFAULT_RUNS,
+        help=f"Timed runs per case (default: {DEFAULT_RUNS})",
+    )
+    parser.add_argument(
+        "--python",
+        default=sys.executable,
+        help="Interpreter to start the scripts with (default: the one running this benchmark)",
+    )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Exit with status 1 if a case loads a heavy dependency or exits unexpectedly",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    results = {case.name: measure(case, args.runs, args.python) for case in CASES}
+    print_results(results)
+    if args.check:
+        problems = check_results(CASES, results)
+        for problem in problems:
+            print(f"Error: {problem}")
+        if problems:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
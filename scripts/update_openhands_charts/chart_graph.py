@@ -0,0 +1,87 @@
+"""Dependency graph of the charts under charts/.
+
+Built from the `dependencies` list of every Chart.yaml. An edge runs from a
+chart to each dependency that is itself one of the local charts, matched by
+the dependency's chart `name`; third-party charts such as postgresql are not
+part of the graph. The update script walks the charts in topological order,
+so a chart is visited after every chart it depends on and a version bump can
+be propagated to all dependents in one pass.
+
+Graphs are cached by a hash of the Chart.yaml contents they were built from.
+"""
+
+import hashlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from graphlib import CycleError, TopologicalSorter
+
+from yaml_paths import index_document
+
+GRAPH_CACHE_SIZE = 8
+
+
+class ChartGraphError(ValueError):
+    """Raised when the charts' dependencies form a cycle."""
+
+
+@dataclass(frozen=True)
+class ChartGraph:
+    """Local chart dependencies, keyed by chart directory name."""
+
+    dependencies: dict[str, tuple[str, ...]]  # chart -> local charts it depends on
+    order: tuple[str, ...]  # every chart, each after the charts it depends on
+
+    def dependents(self, chart: str) -> list[str]:
+        """Return the charts that depend directly on chart, in topological order."""
+        return [other for other in self.order if chart in self.dependencies[other]]
+
+    def affected(self, changed: set[str]) -> list[str]:
+        """Return the changed charts and every chart depending on them, in topological order."""
+        affected = set(changed)
+        for chart in self.order:
+            if affected.intersection(self.dependencies[chart]):
+                affected.add(chart)
+        return [chart for chart in self.order if chart in affected]
+
+
+_graphs: OrderedDict[str, ChartGraph] = OrderedDict()
+
+
+def clear_graph_cache() -> None:
+    """Forget every cached graph."""
+    _graphs.clear()
+
+
+def build_chart_graph(charts: dict[str, str]) -> ChartGraph:
+    """Build the graph of charts from their Chart.yaml contents, keyed by directory name.
+
+    Raises ChartGraphError if the dependencies form a cycle.
+    """
+    digest = hashlib.sha256()
+    for chart in sorted(charts):
+        digest.update(f"{chart}\0{charts[chart]}\0".encode())
+    key = digest.hexdigest()
+    graph = _graphs.get(key)
+    if graph is not None:
+        _graphs.move_to_end(key)
+        return graph
+
+    documents = {chart: index_document(content) for chart, content in sorted(charts.items())}
+    directories = {}
+    for chart, document in documents.items():
+        names = [span.value for span in document.find("name")]
+        directories[names[0] if names else chart] = chart
+    dependencies = {}
+    for chart, document in documents.items():
+        names = [span.value for span in document.find("dependencies[*].name")]
+        dependencies[chart] = tuple(sorted({directories[name] for name in names if name in directories}))
+
+    try:
+        order = tuple(TopologicalSorter(dependencies).static_order())
+    except CycleError as e:
+        raise ChartGraphError(f"Chart dependencies form a cycle: {' -> '.join(e.args[1])}") from None
+
+    graph = _graphs[key] = ChartGraph(dependencies, order)
+    if len(_graphs) > GRAPH_CACHE_SIZE:
+        _graphs.popitem(last=False)
+    return graph
@@ -0,0 +1,298 @@
+"""Semantic versions for cloud tags and chart versions.
+
+Versions follow semver 2.0: MAJOR.MINOR.PATCH with an optional pre-release
+(1.2.3-rc.1) and build metadata (1.2.3+abc). Ordering is semver precedence:
+a pre-release sorts before its release, pre-release identifiers compare
+numerically when numeric, and build metadata is ignored.
+
+Ranges use the constraint syntax of Helm's Chart.yaml dependencies:
+
+    15.x.x          any 15.*.* release (also 15, 15.x, 15.*)
+    ~1.2.3          >=1.2.3 <1.3.0
+    ^1.2.3          >=1.2.3 <2.0.0 (^0.2.3 is >=0.2.3 <0.3.0)
+    >=1.0.0 <2.0.0  every comparison must hold (commas work too)
+    1.x || 2.1.x    either side may match
+
+Parsed versions and ranges are cached, so sorting or filtering thousands of
+tags parses each distinct string once.
+"""
+
+import re
+from dataclasses import dataclass
+from functools import cached_property, lru_cache, total_ordering
+from typing import Iterable
+
+VERSION_PATTERN = re.compile(
+    r"^(\d+)\.(\d+)\.(\d+)"
+    r"(?:-([0-9A-Za-z-]+(?:\.[0-9A-Za-z-]+)*))?"
+    r"(?:\+([0-9A-Za-z-]+(?:\.[0-9A-Za-z-]+)*))?$"
+)
+PARTIAL_PATTERN = re.compile(
+    r"^v?(\d+|[xX*])(?:\.(\d+|[xX*]))?(?:\.(\d+|[xX*]))?"
+    r"(?:-([0-9A-Za-z-]+(?:\.[0-9A-Za-z-]+)*))?(?:\+[0-9A-Za-z.-]+)?$"
+)
+COMPARATOR_PATTERN = re.compile(r"(>=|<=|!=|=|>|<|~|\^)?\s*([^\s,]+)")
+WILDCARDS = ("x", "X", "*")
+PARSE_CACHE_SIZE = 8192
+
+
+@total_ordering
+@dataclass(frozen=True, eq=False)
+class Version:
+    """A semantic version; compares by semver precedence."""
+
+    major: int
+    minor: int
+    patch: int
+    prerelease: tuple[str, ...] = ()
+    build: tuple[str, ...] = ()
+
+    def __str__(self) -> str:
+        text = f"{self.major}.{self.minor}.{self.patch}"
+        if self.prerelease:
+            text += "-" + ".".join(self.prerelease)
+        if self.build:
+            text += "+" + ".".join(self.build)
+        return text
+
+    @cached_property
+    def key(self) -> tuple:
+        """Sort key implementing semver precedence."""
+        if not self.prerelease:
+            return self.major, self.minor, self.patch, (1,)
+        identifiers = tuple((0, int(part), "") if part.isdigit() else (1, 0, part) for part in self.prerelease)
+        return self.major, self.minor, self.patch, (0, identifiers)
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, Version) and self.key == other.key
+
+    def __lt__(self, other: "Version") -> bool:
+        return self.key < other.key
+
+    def __hash__(self) -> int:
+        return hash(self.key)
+
+    @property
+    def is_prerelease(self) -> bool:
+        return bool(self.prerelease)
+
+    def bump_major(self) -> "Version":
+        """Return the next major release (1.2.3 -> 2.0.0; 2.0.0-rc.1 -> 2.0.0)."""
+        if self.prerelease and self.minor == 0 and self.patch == 0:
+            return Version(self.major, 0, 0)
+        return Version(self.major + 1, 0, 0)
+
+    def bump_minor(self) -> "Version":
+        """Return the next minor release (1.2.3 -> 1.3.0; 1.3.0-rc.1 -> 1.3.0)."""
+        if self.prerelease and self.patch == 0:
+            return Version(self.major, self.minor, 0)
+        return Version(self.major, self.minor + 1, 0)
+
+    def bump_patch(self) -> "Version":
+        """Return the next patch release (1.2.3 -> 1.2.4; 1.2.4-rc.1 -> 1.2.4)."""
+        if self.prerelease:
+            return Version(self.major, self.minor, self.patch)
+        return Version(self.major, self.minor, self.patch + 1)
+
+    def bump_prerelease(self, label: str = "rc") -> "Version":
+        """Return the next pre-release (1.2.3 -> 1.2.4-rc.0; 1.2.4-rc.0 -> 1.2.4-rc.1).
+
+        A pre-release with a different label starts that label at 0.
+        """
+        if not self.prerelease:
+            return Version(self.major, self.minor, self.patch + 1, (label, "0"))
+        *head, last = self.prerelease
+        if self.prerelease[0] == label and last.isdigit():
+            return Version(self.major, self.minor, self.patch, (*head, str(int(last) + 1)))
+        if self.prerelease[0] == label:
+            return Version(self.major, self.minor, self.patch, (*self.prerelease, "0"))
+        return Version(self.major, self.minor, self.patch, (label, "0"))
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def parse_version(text: str) -> Version:
+    """Parse a X.Y.Z[-pre][+build] version; raises ValueError if text is not one."""
+    match = VERSION_PATTERN.match(text)
+    if not match:
+        raise ValueError(f"Invalid semver format: '{text}' (expected X.Y.Z)")
+    major, minor, patch, prerelease, build = match.groups()
+    return Version(
+        int(major),
+        int(minor),
+        int(patch),
+        tuple(prerelease.split(".")) if prerelease else (),
+        tuple(build.split(".")) if build else (),
+    )
+
+
+def try_parse_version(text: str) -> Version | None:
+    """Parse a version, returning None instead of raising for anything else."""
+    try:
+        return parse_version(text)
+    except ValueError:
+        return None
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def parse_tag(tag: str, prefix: str) -> Version | None:
+    """Parse a tag such as cloud-1.2.3 into its version, or None if it is not prefix + version."""
+    if not tag.startswith(prefix):
+        return None
+    return try_parse_version(tag[len(prefix):])
+
+
+def parse_release_tag(tag: str, prefix: str) -> Version | None:
+    """Parse prefix + X.Y.Z, or None for anything else including pre-release and build tags."""
+    version = parse_tag(tag, prefix)
+    if version is None or version.prerelease or version.build:
+        return None
+    return version
+
+
+def sort_tags(tags: Iterable[str], prefix: str, releases_only: bool = False) -> list[str]:
+    """Return the tags that are prefix + version, in ascending version order.
+
+    With releases_only, pre-release tags and tags with build metadata are
+    left out.
+    """
+    parse = parse_release_tag if releases_only else parse_tag
+    versioned = []
+    for tag in tags:
+        version = parse(tag, prefix)
+        if version is not None:
+            versioned.append((version.key, tag))
+    versioned.sort()
+    return [tag for _, tag in versioned]
+
+
+def latest_tag(tags: Iterable[str], prefix: str, releases_only: bool = True) -> str | None:
+    """Return the tag with the highest version, or None if no tag is prefix + version."""
+    ordered = sort_tags(tags, prefix, releases_only)
+    return ordered[-1] if ordered else None
+
+
+@dataclass(frozen=True)
+class Comparator:
+    """One comparison against a version, e.g. >=1.2.0."""
+
+    operator: str  # one of = != > >= < <=
+    version: Version
+
+    def matches(self, version: Version) -> bool:
+        if self.operator == "=":
+            return version == self.version
+        if self.operator == "!=":
+            return version != self.version
+        if self.operator == ">":
+            return version > self.version
+        if self.operator == ">=":
+            return version >= self.version
+        if self.operator == "<":
+            return version < self.version
+        return version <= self.version
+
+
+@dataclass(frozen=True)
+class VersionRange:
+    """A set of versions: any one group of comparators must all match."""
+
+    text: str
+    groups: tuple[tuple[Comparator, ...], ...]
+
+    def matches(self, version: Version | str) -> bool:
+        """Check whether version is in the range.
+
+        Pre-releases only match when a comparator in the same group names a
+        pre-release of the same X.Y.Z, as in Helm.
+        """
+        if isinstance(version, str):
+            version = parse_version(version)
+        for group in self.groups:
+            if not all(comparator.matches(version) for comparator in group):
+                continue
+            if not version.prerelease or any(
+                comparator.version.prerelease and comparator.version.key[:3] == version.key[:3]
+                for comparator in group
+            ):
+                return True
+        return False
+
+    def max_satisfying(self, versions: Iterable[Version | str]) -> Version | None:
+        """Return the highest version in the range, or None if none match."""
+        matching = [parse_version(v) if isinstance(v, str) else v for v in versions]
+        matching = [version for version in matching if self.matches(version)]
+        return max(matching, default=None)
+
+
+def _partial(text: str) -> tuple[list[int | None], tuple[str, ...]]:
+    """Split a possibly partial version (1, 1.2, 1.x, 1.2.3-rc.1) into parts, None for wildcards."""
+    match = PARTIAL_PATTERN.match(text)
+    if not match:
+        raise ValueError(f"Invalid version range: '{text}'")
+    major, minor, patch, prerelease = match.groups()
+    parts: list[int | None] = []
+    for part in (major, minor, patch):
+        if part is None or part in WILDCARDS or (parts and parts[-1] is None):
+            parts.append(None)
+        else:
+            parts.append(int(part))
+    return parts, tuple(prerelease.split(".")) if prerelease else ()
+
+
+def _comparators(operator: str, text: str) -> list[Comparator]:
+    """Expand one operator and a possibly partial version into plain comparators."""
+    (major, minor, patch), prerelease = _partial(text)
+    if major is None:
+        return [] if operator in ("", "=", "~", "^", ">=", "<=") else [Comparator("<", Version(0, 0, 0))]
+    low = Version(major, minor or 0, patch or 0, prerelease if patch is not None else ())
+    if operator in ("", "=") and patch is not None:
+        return [Comparator("=", low)]
+    if operator in ("", "="):
+        high = Version(major + 1, 0, 0) if minor is None else Version(major, minor + 1, 0)
+        return [Comparator(">=", low), Comparator("<", high)]
+    if operator == "~":
+        high = Version(major + 1, 0, 0) if minor is None else Version(major, minor + 1, 0)
+        return [Comparator(">=", low), Comparator("<", high)]
+    if operator == "^":
+        if major > 0 or minor is None:
+            high = Version(major + 1, 0, 0)
+        elif minor > 0 or patch is None:
+            high = Version(0, minor + 1, 0)
+        else:
+            high = Version(0, 0, patch + 1)
+        return [Comparator(">=", low), Comparator("<", high)]
+    if operator == "!=":
+        return [Comparator("!=", low)]
+    if operator == ">" and patch is None:
+        next_version = Version(major + 1, 0, 0) if minor is None else Version(major, minor + 1, 0)
+        return [Comparator(">=", next_version)]
+    if operator == "<=" and patch is None:
+        next_version = Version(major + 1, 0, 0) if minor is None else Version(major, minor + 1, 0)
+        return [Comparator("<", next_version)]
+    return [Comparator(operator, low)]
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def parse_range(text: str) -> VersionRange:
+    """Parse a Helm-style version constraint; raises ValueError if it is malformed."""
+    groups = []
+    for alternative in text.split("||"):
+        group: list[Comparator] = []
+        position = 0
+        alternative = alternative.strip()
+        while position < len(alternative):
+            if alternative[position] in ", ":
+                position += 1
+                continue
+            match = COMPARATOR_PATTERN.match(alternative, position)
+            if not match:
+                raise ValueError(f"Invalid version range: '{text}'")
+            group += _comparators(match.group(1) or "", match.group(2))
+            position = match.end()
+        groups.append(tuple(group))
+    return VersionRange(text, tuple(groups))
+
+
+def is_exact_version(text: str) -> bool:
+    """Check whether text pins one version (1.2.3) rather than a range (1.2.x, ^1.2.0)."""
+    return try_parse_version(text) is not None
@@ -34,7 +34,6 @@ Usage Example
         assert get_chart_value(temp_file, "appVersion") == NEW_APP_VERSION
 """
 
-import base64
 from pathlib import Path
 from typing import Any
 from unittest.mock import MagicMock
@@ -42,6 +41,10 @@ from unittest.mock import MagicMock
 import pytest
 from ruamel.yaml import YAML
 
+import update_openhands_charts
+from github_api import GitHubClient, RequestScheduler
+from update_openhands_charts import ChartFiles
+
 # =============================================================================
 # Fixture baseline constants
 # These values correspond to the sample fixtures below. Use these in tests
@@ -273,6 +276,26 @@ dependencies:
 """
 
 
+@pytest.fixture
+def sample_openhands_chart_with_subcharts():
+    """Sample openhands Chart.yaml depending on runtime-api and the image-pinned sub-charts."""
+    return """\
+apiVersion: v2
+appVersion: cloud-1.0.0
+version: 0.1.0
+name: openhands
+dependencies:
+  - name: runtime-api
+    version: 0.1.10
+  - name: automation
+    version: 0.1.9
+  - name: plugin-directory
+    version: 0.1.9
+  - name: integrations-hub
+    version: 0.1.9
+"""
+
+
 @pytest.fixture(params=["with_deps", "minimal"])
 def openhands_chart_variant(request, sample_openhands_chart_with_deps, sample_openhands_chart_minimal):
     """Parameterized fixture providing both openhands chart variants.
@@ -408,47 +431,53 @@ warmRuntimes:
 # GitHub API mock fixtures
 # =============================================================================
 
-def _make_mock_tag(name: str) -> MagicMock:
-    """Create a mock tag with the given name.
+def _make_matching_refs_payload(tag_names: list[str]) -> list[dict]:
+    """Build a git matching-refs API payload for the given tag names."""
+    return [
+        {"ref": f"refs/tags/{name}", "object": {"type": "commit", "sha": f"{index:040x}"}}
+        for index, name in enumerate(tag_names)
+    ]
+
+
+@pytest.fixture
+def github_client():
+    """Run-scoped GitHubClient with a fake token.
 
-    MagicMock uses 'name' for its own purposes, so we must set it explicitly
-    after creation.
+    Tests replace `github_client.session.get` (directly or through the mock
+    fixtures below) so no network calls are made. Retries still happen, but
+    the scheduler's sleep is a no-op so 5xx scenarios stay fast.
     """
-    tag = MagicMock()
-    tag.name = name
-    return tag
+    scheduler = RequestScheduler(sleep=lambda seconds: None)
+    with GitHubClient("fake-token", scheduler=scheduler) as client:
+        yield client
 
 
 @pytest.fixture
-def mock_github_tags(monkeypatch):
-    """Factory fixture for mocking GitHub API with tags.
+def mock_github_tags(monkeypatch, github_client):
+    """Factory fixture for mocking the GitHub matching-refs tag listing.
 
-    Returns a function that sets up the GitHub mock and returns the mock objects
-    for additional assertions.
+    Returns a function that patches the shared client's session to return the
+    given tags as git refs, and returns the mock for additional assertions.
 
     Usage:
-        def test_something(mock_github_tags):
-            mock_github, mock_repo = mock_github_tags(["cloud-1.0.0", "latest"])
-            # ... test code ...
-            mock_repo.get_tags.assert_called_once()
+        def test_something(mock_github_tags, github_client):
+            mock_get = mock_github_tags(["cloud-1.0.0", "cloud-1.1.0"])
+            get_latest_cloud_tag(github_client, "owner/repo")
+            mock_get.assert_called_once()
     """
     def _mock_github(tag_names: list[str] | None = None, repo_error: Exception | None = None):
-        mock_github = MagicMock()
+        mock_get = MagicMock()
 
         if repo_error:
-            mock_github.get_repo.side_effect = repo_error
+            mock_get.side_effect = repo_error
         else:
-            mock_tags = [_make_mock_tag(name) for name in (tag_names or [])]
-            mock_repo = MagicMock()
-            mock_repo.get_tags.return_value = mock_tags
-            mock_github.get_repo.return_value = mock_repo
-
-        monkeypatch.setattr("update_openhands_charts.Github", lambda auth: mock_github)
+            mock_response = MagicMock()
+            mock_response.raise_for_status = MagicMock()
+            mock_response.json.return_value = _make_matching_refs_payload(tag_names or [])
+            mock_get.return_value = mock_response
 
-        # Return mock objects for assertions
-        if repo_error:
-            return mock_github, None
-        return mock_github, mock_github.get_repo.return_value
+        monkeypatch.setattr(github_client.session, "get", mock_get)
+        return mock_get
 
     return _mock_github
 
@@ -476,17 +505,17 @@ def mock_main_early_exit(monkeypatch):
         # Mock get_latest_cloud_tag to return the specified cloud tag
         monkeypatch.setattr(
             "update_openhands_charts.get_latest_cloud_tag",
-            lambda token, repo: cloud_tag
+            lambda client, repo: cloud_tag
         )
         # Mock cloud_tag_exists to return True
         monkeypatch.setattr(
             "update_openhands_charts.cloud_tag_exists",
-            lambda token, repo, tag: True
+            lambda client, repo, tag: True
         )
-        # Mock get_current_app_version to return matching version (triggers early exit)
+        # Mock the local chart files so appVersion matches (triggers early exit)
         monkeypatch.setattr(
-            "update_openhands_charts.get_current_app_version",
-            lambda path: cloud_tag
+            "update_openhands_charts.load_chart_files",
+            lambda: ChartFiles({update_openhands_charts.CHART_PATH: f"appVersion: {cloud_tag}\n"})
         )
 
     return _mock_main
@@ -496,60 +525,125 @@ def mock_main_early_exit(monkeypatch):
 def make_workflow_response():
     """Factory fixture for creating mock GitHub API responses with workflow content.
 
-    Returns a function that creates a mock response object with base64-encoded
-    YAML content. Use this to test get_deploy_config with various workflow
-    configurations without repeating the mock setup boilerplate.
+    Returns a function that creates a mock response object serving both
+    requests get_deploy_config makes: the workflows directory listing (via
+    .json(), carrying the deploy.yaml blob SHA) and the raw file (via .text).
+    Use this to test get_deploy_config with various workflow configurations
+    without repeating the mock setup boilerplate.
 
     Usage:
-        def test_something(make_workflow_response, monkeypatch):
+        def test_something(make_workflow_response, monkeypatch, github_client):
             response = make_workflow_response("env:\\n  RUNTIME_API_SHA: abc123")
-            monkeypatch.setattr("update_openhands_charts.requests.get",
+            monkeypatch.setattr(github_client.session, "get",
                                MagicMock(return_value=response))
             # ... test code ...
     """
-    def _make_response(yaml_content: str) -> MagicMock:
-        encoded = base64.b64encode(yaml_content.encode()).decode()
+    def _make_response(yaml_content: str, blob_sha: str = "deadbeef") -> MagicMock:
         mock_response = MagicMock()
         mock_response.raise_for_status = MagicMock()
-        mock_response.json.return_value = {"content": encoded}
+        mock_response.json.return_value = [
+            {"name": "ci.yaml", "sha": "0" * 40},
+            {"name": "deploy.yaml", "sha": blob_sha},
+        ]
+        mock_response.text = yaml_content
         return mock_response
 
     return _make_response
 
 
 @pytest.fixture
-def mock_github_ref(monkeypatch):
+def mock_github_ref(monkeypatch, github_client):
     """Factory fixture for mocking GitHub API git ref lookups.
 
-    Returns a function that sets up the GitHub mock for tag existence checks.
+    Returns a function that patches the shared client's session for tag
+    existence checks and returns the mock for additional assertions.
 
     Usage:
-        def test_tag_exists(mock_github_ref):
-            mock_github, mock_repo = mock_github_ref(tag_exists=True)
+        def test_tag_exists(mock_github_ref, github_client):
+            mock_get = mock_github_ref(tag_exists=True)
             # ... test code ...
-            mock_repo.get_git_ref.assert_called_once_with("tags/cloud-1.0.0")
+            assert mock_get.call_args[0][0].endswith("/git/ref/tags/cloud-1.0.0")
     """
     def _mock_github(
         tag_exists: bool = True,
-        repo_error: Exception | None = None,
-        ref_error: Exception | None = None,
+        request_error: Exception | None = None,
     ):
-        mock_github = MagicMock()
+        mock_get = MagicMock()
 
-        if repo_error:
-            mock_github.get_repo.side_effect = repo_error
+        if request_error:
+            mock_get.side_effect = request_error
         else:
-            mock_repo = MagicMock()
-            if ref_error or not tag_exists:
-                mock_repo.get_git_ref.side_effect = ref_error or Exception("Not found")
+            mock_response = MagicMock()
+            if tag_exists:
+                mock_response.status_code = 200
+                mock_response.raise_for_status = MagicMock()
             else:
-                mock_repo.get_git_ref.return_value = MagicMock()
-            mock_github.get_repo.return_value = mock_repo
+                mock_response.status_code = 404
+                mock_response.raise_for_status.side_effect = Exception("404 Not Found")
+            mock_get.return_value = mock_response
 
-        monkeypatch.setattr("update_openhands_charts.Github", lambda auth: mock_github)
-
-        if repo_error:
-            return mock_github, None
-        return mock_github, mock_github.get_repo.return_value
+        monkeypatch.setattr(github_client.session, "get", mock_get)
+        return mock_get
 
     return _mock_github
+
+
+@pytest.fixture
+def chart_paths(
+    tmp_path,
+    monkeypatch,
+    sample_openhands_chart_minimal,
+    sample_openhands_values_full,
+    sample_runtime_api_chart_minimal,
+    sample_runtime_api_values,
+):
+    """Write the sample charts to tmp_path and point the update script at them.
+
+    Returns a dict mapping each module path constant (e.g. "CHART_PATH") to
+    the temporary file now used in its place, so full update runs can be
+    exercised without touching the real charts.
+    """
+    files = {
+        "CHART_PATH": ("openhands/Chart.yaml", sample_openhands_chart_minimal),
+        "VALUES_PATH": ("openhands/values.yaml", sample_openhands_values_full),
+        "RUNTIME_API_CHART_PATH": ("runtime-api/Chart.yaml", sample_runtime_api_chart_minimal),
+        "RUNTIME_API_VALUES_PATH": ("runtime-api/values.yaml", sample_runtime_api_values),
+    }
+    paths = {}
+    for constant, (relative, content) in files.items():
+        path = tmp_path / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+        monkeypatch.setattr(f"update_openhands_charts.{constant}", path)
+        paths[constant] = path
+    monkeypatch.setattr("update_openhands_charts.CHARTS_DIR", tmp_path)
+    return paths
+
+
+@pytest.fixture
+def subchart_paths(chart_paths, tmp_path, sample_openhands_chart_with_subcharts):
+    """Add sample charts for every sub-chart in IMAGE_TAG_RULES to chart_paths.
+
+    The openhands Chart.yaml is replaced with one that depends on all three.
+    Returns a dict mapping each sub-chart name to its chart directory.
+    """
+    values = {
+        "automation": "image:\n  repository: ghcr.io/openhands/automation\n  tag: sha-cf93073\n",
+        "plugin-directory": (
+            "client:\n  image:\n    repository: ghcr.io/openhands/plugin-directory-client\n"
+            '    tag: "sha-0e9a6d1"\n'
+            "server:\n  image:\n    repository: ghcr.io/openhands/plugin-directory-server\n"
+            '    tag: "sha-0e9a6d1"\n'
+        ),
+        "integrations-hub": "image:\n  repository: ghcr.io/openhands/integrations-hub\n  tag: latest\n",
+        "image-loader": "image:\n  repository: ghcr.io/openhands/agent-server\n  tag: cloud-1.0.0-nikolaik\n",
+    }
+    chart_paths["CHART_PATH"].write_text(sample_openhands_chart_with_subcharts)
+    paths = {}
+    for name, content in values.items():
+        chart_dir = tmp_path / name
+        chart_dir.mkdir()
+        (chart_dir / "Chart.yaml").write_text(f"apiVersion: v2\nname: {name}\nversion: 0.1.9\n")
+        (chart_dir / "values.yaml").write_text(content)
+        paths[name] = chart_dir
+    return paths
@@ -0,0 +1,403 @@
+#!/usr/bin/env -S uv run
+# /// script
+# requires-python = ">=3.12"
+# dependencies = ["ruamel.yaml", "requests"]
+# ///
+"""Local stand-in for the GitHub REST endpoints used by update_openhands_charts.py.
+
+Serves the matching-refs, git ref, git tag and contents endpoints from a JSON fixture
+file over real HTTP, so the update pipeline can be exercised end to end with
+the same GitHubClient it uses in production. Each endpoint can be given
+injected latency and a random error rate, and the server keeps a GitHub-style
+rate-limit budget reported through the X-RateLimit-* headers. Responses carry
+ETags and answer matching If-None-Match headers with 304 Not Modified.
+
+Benchmark mode runs full dry-run updates against the server and reports wall
+time and request counts per run:
+
+    uv run scripts/update_openhands_charts/fake_github_api.py --benchmark --latency-ms 50
+"""
+
+import argparse
+import base64
+import contextlib
+import hashlib
+import io
+import json
+import random
+import re
+import statistics
+import tempfile
+import threading
+import time
+from collections import Counter
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+DEFAULT_FIXTURE_PATH = Path(__file__).parent / "fixtures" / "github_api.json"
+DEFAULT_RATE_LIMIT = 5000
+DEFAULT_RATE_LIMIT_WINDOW_SECONDS = 3600
+DEFAULT_BENCHMARK_RUNS = 5
+DEFAULT_REF = "HEAD"
+
+ENDPOINT_ROUTES = {
+    "matching-refs": re.compile(r"^/repos/(?P<repo>[^/]+/[^/]+)/git/matching-refs/tags/(?P<prefix>.*)$"),
+    "git-ref": re.compile(r"^/repos/(?P<repo>[^/]+/[^/]+)/git/ref/tags/(?P<tag>.+)$"),
+    "git-tag": re.compile(r"^/repos/(?P<repo>[^/]+/[^/]+)/git/tags/(?P<sha>[0-9a-f]+)$"),
+    "contents": re.compile(r"^/repos/(?P<repo>[^/]+/[^/]+)/contents/(?P<path>.*)$"),
+}
+
+
+def git_blob_sha(content: str) -> str:
+    """Return the SHA git assigns to a blob with this content."""
+    data = content.encode()
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+@dataclass
+class EndpointBehavior:
+    """Injected behaviour for one endpoint.
+
+    Attributes:
+        latency_seconds: Delay added before every response
+        error_rate: Probability (0-1) of answering with error_status instead
+        error_status: Status code used for injected errors
+    """
+
+    latency_seconds: float = 0.0
+    error_rate: float = 0.0
+    error_status: int = 502
+
+
+@dataclass
+class RateLimit:
+    """A GitHub-style request budget that resets after a fixed window."""
+
+    limit: int = DEFAULT_RATE_LIMIT
+    remaining: int = DEFAULT_RATE_LIMIT
+    window_seconds: float = DEFAULT_RATE_LIMIT_WINDOW_SECONDS
+    reset_at: float = field(default_factory=lambda: time.time() + DEFAULT_RATE_LIMIT_WINDOW_SECONDS)
+
+    def headers(self) -> dict[str, str]:
+        return {
+            "X-RateLimit-Limit": str(self.limit),
+            "X-RateLimit-Remaining": str(self.remaining),
+            "X-RateLimit-Reset": str(int(self.reset_at)),
+        }
+
+    def consume(self) -> bool:
+        """Charge one request; return False when the budget is exhausted."""
+        now = time.time()
+        if now >= self.reset_at:
+            self.remaining = self.limit
+            self.reset_at = now + self.window_seconds
+        if self.remaining <= 0:
+            return False
+        self.remaining -= 1
+        return True
+
+
+@dataclass
+class FakeResponse:
+    status: int
+    headers: dict[str, str]
+    body: bytes = b""
+
+
+class FakeGitHubAPI:
+    """A threaded HTTP server answering GitHub API requests from fixture data.
+
+    Args:
+        data: Parsed fixture, {"repos": {name: {"tags": {...}, "files": {ref: {path: text}}}}}.
+            A repo may also map annotated tag object SHAs to their targets under
+            "tag_objects"; tags pointing at those SHAs are listed as annotated.
+        behaviors: Injected behaviour keyed by endpoint name (see ENDPOINT_ROUTES)
+        rate_limit: Request budget; unlimited for practical purposes by default
+        seed: Seed for the error-injection random number generator
+    """
+
+    def __init__(
+        self,
+        data: dict,
+        behaviors: dict[str, EndpointBehavior] | None = None,
+        rate_limit: RateLimit | None = None,
+        seed: int = 0,
+    ):
+        self.repos = data["repos"]
+        self.behaviors = behaviors or {}
+        self.rate_limit = rate_limit or RateLimit()
+        self.request_counts: Counter[str] = Counter()
+        self.requests: list[tuple[str, str, int]] = []
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server: ThreadingHTTPServer | None = None
+        self._thread: threading.Thread | None = None
+
+    @classmethod
+    def from_fixture(cls, path: Path = DEFAULT_FIXTURE_PATH, **kwargs) -> "FakeGitHubAPI":
+        return cls(json.loads(path.read_text()), **kwargs)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self) -> "FakeGitHubAPI":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def start(self) -> None:
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                response = api.handle(self.path, self.headers)
+                self.send_response(response.status)
+                for name, value in response.headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(response.body)))
+                self.end_headers()
+                self.wfile.write(response.body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._thread.join()
+            self._server = None
+
+    def handle(self, raw_path: str, headers: Mapping[str, str]) -> FakeResponse:
+        """Route one GET request and apply injected behaviour."""
+        parts = urlsplit(raw_path)
+        endpoint, match = self._route(parts.path)
+        behavior = self.behaviors.get(endpoint, EndpointBehavior())
+        if behavior.latency_seconds:
+            time.sleep(behavior.latency_seconds)
+
+        with self._lock:
+            self.request_counts[endpoint] += 1
+            inject_error = behavior.error_rate and self._random.random() < behavior.error_rate
+            response = self._respond(endpoint, match, parse_qs(parts.query), headers, inject_error, behavior)
+            self.requests.append((endpoint, raw_path, response.status))
+        return response
+
+    def _route(self, path: str) -> tuple[str, re.Match | None]:
+        for endpoint, pattern in ENDPOINT_ROUTES.items():
+            match = pattern.match(path)
+            if match:
+                return endpoint, match
+        return "unknown", None
+
+    def _respond(
+        self,
+        endpoint: str,
+        match: re.Match | None,
+        query: dict[str, list[str]],
+        headers: Mapping[str, str],
+        inject_error: bool,
+        behavior: EndpointBehavior,
+    ) -> FakeResponse:
+        if inject_error:
+            return _json_response(behavior.error_status, {"message": "Injected error"}, self.rate_limit.headers())
+
+        if match is None:
+            status, body, content_type = 404, {"message": "Not Found"}, None
+        else:
+            status, body, content_type = self._resolve(endpoint, match, query, headers)
+        payload = body if isinstance(body, bytes) else json.dumps(body).encode()
+        etag = f'"{hashlib.sha1(payload).hexdigest()}"'
+
+        # GitHub does not charge conditional requests answered with 304
+        if status == 200 and headers.get("If-None-Match") == etag:
+            return FakeResponse(304, {"ETag": etag, **self.rate_limit.headers()})
+        if not self.rate_limit.consume():
+            return _json_response(403, {"message": "API rate limit exceeded"}, self.rate_limit.headers())
+
+        response_headers = {"Content-Type": content_type or "application/json", **self.rate_limit.headers()}
+        if status == 200:
+            response_headers["ETag"] = etag
+        return FakeResponse(status, response_headers, payload)
+
+    def _resolve(
+        self, endpoint: str, match: re.Match, query: dict[str, list[str]], headers: Mapping[str, str]
+    ) -> tuple[int, object, str | None]:
+        repo = self.repos.get(match["repo"])
+        if repo is None:
+            return 404, {"message": "Not Found"}, None
+
+        tags = repo.get("tags", {})
+        tag_objects = repo.get("tag_objects", {})
+        if endpoint == "matching-refs":
+            return 200, [
+                _tag_ref(name, sha, tag_objects) for name, sha in tags.items() if name.startswith(match["prefix"])
+            ], None
+        if endpoint == "git-ref":
+            sha = tags.get(match["tag"])
+            if sha is None:
+                return 404, {"message": "Not Found"}, None
+            return 200, _tag_ref(match["tag"], sha, tag_objects), None
+        if endpoint == "git-tag":
+            target = tag_objects.get(match["sha"])
+            if target is None:
+                return 404, {"message": "Not Found"}, None
+            return 200, {"sha": match["sha"], "object": _git_object(target, tag_objects)}, None
+
+        ref = query.get("ref", [DEFAULT_REF])[0]
+        files = repo.get("files", {}).get(ref, {})
+        path = match["path"].strip("/")
+        if path in files:
+            content = files[path]
+            if "raw" in headers.get("Accept", ""):
+                return 200, content.encode(), "application/vnd.github.raw+json"
+            return 200, {
+                "type": "file",
+                "name": path.rsplit("/", 1)[-1],
+                "path": path,
+                "sha": git_blob_sha(content),
+                "encoding": "base64",
+                "content": base64.b64encode(content.encode()).decode(),
+            }, None
+
+        listing = [
+            {"type": "file", "name": name[len(path) + 1:], "path": name, "sha": git_blob_sha(content)}
+            for name, content in sorted(files.items())
+            if name.startswith(f"{path}/") and "/" not in name[len(path) + 1:]
+        ]
+        if not listing:
+            return 404, {"message": "Not Found"}, None
+        return 200, listing, None
+
+
+def _tag_ref(name: str, sha: str, tag_objects: dict[str, str]) -> dict:
+    return {"ref": f"refs/tags/{name}", "object": _git_object(sha, tag_objects)}
+
+
+def _git_object(sha: str, tag_objects: dict[str, str]) -> dict:
+    return {"sha": sha, "type": "tag" if sha in tag_objects else "commit"}
+
+
+def _json_response(status: int, body: dict, headers: dict[str, str]) -> FakeResponse:
+    return FakeResponse(status, {"Content-Type": "application/json", **headers}, json.dumps(body).encode())
+
+
+@dataclass
+class BenchmarkRun:
+    seconds: float
+    requests: int
+    cache_hits: int
+
+
+def run_benchmark(
+    runs: int = DEFAULT_BENCHMARK_RUNS,
+    latency_seconds: float = 0.0,
+    use_cache: bool = False,
+    fixture_path: Path = DEFAULT_FIXTURE_PATH,
+) -> list[BenchmarkRun]:
+    """Run full dry-run updates against a local server and measure each one.
+
+    With use_cache the response cache persists across runs, so later runs
+    show the effect of conditional requests.
+    """
+    # Imported here so the server itself stays usable without the update script
+    from github_api import GitHubClient, ResponseCache
+    from update_openhands_charts import DeployEnvCache, process_updates
+
+    behavior = EndpointBehavior(latency_seconds=latency_seconds)
+    results = []
+    with tempfile.TemporaryDirectory() as cache_dir, FakeGitHubAPI.from_fixture(
+        fixture_path, behaviors={endpoint: behavior for endpoint in ENDPOINT_ROUTES}
+    ) as api:
+        for _ in range(runs):
+            cache = ResponseCache(Path(cache_dir)) if use_cache else None
+            with GitHubClient("fake-token", base_url=api.url, cache=cache) as client:
+                start = time.perf_counter()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    process_updates(client, dry_run=True, env_cache=DeployEnvCache(directory=None))
+                elapsed = time.perf_counter() - start
+            results.append(BenchmarkRun(elapsed, client.stats.request_count, client.stats.cache_hits))
+    return results
+
+
+def print_benchmark(results: list[BenchmarkRun]) -> None:
+    for index, run in enumerate(results, 1):
+        print(f"  run {index}: {run.seconds * 1000:.0f}ms, {run.requests} requests, {run.cache_hits} cache hits")
+    times = [run.seconds for run in results]
+    print(f"Median wall time: {statistics.median(times) * 1000:.0f}ms (min {min(times) * 1000:.0f}ms)")
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(
+        description="Serve a local stand-in for the GitHub API, or benchmark chart updates against it."
+    )
+    parser.add_argument(
+        "--benchmark",
+        action="store_true",
+        help="Run full dry-run updates against the server and report timings instead of serving.",
+    )
+    parser.add_argument(
+        "--runs",
+        type=int,
+        default=DEFAULT_BENCHMARK_RUNS,
+        help=f"Number of benchmark runs (default: {DEFAULT_BENCHMARK_RUNS}).",
+    )
+    parser.add_argument(
+        "--latency-ms",
+        type=float,
+        default=0.0,
+        help="Latency added to every endpoint, in milliseconds.",
+    )
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="Benchmark with the on-disk response cache shared across runs.",
+    )
+    parser.add_argument(
+        "--fixture",
+        type=Path,
+        default=DEFAULT_FIXTURE_PATH,
+        help="JSON fixture with the repositories to serve.",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    latency_seconds = args.latency_ms / 1000
+    if args.benchmark:
+        results = run_benchmark(args.runs, latency_seconds, args.cache, args.fixture)
+        print_benchmark(results)
+        return
+
+    behavior = EndpointBehavior(latency_seconds=latency_seconds)
+    with FakeGitHubAPI.from_fixture(
+        args.fixture, behaviors={endpoint: behavior for endpoint in ENDPOINT_ROUTES}
+    ) as api:
+        print(f"Serving fake GitHub API at {api.url} (Ctrl+C to stop)")
+        print(f"Point the update script at it with: --api-url {api.url}")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
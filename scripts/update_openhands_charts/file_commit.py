@@ -0,0 +1,93 @@
+"""Replace a set of files together, so an update lands completely or not at all.
+
+Every new file is first written to a temporary file in its target directory
+and synced to disk. Nothing is renamed until all of them are written, so a
+failure at that stage leaves every target untouched. The temporary files are
+then renamed over their targets, and each directory is synced once to make the
+renames durable. If a rename fails, the files already replaced are restored
+from their previous contents.
+"""
+
+import os
+import stat
+import tempfile
+from pathlib import Path
+
+from trace_events import traced
+
+
+def _write_temp(path: Path, content: str) -> Path:
+    """Write content to a synced temporary file next to path, with path's permissions."""
+    fd, temp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with open(fd, "wb") as file:
+            file.write(content.encode())
+            file.flush()
+            try:
+                os.fchmod(file.fileno(), stat.S_IMODE(path.stat().st_mode))
+            except FileNotFoundError:
+                pass
+            os.fsync(file.fileno())
+    except BaseException:
+        os.unlink(temp_name)
+        raise
+    return Path(temp_name)
+
+
+def _sync_directory(directory: Path) -> None:
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _replace_all(temp_files: dict[Path, Path], replaced: list[Path]) -> None:
+    """Rename each temporary file over its target, appending each target to replaced.
+
+    On failure the temporary files not yet renamed are removed.
+    """
+    try:
+        for path, temp_path in temp_files.items():
+            os.replace(temp_path, path)
+            replaced.append(path)
+    except OSError:
+        for path, temp_path in temp_files.items():
+            if path not in replaced:
+                temp_path.unlink(missing_ok=True)
+        raise
+
+
+@traced("io")
+def commit_files(files: dict[Path, str], originals: dict[Path, str] | None = None) -> None:
+    """Replace every file in files with its new content.
+
+    Args:
+        files: New content by path
+        originals: Previous content by path, used to restore files that were
+            already replaced if a later rename fails
+
+    Raises OSError if any file could not be written; see the module docstring
+    for what is left on disk in each case.
+    """
+    temp_files: dict[Path, Path] = {}
+    try:
+        for path, content in files.items():
+            temp_files[path] = _write_temp(path, content)
+    except BaseException:
+        for temp_path in temp_files.values():
+            temp_path.unlink(missing_ok=True)
+        raise
+
+    replaced: list[Path] = []
+    try:
+        _replace_all(temp_files, replaced)
+    except OSError:
+        originals = originals or {}
+        restore = {path: originals[path] for path in replaced if path in originals}
+        if restore:
+            _replace_all({path: _write_temp(path, content) for path, content in restore.items()}, [])
+        raise
+
+    for directory in {path.parent for path in files}:
+        _sync_directory(directory)
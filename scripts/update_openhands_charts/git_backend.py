@@ -0,0 +1,207 @@
+"""Read cloud tags and workflow files from local blobless clones with plain git.
+
+A LocalReleaseSource stands in for the GitHub REST client when the update
+script runs with --git-clones. Each repository is a bare `--filter=blob:none`
+clone: refs, commits and trees are local after one fetch, and file contents
+are pulled on demand the first time a blob is read.
+
+Tags are listed with `git for-each-ref`, blob ids are resolved with
+`git rev-parse` and contents are read through one long-lived
+`git cat-file --batch` process per repository, so resolving hundreds of tags
+costs no API requests and no blob downloads beyond the files actually read.
+"""
+
+import subprocess
+import threading
+from pathlib import Path
+
+from trace_events import span
+
+GIT_EXECUTABLE = "git"
+GITHUB_CLONE_URL = "https://github.com/{repo_name}.git"
+
+
+class GitError(Exception):
+    """Raised when a git command fails or a repository is not configured."""
+
+
+def run_git(git_dir: Path | None, *args: str) -> str:
+    """Run a git command and return its stdout, raising GitError on failure."""
+    command = [GIT_EXECUTABLE]
+    if git_dir is not None:
+        command += ["--git-dir", str(git_dir)]
+    with span(f"git {args[0]}", "git"):
+        result = subprocess.run([*command, *args], capture_output=True, text=True)
+    if result.returncode != 0:
+        raise GitError(f"git {' '.join(args)} failed: {result.stderr.strip()}")
+    return result.stdout
+
+
+class GitRepository:
+    """A local bare repository read through git plumbing commands."""
+
+    def __init__(self, git_dir: Path):
+        self.git_dir = git_dir
+        self._batch: subprocess.Popen | None = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def clone(cls, url: str, git_dir: Path) -> "GitRepository":
+        """Create a bare blobless clone of url at git_dir."""
+        git_dir.parent.mkdir(parents=True, exist_ok=True)
+        run_git(None, "clone", "--bare", "--filter=blob:none", "--quiet", url, str(git_dir))
+        return cls(git_dir)
+
+    def fetch(self) -> None:
+        """Fetch all tags from origin, dropping tags deleted upstream."""
+        run_git(self.git_dir, "fetch", "--quiet", "--prune", "origin", "+refs/tags/*:refs/tags/*")
+
+    def list_tags(self, pattern: str = "*") -> list[str]:
+        """Return the names of tags matching a for-each-ref glob pattern."""
+        output = run_git(self.git_dir, "for-each-ref", "--format=%(refname:strip=2)", f"refs/tags/{pattern}")
+        return output.splitlines()
+
+    def list_tag_refs(self, pattern: str = "*") -> dict[str, str]:
+        """Map tags matching a for-each-ref glob pattern to the commits they point at.
+
+        Annotated tags are peeled to their commit.
+        """
+        output = run_git(
+            self.git_dir,
+            "for-each-ref",
+            "--format=%(refname:strip=2) %(objectname) %(*objectname)",
+            f"refs/tags/{pattern}",
+        )
+        refs = {}
+        for line in output.splitlines():
+            name, object_sha, *peeled = line.split()
+            refs[name] = peeled[0] if peeled else object_sha
+        return refs
+
+    def tag_exists(self, tag_name: str) -> bool:
+        """Check whether a tag exists without listing every tag."""
+        try:
+            run_git(self.git_dir, "show-ref", "--verify", "--quiet", f"refs/tags/{tag_name}")
+        except GitError:
+            return False
+        return True
+
+    def object_id(self, spec: str) -> str | None:
+        """Resolve a `<rev>:<path>` spec to an object id without reading the object.
+
+        Uses `rev-parse`, which only walks the trees, so it never downloads a
+        missing blob. `cat-file --batch-check` looks up the object even when
+        the format asks for nothing but its name, and on a blobless clone that
+        lookup fetches the blob from origin.
+        """
+        try:
+            return run_git(self.git_dir, "rev-parse", "--verify", "--quiet", spec).strip()
+        except GitError:
+            return None
+
+    def read_blob(self, spec: str) -> bytes | None:
+        """Return the contents of the object named by spec, or None if missing."""
+        with self._lock:
+            if self._batch is None:
+                self._batch = self._start_cat_file("--batch")
+            header = self._request(self._batch, spec)
+            if header is None:
+                return None
+            size = int(header[2])
+            content = self._batch.stdout.read(size)
+            self._batch.stdout.read(1)  # trailing newline after each object
+        return content
+
+    def _start_cat_file(self, mode: str) -> subprocess.Popen:
+        return subprocess.Popen(
+            [GIT_EXECUTABLE, "--git-dir", str(self.git_dir), "cat-file", mode],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+        )
+
+    def _request(self, process: subprocess.Popen, spec: str) -> list[str] | None:
+        """Send one spec to a cat-file process and return its parsed header line."""
+        with span("git cat-file", "git", spec=spec):
+            process.stdin.write(spec.encode() + b"\n")
+            process.stdin.flush()
+            header = process.stdout.readline().decode().split()
+        if len(header) != 3:
+            # "<spec> missing", "<spec> ambiguous" or an unexpected exit
+            return None
+        return header
+
+    def close(self) -> None:
+        """Stop the cat-file process, if one is running."""
+        if self._batch is not None:
+            self._batch.stdin.close()
+            self._batch.wait()
+        self._batch = None
+
+
+class LocalReleaseSource:
+    """Tag and file lookups for GitHub repositories, answered from local clones.
+
+    Mirrors the lookups the update script otherwise makes over the REST API,
+    keyed by "owner/name" repository names.
+    """
+
+    def __init__(self, repositories: dict[str, GitRepository]):
+        self.repositories = repositories
+
+    @classmethod
+    def open(cls, clones_dir: Path, repo_names: list[str], fetch: bool = True) -> "LocalReleaseSource":
+        """Open clones under clones_dir, cloning missing ones and optionally fetching the rest."""
+        repositories = {}
+        for repo_name in repo_names:
+            git_dir = clones_dir / f"{repo_name}.git"
+            if not git_dir.exists():
+                print(f"Cloning {repo_name} into {git_dir}...")
+                repositories[repo_name] = GitRepository.clone(GITHUB_CLONE_URL.format(repo_name=repo_name), git_dir)
+                continue
+            repository = GitRepository(git_dir)
+            if fetch:
+                print(f"Fetching tags for {repo_name}...")
+                repository.fetch()
+            repositories[repo_name] = repository
+        return cls(repositories)
+
+    def __enter__(self) -> "LocalReleaseSource":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        for repository in self.repositories.values():
+            repository.close()
+
+    def fetch(self) -> None:
+        """Fetch new tags into every clone."""
+        for repository in self.repositories.values():
+            repository.fetch()
+
+    def repository(self, repo_name: str) -> GitRepository:
+        try:
+            return self.repositories[repo_name]
+        except KeyError:
+            raise GitError(f"No local clone configured for {repo_name}") from None
+
+    def list_tag_refs(self, repo_name: str, prefix: str) -> dict[str, str]:
+        return self.repository(repo_name).list_tag_refs(f"{prefix}*")
+
+    def tag_exists(self, repo_name: str, tag_name: str) -> bool:
+        return self.repository(repo_name).tag_exists(tag_name)
+
+    def blob_sha(self, repo_name: str, file_path: str, ref: str | None = None) -> str:
+        """Return the blob SHA of a file at ref (HEAD by default)."""
+        object_id = self.repository(repo_name).object_id(f"{ref or 'HEAD'}:{file_path}")
+        if object_id is None:
+            raise FileNotFoundError(f"{file_path} not found in {repo_name} at {ref or 'HEAD'}")
+        return object_id
+
+    def read_file(self, repo_name: str, file_path: str, ref: str | None = None) -> str:
+        """Return the text of a file at ref (HEAD by default)."""
+        content = self.repository(repo_name).read_blob(f"{ref or 'HEAD'}:{file_path}")
+        if content is None:
+            raise FileNotFoundError(f"{file_path} not found in {repo_name} at {ref or 'HEAD'}")
+        return content.decode()
@@ -0,0 +1,529 @@
+"""Run-scoped GitHub REST client for the chart update scripts.
+
+One GitHubClient is created per update run and injected into every function
+that talks to GitHub, so all calls share a single keep-alive connection pool
+instead of paying a fresh TCP and TLS handshake each.
+
+An optional ResponseCache stores ETag/Last-Modified validators on disk so
+later runs send conditional requests; GitHub answers unchanged resources with
+304 Not Modified, which does not count against the rate limit.
+
+A RequestScheduler reads GitHub's rate-limit headers, waits only as long as
+the API asks, and retries idempotent GETs with jittered exponential backoff.
+Every wait is charged to a per-run budget so CI jobs fail fast instead of
+hanging on an exhausted rate limit.
+"""
+
+import base64
+import hashlib
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from trace_events import span
+
+if TYPE_CHECKING:
+    import requests
+
+GITHUB_API_URL = "https://api.github.com"
+GITHUB_API_VERSION = "2022-11-28"
+DEFAULT_POOL_SIZE = 4
+DEFAULT_TIMEOUT_SECONDS = 30
+DEFAULT_CACHE_DIR = (
+    Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache")) / "openhands-charts" / "github"
+)
+DEFAULT_CACHE_MAX_BYTES = 16 * 1024 * 1024
+CACHED_HEADERS = ("Content-Type", "ETag", "Last-Modified")
+RETRYABLE_STATUS_CODES = frozenset({500, 502, 503, 504})
+RATE_LIMIT_STATUS_CODES = frozenset({403, 429})
+DEFAULT_MAX_ATTEMPTS = 5
+DEFAULT_BACKOFF_SECONDS = 1.0
+DEFAULT_MAX_BACKOFF_SECONDS = 60.0
+DEFAULT_WAIT_BUDGET_SECONDS = 300.0
+# GitHub asks clients to wait at least a minute after a secondary rate limit
+# response that carries no Retry-After header.
+SECONDARY_RATE_LIMIT_SECONDS = 60.0
+
+
+class RequestBudgetExceeded(Exception):
+    """Raised when honouring a wait would exceed the run's wait budget."""
+
+
+@dataclass
+class RequestStats:
+    """Latency and connection usage of a single API call."""
+
+    path: str
+    status: int | None
+    seconds: float
+    new_connection: bool
+    cache_hit: bool = False
+    attempt: int = 1
+
+
+@dataclass
+class ClientStats:
+    """Aggregated request statistics for one client."""
+
+    calls: list[RequestStats] = field(default_factory=list)
+    waited_seconds: float = 0.0
+
+    @property
+    def request_count(self) -> int:
+        """Return the number of requests sent."""
+        return len(self.calls)
+
+    @property
+    def connections_opened(self) -> int:
+        """Return how many requests had to open a new connection."""
+        return sum(1 for call in self.calls if call.new_connection)
+
+    @property
+    def connections_reused(self) -> int:
+        """Return how many requests reused a pooled connection."""
+        return self.request_count - self.connections_opened
+
+    @property
+    def cache_hits(self) -> int:
+        """Return how many requests were answered 304 and served from disk."""
+        return sum(1 for call in self.calls if call.cache_hit)
+
+    @property
+    def retries(self) -> int:
+        """Return how many requests were resends of an earlier attempt."""
+        return sum(1 for call in self.calls if call.attempt > 1)
+
+    @property
+    def total_seconds(self) -> float:
+        """Return the summed latency of all requests."""
+        return sum(call.seconds for call in self.calls)
+
+    def print_summary(self) -> None:
+        """Print one line per request followed by the totals."""
+        for call in self.calls:
+            connection = "new connection" if call.new_connection else "reused connection"
+            cached = ", served from cache" if call.cache_hit else ""
+            retry = f", attempt {call.attempt}" if call.attempt > 1 else ""
+            print(f"GET {call.path} -> {call.status} in {call.seconds * 1000:.0f}ms ({connection}{cached}{retry})")
+        print(
+            f"GitHub API: {self.request_count} requests in {self.total_seconds:.2f}s "
+            f"({self.connections_opened} connections opened, {self.connections_reused} reused, "
+            f"{self.cache_hits} cache hits)"
+        )
+        if self.retries or self.waited_seconds:
+            print(f"Retried {self.retries} requests, waited {self.waited_seconds:.1f}s for GitHub")
+
+
+def _header_number(headers, name: str) -> float | None:
+    """Return a numeric response header, or None if absent or not a number."""
+    try:
+        return float(headers.get(name))
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass
+class RetryPolicy:
+    """Limits for retrying GETs and waiting on GitHub rate limits.
+
+    Args:
+        max_attempts: Total tries per request, including the first
+        base_delay: Backoff ceiling for the first retry, doubled per attempt
+        max_delay: Upper bound for a single backoff sleep
+        budget_seconds: Total time one run may spend waiting
+    """
+
+    max_attempts: int = DEFAULT_MAX_ATTEMPTS
+    base_delay: float = DEFAULT_BACKOFF_SECONDS
+    max_delay: float = DEFAULT_MAX_BACKOFF_SECONDS
+    budget_seconds: float = DEFAULT_WAIT_BUDGET_SECONDS
+
+
+class RequestScheduler:
+    """Decides when a GET may be sent and whether a failed one is retried.
+
+    Rate-limit waits use the exact time GitHub reports (Retry-After or
+    X-RateLimit-Reset); transient failures use full-jitter exponential
+    backoff. A wait that would overrun the budget raises
+    RequestBudgetExceeded instead of sleeping. Waits from concurrent
+    worker threads share the budget.
+    """
+
+    def __init__(
+        self,
+        policy: RetryPolicy | None = None,
+        sleep: Callable[[float], None] = time.sleep,
+        clock: Callable[[], float] = time.time,
+        jitter: Callable[[], float] = random.random,
+    ):
+        self.policy = policy or RetryPolicy()
+        self.sleep = sleep
+        self.clock = clock
+        self.jitter = jitter
+        self.waited_seconds = 0.0
+        self._budget_lock = threading.Lock()
+        self.rate_limit_remaining: float | None = None
+        self.rate_limit_reset: float | None = None
+
+    def observe(self, response: "requests.Response") -> None:
+        """Remember the rate-limit window reported by a response."""
+        remaining = _header_number(response.headers, "X-RateLimit-Remaining")
+        if remaining is not None:
+            self.rate_limit_remaining = remaining
+            self.rate_limit_reset = _header_number(response.headers, "X-RateLimit-Reset")
+
+    def wait_for_rate_limit(self) -> None:
+        """Block until the primary rate limit resets if it is known to be exhausted."""
+        if self.rate_limit_remaining == 0 and self.rate_limit_reset is not None:
+            delay = self.rate_limit_reset - self.clock()
+            if delay > 0:
+                self.wait(delay, "primary rate limit exhausted")
+            self.rate_limit_remaining = None
+
+    def backoff_delay(self, attempt: int) -> float:
+        """Return a full-jitter exponential delay for the given attempt number."""
+        ceiling = min(self.policy.max_delay, self.policy.base_delay * 2 ** (attempt - 1))
+        return ceiling * self.jitter()
+
+    def retry_delay(self, response: "requests.Response | None", attempt: int) -> float | None:
+        """Return how long to wait before resending, or None to stop retrying.
+
+        Args:
+            response: The failed response, or None if the request raised a
+                connection error or timeout
+            attempt: Number of attempts already made (1 for the first try)
+        """
+        if attempt >= self.policy.max_attempts:
+            return None
+        if response is None:
+            return self.backoff_delay(attempt)
+
+        status = response.status_code
+        if status in RETRYABLE_STATUS_CODES:
+            return self.backoff_delay(attempt)
+        if status not in RATE_LIMIT_STATUS_CODES:
+            return None
+
+        retry_after = _header_number(response.headers, "Retry-After")
+        if retry_after is not None:
+            return retry_after
+        if _header_number(response.headers, "X-RateLimit-Remaining") == 0:
+            reset = _header_number(response.headers, "X-RateLimit-Reset")
+            if reset is not None:
+                return max(reset - self.clock(), 0.0)
+        if status == 429 or "secondary rate limit" in response.text.lower():
+            return max(SECONDARY_RATE_LIMIT_SECONDS, self.backoff_delay(attempt))
+        # A plain 403 is a permission problem, not something waiting will fix.
+        return None
+
+    def reset_budget(self) -> None:
+        """Start a fresh wait budget, e.g. for each cycle of a long-running watch."""
+        with self._budget_lock:
+            self.waited_seconds = 0.0
+
+    def wait(self, seconds: float, reason: str) -> None:
+        """Sleep for seconds, charging the run budget.
+
+        The wait is charged before sleeping, under a lock, so threads waiting
+        at the same time can never overrun the budget between them.
+
+        Raises:
+            RequestBudgetExceeded: If the wait would exceed the remaining budget
+        """
+        with self._budget_lock:
+            remaining_budget = self.policy.budget_seconds - self.waited_seconds
+            if seconds > remaining_budget:
+                raise RequestBudgetExceeded(
+                    f"Waiting {seconds:.0f}s ({reason}) would exceed the GitHub wait budget "
+                    f"of {self.policy.budget_seconds:.0f}s ({remaining_budget:.0f}s left)"
+                )
+            self.waited_seconds += seconds
+        self.sleep(seconds)
+
+
+@dataclass
+class CachedResponse:
+    """A stored 200 response together with its validators."""
+
+    url: str
+    headers: dict[str, str]
+    body: bytes
+
+    @property
+    def etag(self) -> str | None:
+        """Return the stored ETag validator, if any."""
+        return self.headers.get("ETag")
+
+    @property
+    def last_modified(self) -> str | None:
+        """Return the stored Last-Modified validator, if any."""
+        return self.headers.get("Last-Modified")
+
+    def conditional_headers(self) -> dict[str, str]:
+        """Return the If-None-Match/If-Modified-Since headers for revalidation."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    def to_response(self) -> "requests.Response":
+        """Rebuild a 200 requests.Response from the stored entry."""
+        import requests
+        from requests.structures import CaseInsensitiveDict
+
+        response = requests.Response()
+        response.status_code = 200
+        response.url = self.url
+        response.headers = CaseInsensitiveDict(self.headers)
+        response._content = self.body
+        return response
+
+
+class ResponseCache:
+    """On-disk store of GitHub responses keyed by URL, Accept and token.
+
+    Each entry is one JSON file. Hits refresh the file's mtime, and when the
+    directory grows past max_bytes the least recently used entries are removed.
+    """
+
+    def __init__(self, directory: Path = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_CACHE_MAX_BYTES):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+
+    def key_for(self, url: str, request_headers: dict[str, str]) -> str:
+        """Return the cache key for a request.
+
+        The Authorization header is part of the key so responses fetched with
+        one token are never served to another.
+        """
+        parts = [url, request_headers.get("Accept", ""), request_headers.get("Authorization", "")]
+        return hashlib.sha256("\n".join(parts).encode()).hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def load(self, key: str) -> CachedResponse | None:
+        """Return the stored entry for key, or None if missing or unreadable."""
+        try:
+            data = json.loads(self._entry_path(key).read_text())
+            return CachedResponse(
+                url=data["url"],
+                headers=data["headers"],
+                body=base64.b64decode(data["body"]),
+            )
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def touch(self, key: str) -> None:
+        """Mark an entry as recently used."""
+        try:
+            os.utime(self._entry_path(key))
+        except OSError:
+            pass
+
+    def store(self, key: str, response: "requests.Response") -> None:
+        """Persist a 200 response if it carries an ETag or Last-Modified validator."""
+        headers = {name: response.headers[name] for name in CACHED_HEADERS if name in response.headers}
+        if "ETag" not in headers and "Last-Modified" not in headers:
+            return
+        entry = {
+            "url": response.url,
+            "headers": headers,
+            "body": base64.b64encode(response.content).decode("ascii"),
+        }
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as tmp:
+            json.dump(entry, tmp)
+        os.replace(tmp_name, self._entry_path(key))
+        self.evict()
+
+    def evict(self) -> None:
+        """Delete least recently used entries until the cache fits in max_bytes."""
+        entries = []
+        for path in self.directory.glob("*.json"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+
+class GitHubClient:
+    """GitHub REST client owning a keep-alive connection pool.
+
+    The client may be shared by worker threads. With concurrent requests the
+    per-call new_connection flag is approximate, since it compares pool-wide
+    counters before and after each call.
+
+    Args:
+        token: GitHub token sent as a Bearer Authorization header
+        base_url: API root, overridable to point at a local stand-in server
+        pool_size: Maximum number of pooled connections per host
+        timeout: Per-request timeout in seconds
+        cache: Optional on-disk cache used for conditional requests
+        scheduler: Retry and rate-limit scheduler; defaults to RetryPolicy()
+    """
+
+    def __init__(
+        self,
+        token: str,
+        base_url: str = GITHUB_API_URL,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        timeout: float = DEFAULT_TIMEOUT_SECONDS,
+        cache: ResponseCache | None = None,
+        scheduler: RequestScheduler | None = None,
+    ):
+        # requests is imported here rather than at module load, so scripts
+        # that only parse arguments or read local files never pay for it
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.cache = cache
+        self.scheduler = scheduler or RequestScheduler()
+        self.stats = ClientStats()
+        self.adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session = requests.Session()
+        self.session.mount("https://", self.adapter)
+        self.session.mount("http://", self.adapter)
+        self.session.headers.update({
+            "Authorization": f"Bearer {token}",
+            "Accept": "application/vnd.github+json",
+            "X-GitHub-Api-Version": GITHUB_API_VERSION,
+        })
+
+    def __enter__(self) -> "GitHubClient":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close every pooled connection."""
+        self.session.close()
+
+    def url_for(self, path: str) -> str:
+        """Return the absolute URL for an API path such as 'repos/owner/name'."""
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    def get(self, path: str, headers: dict[str, str] | None = None) -> "requests.Response":
+        """Send a GET request through the shared pool, retrying transient failures.
+
+        Connection errors, timeouts, 5xx answers and rate-limit responses are
+        retried according to the scheduler. The last response is returned once
+        retries are exhausted; the last connection error is re-raised.
+
+        Raises:
+            RequestBudgetExceeded: If a required wait exceeds the run budget
+        """
+        import requests
+
+        attempt = 0
+        while True:
+            attempt += 1
+            self.scheduler.wait_for_rate_limit()
+            try:
+                response = self._send(path, headers, attempt)
+            except (requests.ConnectionError, requests.Timeout):
+                delay = self.scheduler.retry_delay(None, attempt)
+                if delay is None:
+                    raise
+                self._wait(delay, f"connection error on {path}")
+                continue
+
+            delay = self.scheduler.retry_delay(response, attempt)
+            if delay is None:
+                return response
+            self._wait(delay, f"HTTP {response.status_code} on {path}")
+
+    def blob_sha(self, repo_name: str, file_path: str, ref: str | None = None) -> str:
+        """Return the git blob SHA of a file at ref by listing its parent directory.
+
+        The listing is small and carries no file content, so it is much cheaper
+        than the file itself and revalidates with a 304 when nothing changed.
+        """
+        directory, _, name = file_path.rpartition("/")
+        path = f"repos/{repo_name}/contents/{directory}"
+        if ref:
+            path += f"?ref={ref}"
+
+        response = self.get(path)
+        response.raise_for_status()
+        for entry in response.json():
+            if entry["name"] == name:
+                return entry["sha"]
+        raise FileNotFoundError(f"{file_path} not found in {repo_name}")
+
+    def _wait(self, seconds: float, reason: str) -> None:
+        """Wait through the scheduler and account for it in the stats."""
+        self.scheduler.wait(seconds, reason)
+        self.stats.waited_seconds = self.scheduler.waited_seconds
+
+    def _send(self, path: str, headers: dict[str, str] | None, attempt: int) -> "requests.Response":
+        """Send a single attempt and record its stats.
+
+        When a cache is configured, stored validators are sent along and a 304
+        answer is turned back into the stored 200 response. Errors are not
+        raised for HTTP status codes; callers decide how to handle them via
+        response.raise_for_status().
+        """
+        url = self.url_for(path)
+        request_headers = dict(headers or {})
+        cache_key = cached = None
+        if self.cache is not None:
+            cache_key = self.cache.key_for(url, {**self.session.headers, **request_headers})
+            cached = self.cache.load(cache_key)
+            if cached is not None:
+                request_headers.update(cached.conditional_headers())
+
+        opened_before = self._connections_opened()
+        status = None
+        cache_hit = False
+        start = time.perf_counter()
+        with span(f"GET {path}", "http", attempt=attempt) as trace_args:
+            try:
+                response = self.session.get(url, headers=request_headers, timeout=self.timeout)
+                status = response.status_code
+                # The rate-limit headers of a 304 are current; those of the
+                # cached 200 it is turned into are not
+                self.scheduler.observe(response)
+                if cached is not None and status == 304:
+                    self.cache.touch(cache_key)
+                    cache_hit = True
+                    return cached.to_response()
+                if cache_key is not None and status == 200:
+                    self.cache.store(cache_key, response)
+                return response
+            finally:
+                new_connection = self._connections_opened() > opened_before
+                self.stats.calls.append(RequestStats(
+                    path=path,
+                    status=status,
+                    seconds=time.perf_counter() - start,
+                    new_connection=new_connection,
+                    cache_hit=cache_hit,
+                    attempt=attempt,
+                ))
+                trace_args.update(status=status, cache_hit=cache_hit, new_connection=new_connection)
+
+    def _connections_opened(self) -> int:
+        """Return the number of connections the pool has opened so far."""
+        pools = self.adapter.poolmanager.pools
+        return sum(pools[key].num_connections for key in pools.keys())
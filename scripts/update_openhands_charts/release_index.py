@@ -0,0 +1,256 @@
+#!/usr/bin/env -S uv run
+# /// script
+# requires-python = ">=3.12"
+# dependencies = ["requests"]
+# ///
+"""Persistent SQLite index of cloud releases.
+
+Maps every cloud-X.Y.Z tag of OpenHands to the SHA it points at and, once
+known, the RUNTIME_API_SHA, OPENHANDS_RUNTIME_IMAGE_TAG and other image pins
+of the matching deploy.yaml. The update script syncs it with every tag listing
+(new tags are added, moved tags updated and deleted tags removed; deploy configs
+of unchanged tags are kept) and answers tag and deploy-config lookups from it,
+so repeated runs and dry runs skip most GitHub requests.
+
+Run as a script to query the index without touching the network:
+
+    uv run scripts/update_openhands_charts/release_index.py list
+    uv run scripts/update_openhands_charts/release_index.py changes cloud-1.28.0 cloud-1.30.0
+"""
+
+import argparse
+import json
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from chart_semver import parse_release_tag
+from github_api import DEFAULT_CACHE_DIR
+
+DEFAULT_INDEX_PATH = DEFAULT_CACHE_DIR.parent / "releases.sqlite3"
+CLOUD_TAG_PREFIX = "cloud-"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS releases (
+    tag TEXT PRIMARY KEY,
+    major INTEGER NOT NULL,
+    minor INTEGER NOT NULL,
+    patch INTEGER NOT NULL,
+    commit_sha TEXT NOT NULL,
+    runtime_api_sha TEXT,
+    openhands_runtime_image_tag TEXT,
+    images TEXT,
+    indexed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS releases_by_version ON releases (major, minor, patch);
+CREATE TABLE IF NOT EXISTS tag_objects (
+    sha TEXT PRIMARY KEY,
+    commit_sha TEXT NOT NULL
+);
+"""
+COLUMNS = "tag, major, minor, patch, commit_sha, runtime_api_sha, openhands_runtime_image_tag, images"
+VERSION_ORDER = "ORDER BY major, minor, patch"
+
+
+@dataclass(frozen=True)
+class Release:
+    """One indexed cloud release; deploy fields are None until fetched."""
+
+    tag: str
+    version: tuple[int, int, int]
+    commit_sha: str
+    runtime_api_sha: str | None = None
+    openhands_runtime_image_tag: str | None = None
+    images: dict[str, str] | None = None  # every image pin of deploy.yaml, by env key
+
+    @property
+    def has_deploy_config(self) -> bool:
+        return self.runtime_api_sha is not None
+
+    @property
+    def deploy_values(self) -> dict[str, str | None]:
+        """Return the indexed image pins, RUNTIME_API_SHA and OPENHANDS_RUNTIME_IMAGE_TAG first."""
+        return {
+            "RUNTIME_API_SHA": self.runtime_api_sha,
+            "OPENHANDS_RUNTIME_IMAGE_TAG": self.openhands_runtime_image_tag,
+            **(self.images or {}),
+        }
+
+
+@dataclass(frozen=True)
+class TagChanges:
+    """Tags a sync added, moved to another commit, or removed."""
+
+    added: list[str] = field(default_factory=list)
+    moved: list[str] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+
+
+class ReleaseIndex:
+    """SQLite-backed release index, safe to share between worker threads.
+
+    Args:
+        path: Database file, or ":memory:" for a throwaway index
+    """
+
+    def __init__(self, path: Path | str = DEFAULT_INDEX_PATH):
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.executescript(SCHEMA)
+        columns = {row[1] for row in self._connection.execute("PRAGMA table_info(releases)")}
+        if "images" not in columns:
+            # Index created before image maps were stored
+            self._connection.execute("ALTER TABLE releases ADD COLUMN images TEXT")
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> "ReleaseIndex":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def _query(self, sql: str, parameters: tuple = ()) -> list[tuple]:
+        with self._lock:
+            return self._connection.execute(sql, parameters).fetchall()
+
+    def tags(self) -> set[str]:
+        return {row[0] for row in self._query("SELECT tag FROM releases")}
+
+    def sync_tags(self, tag_shas: dict[str, str]) -> TagChanges:
+        """Make the indexed tags match a full listing of tag names to commit SHAs.
+
+        Unknown tags are added. A tag whose commit changed (moved upstream)
+        gets the new SHA and loses its deploy config, which belonged to the
+        old commit. Indexed tags missing from the listing (deleted upstream)
+        are removed. Names that are not cloud-X.Y.Z tags are ignored;
+        unchanged rows keep their deploy config.
+        """
+        rows = []
+        for tag, commit_sha in tag_shas.items():
+            version = parse_release_tag(tag, CLOUD_TAG_PREFIX)
+            if version:
+                rows.append((tag, version.major, version.minor, version.patch, commit_sha, time.time()))
+        with self._lock, self._connection:
+            known = dict(self._connection.execute("SELECT tag, commit_sha FROM releases").fetchall())
+            added = [row for row in rows if row[0] not in known]
+            moved = [row for row in rows if row[0] in known and known[row[0]] != row[4]]
+            listed = {row[0] for row in rows}
+            removed = sorted(tag for tag in known if tag not in listed)
+            self._connection.executemany(
+                "INSERT INTO releases (tag, major, minor, patch, commit_sha, indexed_at) VALUES (?, ?, ?, ?, ?, ?)",
+                added,
+            )
+            self._connection.executemany(
+                "UPDATE releases SET commit_sha = ?, runtime_api_sha = NULL, openhands_runtime_image_tag = NULL, "
+                "images = NULL, indexed_at = ? WHERE tag = ?",
+                [(row[4], row[5], row[0]) for row in moved],
+            )
+            self._connection.executemany("DELETE FROM releases WHERE tag = ?", [(tag,) for tag in removed])
+        return TagChanges([row[0] for row in added], [row[0] for row in moved], removed)
+
+    def peeled_tags(self) -> dict[str, str]:
+        """Return the known annotated tag object SHAs, mapped to the commits they point at."""
+        return dict(self._query("SELECT sha, commit_sha FROM tag_objects"))
+
+    def add_peeled_tags(self, peeled: dict[str, str]) -> None:
+        """Remember which commit each annotated tag object points at; tag objects never change."""
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "INSERT OR IGNORE INTO tag_objects (sha, commit_sha) VALUES (?, ?)", peeled.items()
+            )
+
+    def set_deploy_config(
+        self,
+        tag: str,
+        runtime_api_sha: str,
+        openhands_runtime_image_tag: str,
+        images: dict[str, str] | None = None,
+    ) -> None:
+        with self._lock, self._connection:
+            self._connection.execute(
+                "UPDATE releases SET runtime_api_sha = ?, openhands_runtime_image_tag = ?, images = ? WHERE tag = ?",
+                (runtime_api_sha, openhands_runtime_image_tag, None if images is None else json.dumps(images), tag),
+            )
+
+    def get(self, tag: str) -> Release | None:
+        rows = self._query(f"SELECT {COLUMNS} FROM releases WHERE tag = ?", (tag,))
+        return _release(rows[0]) if rows else None
+
+    def latest(self) -> Release | None:
+        """Return the release with the highest version."""
+        rows = self._query(f"SELECT {COLUMNS} FROM releases ORDER BY major DESC, minor DESC, patch DESC LIMIT 1")
+        return _release(rows[0]) if rows else None
+
+    def releases(self) -> list[Release]:
+        return [_release(row) for row in self._query(f"SELECT {COLUMNS} FROM releases {VERSION_ORDER}")]
+
+    def between(self, from_tag: str, to_tag: str) -> list[Release]:
+        """Return releases with versions in the inclusive range [from_tag, to_tag]."""
+        bounds = [parse_release_tag(tag, CLOUD_TAG_PREFIX) for tag in (from_tag, to_tag)]
+        if not all(bounds):
+            raise ValueError(f"Not cloud-X.Y.Z tags: {from_tag}, {to_tag}")
+        low, high = ((version.major, version.minor, version.patch) for version in bounds)
+        rows = self._query(
+            f"SELECT {COLUMNS} FROM releases WHERE (major, minor, patch) >= (?, ?, ?) "
+            f"AND (major, minor, patch) <= (?, ?, ?) {VERSION_ORDER}",
+            (*low, *high),
+        )
+        return [_release(row) for row in rows]
+
+
+def _release(row: tuple) -> Release:
+    tag, major, minor, patch, commit_sha, runtime_api_sha, image_tag, images = row
+    images = None if images is None else json.loads(images)
+    return Release(tag, (major, minor, patch), commit_sha, runtime_api_sha, image_tag, images)
+
+
+def print_changes(releases: list[Release]) -> None:
+    """Print each release, marking deploy values that changed from the previous one."""
+    previous = None
+    for release in releases:
+        print(f"{release.tag} ({release.commit_sha[:7]})")
+        if not release.has_deploy_config:
+            print("  deploy config not indexed yet")
+            continue
+        previous_values = previous.deploy_values if previous else {}
+        for label, value in release.deploy_values.items():
+            old = previous_values.get(label)
+            marker = " (changed)" if previous and old != value else ""
+            print(f"  {label}: {value}{marker}")
+        previous = release
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Query the local index of OpenHands cloud releases.")
+    parser.add_argument(
+        "--index",
+        type=Path,
+        default=DEFAULT_INDEX_PATH,
+        help=f"Index database (default: {DEFAULT_INDEX_PATH}).",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("list", help="List every indexed release.")
+    changes = subparsers.add_parser("changes", help="Show deploy values across a range of releases.")
+    changes.add_argument("from_tag", help="First cloud tag of the range (e.g., cloud-1.28.0).")
+    changes.add_argument("to_tag", help="Last cloud tag of the range (e.g., cloud-1.30.0).")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    with ReleaseIndex(args.index) as index:
+        if args.command == "list":
+            print_changes(index.releases())
+        else:
+            print_changes(index.between(args.from_tag, args.to_tag))
+
+
+if __name__ == "__main__":
+    main()
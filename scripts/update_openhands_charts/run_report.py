@@ -0,0 +1,120 @@
+"""Machine-readable JSON Lines report of update runs.
+
+Each line is one JSON object with an "event" field:
+
+    run_start   a run began: repo, cloud tag requested, dry run
+    change      a value changed: chart, file, key, old, new, line
+    unchanged   a value was already current: chart, file, key, value, line
+    error       an error: message, plus chart and file when it belongs to one
+    skipped     the run, or one chart, was skipped: reason, plus chart for a chart
+    timing      a pipeline phase: phase, start_ms, end_ms
+    run_end     the run finished: status, changed_files, wall_ms
+
+Every line also carries the run's id and a UTC timestamp, so reports from
+many runs, charts and repositories can be appended to one file and grouped
+afterwards. Lines are flushed as they are written, so the report can be
+followed while a watch loop runs. Status is "changed", "unchanged",
+"skipped", "error" (errors were recorded) or "failed" (the run raised).
+"""
+
+import json
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import IO, Any, Protocol
+
+
+class Result(Protocol):
+    """The parts of an UpdateResult the report reads."""
+
+    changes: list[tuple[str, str, str]]
+    unchanged: list[tuple[str, str]]
+    errors: list[str]
+    locations: dict[str, int]
+
+
+class RunReport:
+    """Appends the events of one or more update runs to a JSON Lines file."""
+
+    def __init__(self, path: Path, repo: str):
+        self.path = path
+        self.repo = repo
+        self.run_id: str | None = None
+        self._file: IO[str] = open(path, "a", encoding="utf-8")
+        self._start = 0.0
+        self._changes = 0
+        self._errors = 0
+        self._skipped = False
+        self._files: list[str] = []
+
+    def __enter__(self) -> "RunReport":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._file.close()
+
+    def _emit(self, event: str, **fields: Any) -> None:
+        record = {
+            "event": event,
+            "run": self.run_id,
+            "time": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+            **fields,
+        }
+        self._file.write(json.dumps(record) + "\n")
+        self._file.flush()
+
+    def start_run(self, cloud_tag: str | None, dry_run: bool) -> None:
+        """Begin a new run; later events carry its id until the next start_run."""
+        self.run_id = uuid.uuid4().hex[:12]
+        self._start = time.perf_counter()
+        self._changes = self._errors = 0
+        self._skipped = False
+        self._files = []
+        self._emit("run_start", repo=self.repo, cloud_tag=cloud_tag, dry_run=dry_run)
+
+    def add_result(self, chart: str, file: str, result: Result) -> None:
+        """Record every change, no-op and error of one file's update."""
+        for key, old, new in result.changes:
+            self._emit("change", chart=chart, file=file, key=key, old=old, new=new, line=result.locations.get(key))
+        for key, value in result.unchanged:
+            self._emit("unchanged", chart=chart, file=file, key=key, value=value, line=result.locations.get(key))
+        for message in result.errors:
+            self.add_error(message, chart=chart, file=file)
+        self._changes += len(result.changes)
+
+    def add_error(self, message: str, chart: str | None = None, file: str | None = None) -> None:
+        self._errors += 1
+        self._emit("error", chart=chart, file=file, message=message)
+
+    def skip(self, reason: str, chart: str | None = None) -> None:
+        """Record that a chart was skipped, or without chart, that the run stopped early."""
+        if chart is None:
+            self._skipped = True
+            self._emit("skipped", reason=reason)
+        else:
+            self._emit("skipped", chart=chart, reason=reason)
+
+    def add_timings(self, phases: list[tuple[str, float, float]]) -> None:
+        """Record (name, start, end) phases, in seconds from the run start."""
+        for name, start, end in sorted(phases, key=lambda phase: phase[1]):
+            self._emit("timing", phase=name, start_ms=round(start * 1000, 3), end_ms=round(end * 1000, 3))
+
+    def add_files(self, paths: list[str]) -> None:
+        """Set the files the run changed, or would change on a dry run."""
+        self._files = list(paths)
+
+    def finish_run(self, failed: bool = False) -> None:
+        if failed:
+            status = "failed"
+        elif self._errors:
+            status = "error"
+        elif self._skipped:
+            status = "skipped"
+        else:
+            status = "changed" if self._changes else "unchanged"
+        wall_ms = round((time.perf_counter() - self._start) * 1000, 3)
+        self._emit("run_end", status=status, changed_files=self._files, wall_ms=wall_ms)
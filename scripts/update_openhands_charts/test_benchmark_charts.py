@@ -0,0 +1,107 @@
+#!/usr/bin/env -S uv run
+# /// script
+# requires-python = ">=3.12"
+# dependencies = ["ruamel.yaml", "requests", "pytest"]
+# ///
+"""Tests for benchmark_charts.py."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add the script's directory to sys.path so we can import it directly
+sys.path.insert(0, str(Path(__file__).parent))
+
+import update_openhands_charts
+from benchmark_charts import (
+    CHARTS_DIR,
+    SYNTHETIC_APP_VERSION,
+    BenchmarkResult,
+    ChartSize,
+    compare_results,
+    generate_charts,
+    load_baseline,
+    run_benchmarks,
+    save_baseline,
+)
+from conftest import get_chart_value
+from yaml_paths import index_document
+
+SMALL = ChartSize(keys=120, warm_runtimes=7, dependencies=5)
+
+
+class TestGenerateCharts:
+    """Tests for the synthetic chart generator."""
+
+    def test_inflates_values_and_dependencies(self, tmp_path):
+        charts_dir = generate_charts(tmp_path, SMALL)
+
+        for chart in ("openhands", "runtime-api"):
+            document = index_document((charts_dir / chart / "values.yaml").read_text())
+            assert len(document.find("benchmarkSection0.setting0")) == 1
+            assert len(document.find("benchmarkSection2.setting119")) == 1
+        openhands_values = index_document((charts_dir / "openhands" / "values.yaml").read_text())
+        assert len(openhands_values.find("runtime-api.warmRuntimes.configs[*].name")) == 1 + SMALL.warm_runtimes
+        original = index_document((CHARTS_DIR / "infra" / "Chart.yaml").read_text())
+        chart = index_document((charts_dir / "infra" / "Chart.yaml").read_text())
+        assert len(chart.find("dependencies[*].name")) == len(original.find("dependencies[*].name")) + SMALL.dependencies
+        assert get_chart_value(charts_dir / "openhands" / "Chart.yaml", "appVersion") == SYNTHETIC_APP_VERSION
+
+    def test_update_rules_still_match_once(self, tmp_path):
+        """Test that the inflated values.yaml files update without errors.
+
+        TDD Rationale: A generator that broke the layout would benchmark the
+        error path instead of the rewrite.
+        """
+        charts_dir = generate_charts(tmp_path, SMALL)
+
+        result = update_openhands_charts.update_runtime_api_values(
+            charts_dir / "runtime-api" / "values.yaml", "c4b5a6978d8e9f0", "cloud-1.30.0-nikolaik", dry_run=True
+        )
+
+        assert result.errors == []
+        assert result.has_changes
+
+
+class TestBaseline:
+    """Tests for saving, loading and comparing baselines."""
+
+    def test_round_trip(self, tmp_path):
+        results = {"large/process_updates": BenchmarkResult(12.5, 11.0, [11.0, 12.5, 14.0])}
+
+        save_baseline(tmp_path / "baseline.json", results, runs=3)
+
+        assert load_baseline(tmp_path / "baseline.json") == results
+
+    @pytest.mark.parametrize("current_ms,expected", [
+        pytest.param(100.0, [], id="same"),
+        pytest.param(124.0, [], id="within threshold"),
+        pytest.param(126.0, ["large/process_updates"], id="regression"),
+        pytest.param(50.0, [], id="faster"),
+    ])
+    def test_compare_flags_regressions(self, current_ms, expected):
+        baseline = {"large/process_updates": BenchmarkResult(100.0, 90.0, [100.0])}
+        current = {
+            "large/process_updates": BenchmarkResult(current_ms, current_ms, [current_ms]),
+            "huge/process_updates": BenchmarkResult(1000.0, 1000.0, [1000.0]),  # not in the baseline
+        }
+
+        assert compare_results(baseline, current, threshold=0.25) == expected
+
+
+class TestRunBenchmarks:
+    def test_times_every_benchmark(self):
+        results = run_benchmarks({"small": SMALL}, runs=1)
+
+        assert set(results) == {
+            "small/update_openhands_values",
+            "small/update_runtime_api_values",
+            "small/update_openhands_chart",
+            "small/process_updates",
+        }
+        assert all(result.min_ms > 0 and len(result.times_ms) == 1 for result in results.values())
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,92 @@
+#!/usr/bin/env -S uv run
+# /// script
+# requires-python = ">=3.12"
+# dependencies = ["pytest"]
+# ///
+"""Tests for benchmark_startup.py."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add the script's directory to sys.path so we can import it directly
+sys.path.insert(0, str(Path(__file__).parent))
+
+from benchmark_startup import (
+    CASES,
+    ImportTime,
+    StartupResult,
+    check_results,
+    heavy_imports,
+    measure,
+    parse_importtime,
+)
+
+IMPORTTIME_OUTPUT = """\
+import time: self [us] | cumulative | imported package
+import time:       350 |        350 |   _io
+import time:      1200 |       1550 | site
+usage: update_openhands_charts.py [-h]
+import time:        80 |         80 |     ruamel.yaml.nodes
+import time:       400 |        480 |   ruamel.yaml
+import time:      2000 |       2480 | yaml_paths
+"""
+
+
+class TestParseImporttime:
+    """Tests for reading -X importtime output."""
+
+    def test_parses_records_and_skips_other_output(self):
+        records = parse_importtime(IMPORTTIME_OUTPUT)
+
+        assert records == [
+            ImportTime("_io", 350, 350, 1),
+            ImportTime("site", 1200, 1550, 0),
+            ImportTime("ruamel.yaml.nodes", 80, 80, 2),
+            ImportTime("ruamel.yaml", 400, 480, 1),
+            ImportTime("yaml_paths", 2000, 2480, 0),
+        ]
+
+    def test_heavy_imports_match_packages_and_submodules(self):
+        records = parse_importtime(IMPORTTIME_OUTPUT)
+
+        assert heavy_imports(records) == ["ruamel.yaml"]
+        assert heavy_imports([ImportTime("requests_toolbelt", 1, 1, 0)]) == []
+
+
+class TestCheckResults:
+    """Tests for flagging cases that load heavy dependencies."""
+
+    def test_reports_heavy_imports_and_unexpected_exit(self):
+        case = CASES[0]
+        result = StartupResult(1.0, 1.0, 1.0, [], heavy=["requests"], exit_code=1)
+
+        assert check_results([case], {case.name: result}) == [
+            f"{case.name} imported requests",
+            f"{case.name} exited with 1, expected {case.exit_code}",
+        ]
+
+
+class TestStartup:
+    """Runs every case against the real scripts."""
+
+    @pytest.mark.parametrize("case", [pytest.param(case, id=case.name) for case in CASES])
+    def test_case_does_not_load_heavy_dependencies(self, case):
+        """Test that --help, argument errors and dry runs start without the heavy dependencies.
+
+        TDD Rationale:
+        These paths only parse arguments or print a message. Importing
+        requests, ruamel, FastAPI, uvicorn, PyGithub or asyncio on them
+        multiplies the start-up time, and a stray top-level import brings
+        that back without any test failing.
+        """
+        result = measure(case, runs=1)
+
+        assert result.heavy == []
+        assert result.exit_code == case.exit_code
+        assert result.import_ms > 0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,83 @@
+#!/usr/bin/env -S uv run
+# /// script
+# requires-python = ">=3.12"
+# dependencies = ["ruamel.yaml", "pytest"]
+# ///
+"""Unit tests for chart_graph.py."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add the script's directory to sys.path so we can import it directly
+sys.path.insert(0, str(Path(__file__).parent))
+
+from chart_graph import ChartGraphError, build_chart_graph
+
+CHARTS_DIR = Path(__file__).parent.parent.parent / "charts"
+
+
+def chart(name: str, *dependencies: str) -> str:
+    lines = [f"name: {name}", "version: 0.1.0"]
+    if dependencies:
+        lines.append("dependencies:")
+        lines += [f"  - name: {dependency}\n    version: 0.1.0" for dependency in dependencies]
+    return "\n".join(lines) + "\n"
+
+
+class TestChartGraph:
+    """Tests for the local chart dependency graph."""
+
+    def test_ignores_third_party_dependencies(self):
+        graph = build_chart_graph({
+            "openhands": chart("openhands", "postgresql", "runtime-api"),
+            "runtime-api": chart("runtime-api", "postgresql"),
+        })
+
+        assert graph.dependencies == {"openhands": ("runtime-api",), "runtime-api": ()}
+
+    def test_order_puts_dependencies_first(self):
+        graph = build_chart_graph({
+            "platform": chart("platform", "openhands"),
+            "openhands": chart("openhands", "runtime-api", "crd-check"),
+            "runtime-api": chart("runtime-api"),
+            "crd-check": chart("crd-check"),
+        })
+
+        position = {name: index for index, name in enumerate(graph.order)}
+        assert position["runtime-api"] < position["openhands"] < position["platform"]
+        assert position["crd-check"] < position["openhands"]
+
+    def test_affected_includes_transitive_dependents(self):
+        graph = build_chart_graph({
+            "platform": chart("platform", "openhands"),
+            "openhands": chart("openhands", "runtime-api"),
+            "runtime-api": chart("runtime-api"),
+            "infra": chart("infra", "crd-check"),
+            "crd-check": chart("crd-check"),
+        })
+
+        assert graph.affected({"runtime-api"}) == ["runtime-api", "openhands", "platform"]
+        assert graph.dependents("crd-check") == ["infra"]
+
+    def test_cycle_is_rejected(self):
+        with pytest.raises(ChartGraphError, match="cycle"):
+            build_chart_graph({"a": chart("a", "b"), "b": chart("b", "a")})
+
+    def test_same_contents_reuse_the_graph(self):
+        charts = {"openhands": chart("openhands", "runtime-api"), "runtime-api": chart("runtime-api")}
+
+        assert build_chart_graph(charts) is build_chart_graph(dict(reversed(charts.items())))
+
+    def test_real_charts(self):
+        """Test the graph of the charts in this repository."""
+        graph = build_chart_graph({path.parent.name: path.read_text() for path in CHARTS_DIR.glob("*/Chart.yaml")})
+
+        assert set(graph.dependencies["openhands"]) >= {"runtime-api", "automation", "plugin-directory"}
+        assert graph.dependencies["infra"] == ("crd-check",)
+        assert graph.order[-1] == "openhands"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
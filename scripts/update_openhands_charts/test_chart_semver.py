@@ -0,0 +1,152 @@
+#!/usr/bin/env -S uv run
+# /// script
+# requires-python = ">=3.12"
+# dependencies = ["pytest"]
+# ///
+"""Unit tests for chart_semver.py."""
+
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add the script's directory to sys.path so we can import it directly
+sys.path.insert(0, str(Path(__file__).parent))
+
+from chart_semver import Version, latest_tag, parse_range, parse_release_tag, parse_version, sort_tags
+
+
+class TestParseVersion:
+    """Tests for parsing and ordering versions."""
+
+    def test_parses_prerelease_and_build(self):
+        version = parse_version("1.2.3-rc.1+abc.5")
+
+        assert version == Version(1, 2, 3, ("rc", "1"), ("abc", "5"))
+        assert str(version) == "1.2.3-rc.1+abc.5"
+
+    @pytest.mark.parametrize("text", [
+        pytest.param("1.2", id="missing patch"),
+        pytest.param("1.2.3.4", id="too many parts"),
+        pytest.param("v1.2.3", id="has prefix"),
+        pytest.param("1.2.3-", id="empty pre-release"),
+        pytest.param("", id="empty string"),
+    ])
+    def test_invalid_version_raises_value_error(self, text):
+        with pytest.raises(ValueError, match="Invalid semver format"):
+            parse_version(text)
+
+    def test_precedence(self):
+        """Test the ordering example from the semver specification."""
+        ordered = ["1.0.0-alpha", "1.0.0-alpha.1", "1.0.0-alpha.beta", "1.0.0-beta", "1.0.0-beta.2",
+                   "1.0.0-beta.11", "1.0.0-rc.1", "1.0.0", "1.0.1", "1.2.0", "1.10.0", "2.0.0"]
+        shuffled = ordered[:]
+        random.Random(0).shuffle(shuffled)
+
+        assert sorted(shuffled, key=parse_version) == ordered
+
+    def test_build_metadata_does_not_affect_precedence(self):
+        assert parse_version("1.2.3+a") == parse_version("1.2.3+b")
+        assert not parse_version("1.2.3+a") < parse_version("1.2.3")
+
+    def test_parse_results_are_cached(self):
+        assert parse_version("4.5.6") is parse_version("4.5.6")
+
+
+class TestBumps:
+    """Tests for major, minor, patch and pre-release bumps."""
+
+    @pytest.mark.parametrize("version,major,minor,patch", [
+        ("1.2.3", "2.0.0", "1.3.0", "1.2.4"),
+        ("1.2.3-rc.1", "2.0.0", "1.3.0", "1.2.3"),
+        ("1.3.0-rc.1", "2.0.0", "1.3.0", "1.3.0"),
+        ("2.0.0-rc.1", "2.0.0", "2.0.0", "2.0.0"),
+        ("1.2.3+build", "2.0.0", "1.3.0", "1.2.4"),
+    ])
+    def test_release_bumps(self, version, major, minor, patch):
+        parsed = parse_version(version)
+
+        assert (str(parsed.bump_major()), str(parsed.bump_minor()), str(parsed.bump_patch())) == (major, minor, patch)
+
+    @pytest.mark.parametrize("version,label,expected", [
+        ("1.2.3", "rc", "1.2.4-rc.0"),
+        ("1.2.4-rc.0", "rc", "1.2.4-rc.1"),
+        ("1.2.4-rc", "rc", "1.2.4-rc.0"),
+        ("1.2.4-beta.3", "rc", "1.2.4-rc.0"),
+    ])
+    def test_prerelease_bump(self, version, label, expected):
+        bumped = parse_version(version).bump_prerelease(label)
+
+        assert str(bumped) == expected
+        assert bumped > parse_version(version)
+
+
+class TestParseRange:
+    """Tests for Helm-style version ranges."""
+
+    @pytest.mark.parametrize("constraint,matching,not_matching", [
+        pytest.param("15.x.x", ["15.0.0", "15.5.26"], ["14.9.9", "16.0.0"], id="x-range"),
+        pytest.param("15", ["15.2.0"], ["16.0.0"], id="partial"),
+        pytest.param("1.2.*", ["1.2.0", "1.2.9"], ["1.3.0"], id="star"),
+        pytest.param("*", ["0.0.1", "99.0.0"], [], id="any"),
+        pytest.param("1.2.3", ["1.2.3"], ["1.2.4"], id="exact"),
+        pytest.param("~1.2.3", ["1.2.3", "1.2.9"], ["1.2.2", "1.3.0"], id="tilde"),
+        pytest.param("^1.2.3", ["1.2.3", "1.9.0"], ["2.0.0"], id="caret"),
+        pytest.param("^0.2.3", ["0.2.9"], ["0.3.0"], id="caret zero major"),
+        pytest.param(">=1.0.0 <2.0.0", ["1.0.0", "1.9.9"], ["0.9.0", "2.0.0"], id="and"),
+        pytest.param(">= 1.0, < 2", ["1.5.0"], ["2.0.0"], id="commas"),
+        pytest.param(">1.2", ["1.3.0"], ["1.2.9"], id="greater than partial"),
+        pytest.param("<=1.2", ["1.2.9"], ["1.3.0"], id="at most partial"),
+        pytest.param("1.x || >=3.0.0", ["1.4.0", "3.1.0"], ["2.0.0"], id="or"),
+        pytest.param("!=1.2.3", ["1.2.4"], ["1.2.3"], id="not equal"),
+    ])
+    def test_matches(self, constraint, matching, not_matching):
+        version_range = parse_range(constraint)
+
+        assert [version for version in matching if version_range.matches(version)] == matching
+        assert [version for version in not_matching if version_range.matches(version)] == []
+
+    def test_prereleases_only_match_their_own_release(self):
+        """Test that a pre-release only matches a range naming a pre-release of the same X.Y.Z."""
+        assert not parse_range("15.x.x").matches("15.1.0-rc.1")
+        assert parse_range(">=15.1.0-rc.0").matches("15.1.0-rc.1")
+        assert not parse_range(">=15.1.0-rc.0").matches("15.2.0-rc.1")
+
+    def test_max_satisfying(self):
+        assert parse_range("~1.2.0").max_satisfying(["1.2.0", "1.2.7", "1.3.0"]) == parse_version("1.2.7")
+        assert parse_range("3.x").max_satisfying(["1.2.0"]) is None
+
+    def test_invalid_range_raises_value_error(self):
+        with pytest.raises(ValueError, match="Invalid version range"):
+            parse_range(">=1.x.3.4")
+
+
+class TestTags:
+    """Tests for sorting and selecting version tags."""
+
+    def test_sort_tags_orders_by_version(self):
+        tags = ["cloud-1.10.0", "cloud-1.9.0", "cloud-1.10.0-rc.1", "latest", "cloud-2.0.0"]
+
+        assert sort_tags(tags, "cloud-") == ["cloud-1.9.0", "cloud-1.10.0-rc.1", "cloud-1.10.0", "cloud-2.0.0"]
+        assert sort_tags(tags, "cloud-", releases_only=True) == ["cloud-1.9.0", "cloud-1.10.0", "cloud-2.0.0"]
+
+    def test_latest_tag_skips_prereleases(self):
+        assert latest_tag(["cloud-1.0.0", "cloud-1.1.0-rc.1", "cloud-1.0.1+hotfix"], "cloud-") == "cloud-1.0.0"
+        assert latest_tag(["main"], "cloud-") is None
+
+    def test_parse_release_tag(self):
+        assert parse_release_tag("cloud-1.2.3", "cloud-") == Version(1, 2, 3)
+        assert parse_release_tag("cloud-1.2.3-rc.1", "cloud-") is None
+        assert parse_release_tag("1.2.3", "cloud-") is None
+
+    def test_sorts_thousands_of_tags(self):
+        tags = [f"cloud-{major}.{minor}.{patch}" for major in range(3) for minor in range(40) for patch in range(25)]
+        shuffled = tags[:]
+        random.Random(0).shuffle(shuffled)
+
+        assert sort_tags(shuffled, "cloud-") == tags
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,236 @@
+#!/usr/bin/env -S uv run
+# /// script
+# requires-python = ">=3.12"
+# dependencies = ["ruamel.yaml", "requests", "pytest"]
+# ///
+"""Tests for fake_github_api.py and end-to-end update runs over HTTP against it."""
+
+import json
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# Add the script's directory to sys.path so we can import it directly
+sys.path.insert(0, str(Path(__file__).parent))
+
+from conftest import assert_file_contains, get_chart_value, get_dependency_version
+from fake_github_api import (
+    EndpointBehavior,
+    FakeGitHubAPI,
+    RateLimit,
+    git_blob_sha,
+    run_benchmark,
+)
+from github_api import GitHubClient, RequestBudgetExceeded, RequestScheduler, ResponseCache, RetryPolicy
+from trace_events import start_tracing, stop_tracing
+from update_openhands_charts import (
+    DEPLOY_REPO,
+    DEPLOY_WORKFLOW_PATH,
+    OPENHANDS_REPO,
+    DeployEnvCache,
+    cloud_tag_exists,
+    fetch_deploy_config,
+    get_latest_cloud_tag,
+    process_updates,
+)
+
+# Latest release in fixtures/github_api.json
+FIXTURE_LATEST_TAG = "cloud-1.30.0"
+FIXTURE_LATEST_RUNTIME_API_SHA = "c4b5a6978d8e9f0a1b2c3d4e5f6a7b8c9d0e1f2a"
+
+
+@pytest.fixture
+def fake_api():
+    """A running fake GitHub API serving the default fixture."""
+    with FakeGitHubAPI.from_fixture() as api:
+        yield api
+
+
+def _client(api: FakeGitHubAPI, **kwargs) -> GitHubClient:
+    kwargs.setdefault("scheduler", RequestScheduler(sleep=lambda seconds: None))
+    return GitHubClient("fake-token", base_url=api.url, **kwargs)
+
+
+class TestFakeGitHubAPIEndpoints:
+    """Tests that the stand-in answers the endpoints the update script uses."""
+
+    def test_latest_cloud_tag(self, fake_api):
+        """Test matching-refs serves only cloud- tags and the latest is chosen."""
+        with _client(fake_api) as client:
+            assert get_latest_cloud_tag(client, OPENHANDS_REPO) == FIXTURE_LATEST_TAG
+
+    @pytest.mark.parametrize("tag,expected", [
+        pytest.param(FIXTURE_LATEST_TAG, True, id="existing"),
+        pytest.param("cloud-9.9.9", False, id="missing"),
+    ])
+    def test_cloud_tag_exists(self, fake_api, tag, expected):
+        with _client(fake_api) as client:
+            assert cloud_tag_exists(client, OPENHANDS_REPO, tag) is expected
+
+    def test_deploy_config_uses_listing_and_raw_file(self, fake_api):
+        """Test the listing reports git blob SHAs and the file is served raw."""
+        with _client(fake_api) as client:
+            config = fetch_deploy_config(client, DEPLOY_REPO, "1.30.0")
+            listing = client.get(f"repos/{DEPLOY_REPO}/contents/.github/workflows?ref=1.30.0").json()
+            raw = client.get(
+                f"repos/{DEPLOY_REPO}/contents/{DEPLOY_WORKFLOW_PATH}?ref=1.30.0",
+                headers={"Accept": "application/vnd.github.raw+json"},
+            ).text
+
+        assert config.runtime_api_sha == FIXTURE_LATEST_RUNTIME_API_SHA
+        assert config.openhands_runtime_image_tag == "1.30.0-nikolaik"
+        assert {entry["name"]: entry["sha"] for entry in listing}["deploy.yaml"] == git_blob_sha(raw)
+
+    def test_unknown_paths_return_404(self, fake_api):
+        with _client(fake_api) as client:
+            assert client.get("repos/someone/else/git/ref/tags/x").status_code == 404
+            assert client.get("rate_limit").status_code == 404
+
+    def test_answers_conditional_requests_with_304(self, fake_api, tmp_path):
+        """Test ETags round-trip so the response cache is exercised for real."""
+        cache = ResponseCache(tmp_path)
+        with _client(fake_api, cache=cache) as client:
+            get_latest_cloud_tag(client, OPENHANDS_REPO)
+        with _client(fake_api, cache=cache) as client:
+            get_latest_cloud_tag(client, OPENHANDS_REPO)
+
+        assert [status for _, _, status in fake_api.requests] == [200, 304]
+
+
+class TestInjectedBehavior:
+    """Tests for per-endpoint latency, errors and rate limits."""
+
+    def test_latency_applies_per_endpoint(self):
+        with FakeGitHubAPI.from_fixture(
+            behaviors={"git-ref": EndpointBehavior(latency_seconds=0.1)}
+        ) as api, _client(api) as client:
+            start = time.perf_counter()
+            get_latest_cloud_tag(client, OPENHANDS_REPO)
+            untouched = time.perf_counter() - start
+            start = time.perf_counter()
+            cloud_tag_exists(client, OPENHANDS_REPO, FIXTURE_LATEST_TAG)
+            delayed = time.perf_counter() - start
+
+        assert delayed >= 0.1
+        assert untouched < 0.1
+
+    def test_injected_errors_are_retried_by_the_client(self):
+        """Test that a flaky endpoint is survived via client retries.
+
+        TDD Rationale: Error injection is seeded, so the number of failed
+        attempts before success is deterministic.
+        """
+        with FakeGitHubAPI.from_fixture(
+            behaviors={"matching-refs": EndpointBehavior(error_rate=0.5, error_status=503)}, seed=1
+        ) as api, _client(api) as client:
+            assert get_latest_cloud_tag(client, OPENHANDS_REPO) == FIXTURE_LATEST_TAG
+            statuses = [status for _, _, status in api.requests]
+
+        assert statuses[-1] == 200
+        assert set(statuses[:-1]) <= {503}
+
+    def test_rate_limit_headers_count_down(self, fake_api):
+        with _client(fake_api) as client:
+            first = client.get(f"repos/{OPENHANDS_REPO}/git/ref/tags/{FIXTURE_LATEST_TAG}")
+            second = client.get(f"repos/{OPENHANDS_REPO}/git/ref/tags/{FIXTURE_LATEST_TAG}")
+
+        assert int(first.headers["X-RateLimit-Remaining"]) - int(second.headers["X-RateLimit-Remaining"]) == 1
+
+    def test_exhausted_rate_limit_returns_403(self):
+        """Test that requests beyond the budget get GitHub's rate-limit answer."""
+        api = FakeGitHubAPI.from_fixture(rate_limit=RateLimit(limit=1, remaining=0))
+
+        response = api.handle(f"/repos/{OPENHANDS_REPO}/git/ref/tags/{FIXTURE_LATEST_TAG}", {})
+
+        assert response.status == 403
+        assert response.headers["X-RateLimit-Remaining"] == "0"
+        assert int(response.headers["X-RateLimit-Reset"]) > time.time()
+
+    def test_client_stops_before_exceeding_rate_limit(self):
+        """Test that the client reads the headers and waits rather than sending.
+
+        TDD Rationale: After the last request in the window reports zero
+        remaining, the scheduler must not spend a request on a known 403.
+        With a reset an hour away, the wait exceeds the budget instead.
+        """
+        rate_limit = RateLimit(limit=1, remaining=1)
+        scheduler = RequestScheduler(RetryPolicy(budget_seconds=5), sleep=lambda seconds: None)
+        with FakeGitHubAPI.from_fixture(rate_limit=rate_limit) as api, _client(api, scheduler=scheduler) as client:
+            get_latest_cloud_tag(client, OPENHANDS_REPO)
+            with pytest.raises(RequestBudgetExceeded):
+                client.get(f"repos/{OPENHANDS_REPO}/git/ref/tags/{FIXTURE_LATEST_TAG}")
+
+        assert len(api.requests) == 1
+
+
+class TestEndToEndUpdate:
+    """Full process_updates runs over HTTP against the stand-in server."""
+
+    def test_updates_all_charts(self, fake_api, chart_paths, capsys):
+        """Test a full update writes every chart and needs three requests."""
+        with _client(fake_api) as client:
+            process_updates(client, env_cache=DeployEnvCache(directory=None))
+
+        assert get_chart_value(chart_paths["CHART_PATH"], "appVersion") == FIXTURE_LATEST_TAG
+        assert_file_contains(chart_paths["RUNTIME_API_VALUES_PATH"], "sha-c4b5a69")
+        assert fake_api.request_counts == {"matching-refs": 1, "contents": 2}
+        assert "Phase timings" in capsys.readouterr().out
+
+    def test_trace_records_requests_and_update_steps(self, fake_api, chart_paths, tmp_path):
+        """Test that a traced run shows each request inside the step that sent it."""
+        tracer = start_tracing()
+        try:
+            with _client(fake_api) as client:
+                process_updates(client, dry_run=True, env_cache=DeployEnvCache(directory=None))
+        finally:
+            stop_tracing()
+        tracer.write(tmp_path / "trace.json")
+
+        events = json.loads((tmp_path / "trace.json").read_text())["traceEvents"]
+        spans = [event for event in events if event["ph"] == "X"]
+        names = {event["name"] for event in spans}
+        assert {"resolve_openhands_version", "fetch_deploy_config", "update_chart_workflow", "write_chart_files"} <= names
+        assert "rewrite tags" in names
+        requests = [event for event in spans if event["cat"] == "http"]
+        assert len(requests) == 3 and all(event["args"]["status"] == 200 for event in requests)
+        resolve = next(event for event in spans if event["name"] == "resolve_openhands_version")
+        assert any(
+            event["tid"] == resolve["tid"] and resolve["ts"] <= event["ts"] <= resolve["ts"] + resolve["dur"]
+            for event in requests
+        )
+        assert {event["name"] for event in events if event["ph"] == "b"} >= {"resolve cloud tag", "write chart files"}
+
+    def test_updates_subcharts_from_the_same_fetch(self, fake_api, chart_paths, subchart_paths):
+        """Test that the sub-chart pins come from the one deploy.yaml download."""
+        with _client(fake_api) as client:
+            process_updates(client, env_cache=DeployEnvCache(directory=None))
+
+        assert_file_contains(subchart_paths["automation"] / "values.yaml", "tag: sha-d82e4f1")
+        assert_file_contains(subchart_paths["integrations-hub"] / "values.yaml", "tag: 0.2.0")
+        assert get_dependency_version(chart_paths["CHART_PATH"], "automation") == "0.1.10"
+        assert get_dependency_version(chart_paths["CHART_PATH"], "plugin-directory") == "0.1.9"
+        assert fake_api.request_counts == {"matching-refs": 1, "contents": 2}
+
+    def test_explicit_tag_makes_existence_check(self, fake_api, chart_paths):
+        with _client(fake_api) as client:
+            process_updates(client, cloud_tag="cloud-1.29.0", env_cache=DeployEnvCache(directory=None))
+
+        assert get_chart_value(chart_paths["CHART_PATH"], "appVersion") == "cloud-1.29.0"
+        assert fake_api.request_counts == {"git-ref": 1, "contents": 2}
+
+
+class TestBenchmark:
+    def test_reports_each_run(self):
+        """Test benchmark mode returns timings and request counts per run."""
+        results = run_benchmark(runs=2, use_cache=True)
+
+        assert len(results) == 2
+        assert all(run.requests == 3 for run in results)
+        assert results[0].cache_hits == 0
+        assert results[1].cache_hits == 3
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
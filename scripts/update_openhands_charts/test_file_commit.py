@@ -0,0 +1,102 @@
+#!/usr/bin/env -S uv run
+# /// script
+# requires-python = ">=3.12"
+# dependencies = ["pytest"]
+# ///
+"""Unit tests for file_commit.py."""
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add the script's directory to sys.path so we can import it directly
+sys.path.insert(0, str(Path(__file__).parent))
+
+import file_commit
+from file_commit import commit_files
+
+
+@pytest.fixture
+def files(tmp_path):
+    """Two chart directories, each with a Chart.yaml and a values.yaml."""
+    paths = {}
+    for chart in ("openhands", "runtime-api"):
+        (tmp_path / chart).mkdir()
+        for name in ("Chart.yaml", "values.yaml"):
+            path = tmp_path / chart / name
+            path.write_text(f"{chart} {name} old\n")
+            paths[path] = path.read_text()
+    return paths
+
+
+def listing(tmp_path):
+    return sorted(str(path.relative_to(tmp_path)) for path in tmp_path.rglob("*"))
+
+
+class TestCommitFiles:
+    """Tests for replacing several files together."""
+
+    def test_replaces_every_file(self, files, tmp_path):
+        before = listing(tmp_path)
+
+        commit_files({path: content.replace("old", "new") for path, content in files.items()})
+
+        assert all(path.read_text().endswith("new\n") for path in files)
+        assert listing(tmp_path) == before  # no temporary files left behind
+
+    def test_keeps_file_permissions(self, files):
+        path = next(iter(files))
+        path.chmod(0o640)
+
+        commit_files({path: "new\n"})
+
+        assert path.stat().st_mode & 0o777 == 0o640
+
+    def test_syncs_each_directory_once(self, files, monkeypatch):
+        synced = []
+        monkeypatch.setattr(file_commit, "_sync_directory", synced.append)
+
+        commit_files({path: "new\n" for path in files})
+
+        assert sorted(synced) == sorted({path.parent for path in files})
+
+    def test_write_failure_leaves_every_file_untouched(self, files, tmp_path):
+        """Test that nothing is replaced when one temporary file cannot be written.
+
+        TDD Rationale: The runtime-api files are written before the openhands
+        files; a failure on the last file must not leave a half-bumped tree.
+        """
+        before = listing(tmp_path)
+        changes = {path: "new\n" for path in files}
+        changes[tmp_path / "missing" / "Chart.yaml"] = "new\n"
+
+        with pytest.raises(OSError):
+            commit_files(changes)
+
+        assert {path: path.read_text() for path in files} == files
+        assert listing(tmp_path) == before
+
+    def test_rename_failure_restores_replaced_files(self, files, tmp_path, monkeypatch):
+        replace = os.replace
+        calls = []
+
+        def _fail_second(source, target):
+            calls.append(target)
+            if len(calls) == 2:
+                raise OSError("disk full")
+            replace(source, target)
+
+        monkeypatch.setattr(file_commit.os, "replace", _fail_second)
+        before = listing(tmp_path)
+
+        with pytest.raises(OSError, match="disk full"):
+            commit_files({path: "new\n" for path in files}, originals=files)
+
+        assert {path: path.read_text() for path in files} == files
+        assert listing(tmp_path) == before
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,267 @@
+#!/usr/bin/env -S uv run
+# /// script
+# requires-python = ">=3.12"
+# dependencies = ["ruamel.yaml", "requests", "pytest"]
+# ///
+"""Unit tests for git_backend.py, run offline against fixture repositories."""
+
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add the script's directory to sys.path so we can import it directly
+sys.path.insert(0, str(Path(__file__).parent))
+
+from git_backend import GitError, GitRepository, LocalReleaseSource
+from update_openhands_charts import (
+    DEPLOY_REPO,
+    DEPLOY_WORKFLOW_PATH,
+    OPENHANDS_REPO,
+    DeployEnvCache,
+    cloud_tag_exists,
+    fetch_deploy_config,
+    get_latest_cloud_tag,
+)
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None, reason="git is not installed")
+
+DEPLOY_WORKFLOW = """\
+name: deploy
+env:
+  RUNTIME_API_SHA: {runtime_api_sha}
+  OPENHANDS_RUNTIME_IMAGE_TAG: "{image_tag}"
+jobs:
+  deploy:
+    runs-on: ubuntu-latest
+"""
+
+
+def _git(cwd: Path, *args: str) -> str:
+    result = subprocess.run(
+        ["git", "-c", "user.name=Test", "-c", "user.email=test@example.com", *args],
+        cwd=cwd,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return result.stdout
+
+
+def _commit_and_tag(work_tree: Path, files: dict[str, str], tag: str) -> None:
+    for relative_path, content in files.items():
+        path = work_tree / relative_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+    _git(work_tree, "add", "-A")
+    _git(work_tree, "commit", "--quiet", "-m", tag)
+    _git(work_tree, "tag", "-a", tag, "-m", tag)
+
+
+@pytest.fixture
+def upstream(tmp_path):
+    """Create "remote" OpenHands and deploy repositories with tagged history.
+
+    Returns a dict with the work tree of each repository, keyed by repo name.
+    """
+    openhands = tmp_path / "upstream" / "openhands"
+    deploy = tmp_path / "upstream" / "deploy"
+    for work_tree in (openhands, deploy):
+        work_tree.mkdir(parents=True)
+        _git(work_tree, "init", "--quiet", "--initial-branch=main")
+        _git(work_tree, "config", "uploadpack.allowFilter", "true")
+
+    for tag in ("cloud-1.9.0", "cloud-1.10.0", "cloud-1.2.0", "v1.99.0"):
+        _commit_and_tag(openhands, {"VERSION": tag}, tag)
+
+    _commit_and_tag(deploy, {DEPLOY_WORKFLOW_PATH: DEPLOY_WORKFLOW.format(
+        runtime_api_sha="aaa111", image_tag="1.9.0-nikolaik"
+    )}, "1.9.0")
+    # Only an unrelated file changes, so deploy.yaml keeps its blob
+    _commit_and_tag(deploy, {"README.md": "notes"}, "1.9.1")
+    _commit_and_tag(deploy, {DEPLOY_WORKFLOW_PATH: DEPLOY_WORKFLOW.format(
+        runtime_api_sha="bbb222", image_tag="1.10.0-nikolaik"
+    )}, "1.10.0")
+    return {OPENHANDS_REPO: openhands, DEPLOY_REPO: deploy}
+
+
+@pytest.fixture
+def source(upstream, tmp_path):
+    """Blobless clones of the upstream fixtures wrapped in a LocalReleaseSource."""
+    repositories = {
+        repo_name: GitRepository.clone(work_tree.as_uri(), tmp_path / "clones" / f"{repo_name}.git")
+        for repo_name, work_tree in upstream.items()
+    }
+    with LocalReleaseSource(repositories) as release_source:
+        yield release_source
+
+
+class TestGitRepository:
+    """Tests for the git plumbing wrapper."""
+
+    def test_clone_is_blobless(self, source):
+        """Test that clones are partial clones with a blob:none filter.
+
+        TDD Rationale: Full clones of OpenHands are large; only refs, commits
+        and trees are needed to list tags and resolve blob SHAs.
+        """
+        git_dir = source.repository(DEPLOY_REPO).git_dir
+        result = subprocess.run(
+            ["git", "--git-dir", str(git_dir), "config", "remote.origin.partialclonefilter"],
+            capture_output=True,
+            text=True,
+        )
+        assert result.stdout.strip() == "blob:none"
+
+    def test_list_tags_filters_by_pattern(self, source):
+        """Test that for-each-ref patterns select only cloud tags."""
+        tags = source.repository(OPENHANDS_REPO).list_tags("cloud-*")
+
+        assert sorted(tags) == ["cloud-1.10.0", "cloud-1.2.0", "cloud-1.9.0"]
+
+    def test_list_tag_refs_peels_annotated_tags(self, source, upstream):
+        """Test that tag refs resolve to commit SHAs, not tag object SHAs."""
+        commit = _git(upstream[OPENHANDS_REPO], "rev-parse", "cloud-1.10.0^{commit}").strip()
+
+        refs = source.repository(OPENHANDS_REPO).list_tag_refs("cloud-*")
+
+        assert refs["cloud-1.10.0"] == commit
+
+    @pytest.mark.parametrize("tag,expected", [
+        pytest.param("cloud-1.10.0", True, id="existing"),
+        pytest.param("cloud-1.10", False, id="prefix_of_existing"),
+        pytest.param("cloud-9.9.9", False, id="missing"),
+    ])
+    def test_tag_exists(self, source, tag, expected):
+        """Test exact tag lookups, including prefixes of real tags."""
+        assert source.repository(OPENHANDS_REPO).tag_exists(tag) is expected
+
+    def test_reads_many_specs_through_one_process(self, source):
+        """Test that repeated reads reuse a single cat-file --batch process.
+
+        TDD Rationale: Spawning git per lookup would dominate backfills that
+        touch hundreds of tags.
+        """
+        repository = source.repository(DEPLOY_REPO)
+
+        repository.read_blob(f"1.9.0:{DEPLOY_WORKFLOW_PATH}")
+        process = repository._batch
+        repository.read_blob(f"1.10.0:{DEPLOY_WORKFLOW_PATH}")
+        repository.read_blob("1.10.0:README.md")
+
+        assert repository._batch is process
+        assert process.poll() is None
+
+    def test_missing_spec_returns_none_and_keeps_process_usable(self, source):
+        """Test that a missing object does not desynchronise the batch stream."""
+        repository = source.repository(DEPLOY_REPO)
+
+        assert repository.read_blob("1.9.0:no/such/file") is None
+        assert repository.read_blob("1.9.0:README.md") is None
+        assert b"RUNTIME_API_SHA: aaa111" in repository.read_blob(f"1.9.0:{DEPLOY_WORKFLOW_PATH}")
+
+    def test_object_id_does_not_fetch_missing_blobs(self, source, upstream):
+        """Test that resolving a blob id works with origin unreachable.
+
+        TDD Rationale: blob_sha only needs the tree entry; a lookup that
+        fetched the blob would download every deploy.yaml a backfill touches.
+        """
+        repository = source.repository(DEPLOY_REPO)
+        _git(repository.git_dir, "config", "remote.origin.url", "/nonexistent/deploy.git")
+
+        object_id = repository.object_id(f"1.9.0:{DEPLOY_WORKFLOW_PATH}")
+
+        assert object_id == _git(upstream[DEPLOY_REPO], "rev-parse", f"1.9.0:{DEPLOY_WORKFLOW_PATH}").strip()
+        assert repository.object_id("1.9.0:no/such/file") is None
+        assert repository.read_blob(f"1.9.0:{DEPLOY_WORKFLOW_PATH}") is None
+
+    def test_fetch_picks_up_new_tags(self, source, upstream):
+        """Test that fetch brings in tags created after the clone."""
+        _commit_and_tag(upstream[OPENHANDS_REPO], {"VERSION": "next"}, "cloud-1.11.0")
+        repository = source.repository(OPENHANDS_REPO)
+
+        repository.fetch()
+
+        assert repository.tag_exists("cloud-1.11.0")
+
+    def test_run_git_raises_on_failure(self, tmp_path):
+        """Test that git failures surface as GitError with git's message."""
+        with pytest.raises(GitError, match="failed"):
+            GitRepository(tmp_path / "missing.git").fetch()
+
+
+class TestLocalReleaseSource:
+    """Tests for LocalReleaseSource lookups keyed by repository name."""
+
+    def test_blob_sha_is_stable_when_file_unchanged(self, source):
+        """Test that tags sharing deploy.yaml report the same blob SHA."""
+        first = source.blob_sha(DEPLOY_REPO, DEPLOY_WORKFLOW_PATH, "1.9.0")
+
+        assert source.blob_sha(DEPLOY_REPO, DEPLOY_WORKFLOW_PATH, "1.9.1") == first
+        assert source.blob_sha(DEPLOY_REPO, DEPLOY_WORKFLOW_PATH, "1.10.0") != first
+
+    def test_missing_file_raises(self, source):
+        """Test that a path absent at the ref raises FileNotFoundError."""
+        with pytest.raises(FileNotFoundError):
+            source.read_file(DEPLOY_REPO, "no/such/file", "1.9.0")
+
+    def test_unknown_repository_raises(self, source):
+        """Test that lookups for an unconfigured repository fail clearly."""
+        with pytest.raises(GitError, match="No local clone configured"):
+            source.list_tag_refs("someone/else", "cloud-")
+
+    def test_open_clones_missing_and_fetches_existing(self, upstream, tmp_path, monkeypatch):
+        """Test that open() clones on first use and fetches afterwards."""
+        monkeypatch.setattr("git_backend.GITHUB_CLONE_URL", upstream[OPENHANDS_REPO].as_uri())
+        clones_dir = tmp_path / "clones"
+
+        with LocalReleaseSource.open(clones_dir, [OPENHANDS_REPO]) as first:
+            assert first.tag_exists(OPENHANDS_REPO, "cloud-1.10.0")
+        _commit_and_tag(upstream[OPENHANDS_REPO], {"VERSION": "next"}, "cloud-1.11.0")
+        with LocalReleaseSource.open(clones_dir, [OPENHANDS_REPO], fetch=False) as stale:
+            assert not stale.tag_exists(OPENHANDS_REPO, "cloud-1.11.0")
+        with LocalReleaseSource.open(clones_dir, [OPENHANDS_REPO]) as fresh:
+            assert fresh.tag_exists(OPENHANDS_REPO, "cloud-1.11.0")
+
+
+class TestUpdateScriptWithLocalClones:
+    """Tests that the update script's lookups work unchanged on local clones."""
+
+    def test_get_latest_cloud_tag(self, source):
+        """Test that the latest tag is chosen by version, not lexically."""
+        assert get_latest_cloud_tag(source, OPENHANDS_REPO) == "cloud-1.10.0"
+
+    def test_cloud_tag_exists(self, source):
+        assert cloud_tag_exists(source, OPENHANDS_REPO, "cloud-1.9.0")
+        assert not cloud_tag_exists(source, OPENHANDS_REPO, "cloud-9.9.9")
+
+    @pytest.mark.parametrize("ref,runtime_api_sha,image_tag", [
+        pytest.param("1.9.0", "aaa111", "1.9.0-nikolaik", id="first_release"),
+        pytest.param("1.9.1", "aaa111", "1.9.0-nikolaik", id="unchanged_workflow"),
+        pytest.param("1.10.0", "bbb222", "1.10.0-nikolaik", id="changed_workflow"),
+    ])
+    def test_fetch_deploy_config(self, source, ref, runtime_api_sha, image_tag):
+        """Test that deploy config is read from the tagged workflow file."""
+        config = fetch_deploy_config(source, DEPLOY_REPO, ref)
+
+        assert config.runtime_api_sha == runtime_api_sha
+        assert config.openhands_runtime_image_tag == image_tag
+
+    def test_env_cache_skips_blob_read_for_known_sha(self, source, monkeypatch):
+        """Test that a cached blob SHA avoids reading the blob again."""
+        env_cache = DeployEnvCache(directory=None)
+        fetch_deploy_config(source, DEPLOY_REPO, "1.9.0", env_cache)
+
+        def fail_read(*args):
+            raise AssertionError("blob should come from the env cache")
+
+        monkeypatch.setattr(source, "read_file", fail_read)
+        config = fetch_deploy_config(source, DEPLOY_REPO, "1.9.1", env_cache)
+
+        assert config.runtime_api_sha == "aaa111"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,577 @@
+#!/usr/bin/env -S uv run
+# /// script
+# requires-python = ">=3.12"
+# dependencies = ["ruamel.yaml", "requests", "pytest"]
+# ///
+"""Unit tests for github_api.py."""
+
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+# Add the script's directory to sys.path so we can import it directly
+sys.path.insert(0, str(Path(__file__).parent))
+
+import requests
+
+from github_api import (
+    ClientStats,
+    GitHubClient,
+    RequestBudgetExceeded,
+    RequestScheduler,
+    RequestStats,
+    ResponseCache,
+    RetryPolicy,
+)
+
+
+class _JsonHandler(BaseHTTPRequestHandler):
+    """Keep-alive handler that echoes the request path as JSON."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = json.dumps({"path": self.path}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class _ConditionalHandler(BaseHTTPRequestHandler):
+    """Keep-alive handler serving one resource with ETag/Last-Modified validators.
+
+    Tests mutate the class attributes on a per-test subclass to change the
+    resource or drop validators.
+    """
+
+    protocol_version = "HTTP/1.1"
+    body = b'{"version": 1}'
+    etag: str | None = '"v1"'
+    last_modified: str | None = None
+    rate_limit_remaining: int | None = None  # counted down and sent with every response when set
+    received_headers: list[dict[str, str]] = []
+
+    def do_GET(self):
+        self.received_headers.append(dict(self.headers))
+        not_modified = (
+            (self.etag and self.headers.get("If-None-Match") == self.etag)
+            or (self.last_modified and self.headers.get("If-Modified-Since") == self.last_modified)
+        )
+        self.send_response(304 if not_modified else 200)
+        if self.rate_limit_remaining is not None:
+            type(self).rate_limit_remaining -= 1
+            self.send_header("X-RateLimit-Remaining", str(self.rate_limit_remaining))
+        if self.etag:
+            self.send_header("ETag", self.etag)
+        if self.last_modified:
+            self.send_header("Last-Modified", self.last_modified)
+        if not_modified:
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(self.body)))
+        self.end_headers()
+        self.wfile.write(self.body)
+
+    def log_message(self, *args):
+        pass
+
+
+class _SequenceHandler(BaseHTTPRequestHandler):
+    """Keep-alive handler answering requests from a scripted list of responses.
+
+    Each entry is (status, headers, body); the last entry repeats once the
+    list is exhausted.
+    """
+
+    protocol_version = "HTTP/1.1"
+    responses: list[tuple[int, dict[str, str], bytes]] = []
+
+    def do_GET(self):
+        status, headers, body = self.responses.pop(0) if len(self.responses) > 1 else self.responses[0]
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+DEFAULT_TEST_BUDGET = 300.0
+
+
+def _make_response(status: int, headers: dict[str, str] | None = None, text: str = "") -> requests.Response:
+    """Build a requests.Response without any network traffic."""
+    response = requests.Response()
+    response.status_code = status
+    response.headers.update(headers or {})
+    response._content = text.encode()
+    return response
+
+
+def _serve(handler_class):
+    """Start handler_class on a free localhost port; return (url, server)."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler_class)
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True)
+    thread.start()
+    return f"http://127.0.0.1:{server.server_address[1]}", server
+
+
+@pytest.fixture
+def local_api_url():
+    """Serve a keep-alive JSON endpoint on localhost for the duration of a test."""
+    url, server = _serve(_JsonHandler)
+    yield url
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def conditional_server():
+    """Serve a resource with validators; yields (url, handler class)."""
+    handler = type("Handler", (_ConditionalHandler,), {"received_headers": []})
+    url, server = _serve(handler)
+    yield url, handler
+    server.shutdown()
+    server.server_close()
+
+
+class TestGitHubClient:
+    """Tests for GitHubClient request handling."""
+
+    def test_sets_github_headers_on_session(self):
+        """Verify token and API headers are shared by every request."""
+        with GitHubClient("secret") as client:
+            assert client.session.headers["Authorization"] == "Bearer secret"
+            assert client.session.headers["Accept"] == "application/vnd.github+json"
+
+    @pytest.mark.parametrize("base_url,path,expected", [
+        ("https://api.github.com", "repos/o/r", "https://api.github.com/repos/o/r"),
+        ("https://api.github.com/", "/repos/o/r", "https://api.github.com/repos/o/r"),
+        ("http://127.0.0.1:8080", "repos/o/r?ref=1.0.0", "http://127.0.0.1:8080/repos/o/r?ref=1.0.0"),
+    ])
+    def test_url_for_joins_base_and_path(self, base_url, path, expected):
+        """Verify API paths are joined to the base URL with exactly one slash."""
+        with GitHubClient("token", base_url=base_url) as client:
+            assert client.url_for(path) == expected
+
+    def test_returns_response_from_server(self, local_api_url):
+        """Verify GET returns the server response unchanged."""
+        with GitHubClient("token", base_url=local_api_url) as client:
+            response = client.get("repos/owner/repo")
+
+        assert response.status_code == 200
+        assert response.json() == {"path": "/repos/owner/repo"}
+
+
+    @pytest.fixture
+    def listing_server(self):
+        """Serve one directory listing; yields (url, handler class)."""
+        listing = json.dumps([{"name": "ci.yaml", "sha": "1" * 40}, {"name": "deploy.yaml", "sha": "2" * 40}])
+        handler = type("Handler", (_SequenceHandler,), {"responses": [(200, {}, listing.encode())]})
+        url, server = _serve(handler)
+        yield url
+        server.shutdown()
+        server.server_close()
+
+    def test_blob_sha_reads_the_directory_listing(self, listing_server):
+        with GitHubClient("token", base_url=listing_server) as client:
+            assert client.blob_sha("owner/repo", ".github/workflows/deploy.yaml", "1.0.0") == "2" * 40
+            with pytest.raises(FileNotFoundError):
+                client.blob_sha("owner/repo", ".github/workflows/missing.yaml")
+
+        assert [call.path for call in client.stats.calls] == [
+            "repos/owner/repo/contents/.github/workflows?ref=1.0.0",
+            "repos/owner/repo/contents/.github/workflows",
+        ]
+
+
+class TestConnectionReuse:
+    """Tests for connection pooling and per-call statistics.
+
+    These run against a real keep-alive server on localhost so the pool
+    counters reflect actual socket usage rather than mocked behavior.
+    """
+
+    def test_first_request_opens_connection_and_later_requests_reuse_it(self, local_api_url):
+        """Verify one handshake serves every sequential request of a run."""
+        with GitHubClient("token", base_url=local_api_url) as client:
+            for index in range(3):
+                client.get(f"repos/owner/repo/{index}")
+
+        assert [call.new_connection for call in client.stats.calls] == [True, False, False]
+        assert client.stats.connections_opened == 1
+        assert client.stats.connections_reused == 2
+
+    def test_records_path_status_and_latency_per_call(self, local_api_url):
+        """Verify every call is recorded with its own latency."""
+        with GitHubClient("token", base_url=local_api_url) as client:
+            client.get("repos/owner/repo")
+
+        (call,) = client.stats.calls
+        assert call.path == "repos/owner/repo"
+        assert call.status == 200
+        assert call.seconds > 0
+
+    def test_records_failed_requests(self):
+        """Verify a request that raises is still recorded, with no status."""
+        scheduler = RequestScheduler(RetryPolicy(max_attempts=1))
+        with GitHubClient("token", base_url="http://127.0.0.1:1", timeout=1, scheduler=scheduler) as client:
+            with pytest.raises(Exception):
+                client.get("repos/owner/repo")
+
+        assert client.stats.request_count == 1
+        assert client.stats.calls[0].status is None
+
+
+class TestResponseCache:
+    """Tests for conditional requests backed by the on-disk ResponseCache.
+
+    Run against a localhost server that honours If-None-Match and
+    If-Modified-Since, mirroring how GitHub answers unchanged resources.
+    """
+
+    def test_second_request_revalidates_and_is_served_from_cache(self, conditional_server, tmp_path):
+        """Verify the stored ETag is sent and a 304 returns the cached body."""
+        url, handler = conditional_server
+        with GitHubClient("token", base_url=url, cache=ResponseCache(tmp_path)) as client:
+            first = client.get("repos/owner/repo")
+            second = client.get("repos/owner/repo")
+
+        assert "If-None-Match" not in handler.received_headers[0]
+        assert handler.received_headers[1]["If-None-Match"] == '"v1"'
+        assert second.status_code == 200
+        assert second.json() == first.json() == {"version": 1}
+        assert [call.cache_hit for call in client.stats.calls] == [False, True]
+        assert client.stats.cache_hits == 1
+
+    def test_rate_limit_is_read_from_the_304(self, conditional_server, tmp_path):
+        """Verify a revalidation updates the rate-limit window from the 304, not the cached 200."""
+        url, handler = conditional_server
+        handler.rate_limit_remaining = 5000
+        with GitHubClient("token", base_url=url, cache=ResponseCache(tmp_path)) as client:
+            client.get("repos/owner/repo")
+            client.get("repos/owner/repo")
+
+            assert client.stats.cache_hits == 1
+            assert client.scheduler.rate_limit_remaining == 4998
+
+    def test_cache_persists_across_runs(self, conditional_server, tmp_path):
+        """Verify a new client (next scheduled run) reuses entries from disk."""
+        url, _ = conditional_server
+        with GitHubClient("token", base_url=url, cache=ResponseCache(tmp_path)) as client:
+            client.get("repos/owner/repo")
+        with GitHubClient("token", base_url=url, cache=ResponseCache(tmp_path)) as client:
+            response = client.get("repos/owner/repo")
+
+        assert response.json() == {"version": 1}
+        assert client.stats.cache_hits == 1
+
+    def test_changed_resource_replaces_cached_entry(self, conditional_server, tmp_path):
+        """Verify a 200 with a new ETag overwrites the stored body."""
+        url, handler = conditional_server
+        with GitHubClient("token", base_url=url, cache=ResponseCache(tmp_path)) as client:
+            client.get("repos/owner/repo")
+            handler.body, handler.etag = b'{"version": 2}', '"v2"'
+            changed = client.get("repos/owner/repo")
+            cached = client.get("repos/owner/repo")
+
+        assert changed.json() == cached.json() == {"version": 2}
+        assert [call.cache_hit for call in client.stats.calls] == [False, False, True]
+
+    def test_uses_last_modified_when_no_etag(self, conditional_server, tmp_path):
+        """Verify If-Modified-Since is sent for resources without an ETag."""
+        url, handler = conditional_server
+        handler.etag, handler.last_modified = None, "Wed, 01 Oct 2025 00:00:00 GMT"
+        with GitHubClient("token", base_url=url, cache=ResponseCache(tmp_path)) as client:
+            client.get("repos/owner/repo")
+            client.get("repos/owner/repo")
+
+        assert handler.received_headers[1]["If-Modified-Since"] == handler.last_modified
+        assert client.stats.cache_hits == 1
+
+    def test_responses_without_validators_are_not_stored(self, conditional_server, tmp_path):
+        """Verify nothing is written when the server sends no validators."""
+        url, handler = conditional_server
+        handler.etag = None
+        with GitHubClient("token", base_url=url, cache=ResponseCache(tmp_path)) as client:
+            client.get("repos/owner/repo")
+
+        assert list(tmp_path.glob("*.json")) == []
+
+    def test_entries_are_keyed_by_token(self, conditional_server, tmp_path):
+        """Verify a response cached for one token is not reused for another."""
+        url, handler = conditional_server
+        with GitHubClient("token-a", base_url=url, cache=ResponseCache(tmp_path)) as client:
+            client.get("repos/owner/repo")
+        with GitHubClient("token-b", base_url=url, cache=ResponseCache(tmp_path)) as client:
+            client.get("repos/owner/repo")
+
+        assert "If-None-Match" not in handler.received_headers[1]
+        assert len(list(tmp_path.glob("*.json"))) == 2
+
+    def test_evicts_least_recently_used_entries_over_size_limit(self, conditional_server, tmp_path):
+        """Verify the cache stays within max_bytes by dropping the oldest entries."""
+        url, handler = conditional_server
+        handler.body = b"x" * 400
+        cache = ResponseCache(tmp_path, max_bytes=1500)
+        with GitHubClient("token", base_url=url, cache=cache) as client:
+            for index in range(5):
+                client.get(f"repos/owner/repo/{index}")
+
+        sizes = [path.stat().st_size for path in tmp_path.glob("*.json")]
+        assert 0 < len(sizes) < 5
+        assert sum(sizes) <= 1500
+        newest_key = cache.key_for(client.url_for("repos/owner/repo/4"), dict(client.session.headers))
+        assert cache.load(newest_key) is not None
+
+    def test_unreadable_entry_is_treated_as_miss(self, tmp_path):
+        """Verify a corrupt cache file does not break the run."""
+        cache = ResponseCache(tmp_path)
+        (tmp_path / "broken.json").write_text("{not json")
+
+        assert cache.load("broken") is None
+
+
+class TestRequestScheduler:
+    """Tests for RequestScheduler retry decisions.
+
+    Uses a fixed clock, fixed jitter and a recording sleep so every delay is
+    deterministic and no test actually waits.
+    """
+
+    NOW = 1_700_000_000.0
+
+    @pytest.fixture
+    def sleeps(self):
+        """List collecting every sleep duration requested by the scheduler."""
+        return []
+
+    @pytest.fixture
+    def scheduler(self, sleeps):
+        """Scheduler with deterministic clock and jitter."""
+        return RequestScheduler(
+            RetryPolicy(max_attempts=4, base_delay=1.0, max_delay=3.0, budget_seconds=100.0),
+            sleep=sleeps.append,
+            clock=lambda: self.NOW,
+            jitter=lambda: 0.5,
+        )
+
+    @pytest.mark.parametrize("attempt,expected", [
+        pytest.param(1, 0.5, id="first retry"),
+        pytest.param(2, 1.0, id="doubles"),
+        pytest.param(3, 1.5, id="capped at max_delay"),
+    ])
+    def test_server_errors_use_jittered_exponential_backoff(self, scheduler, attempt, expected):
+        """Verify 5xx delays double per attempt, are jittered and capped."""
+        assert scheduler.retry_delay(_make_response(502), attempt) == expected
+
+    def test_connection_errors_are_retried_with_backoff(self, scheduler):
+        """Verify a missing response (connection error) is retried."""
+        assert scheduler.retry_delay(None, 1) == 0.5
+
+    def test_stops_after_max_attempts(self, scheduler):
+        """Verify no retry is scheduled once max_attempts is reached."""
+        assert scheduler.retry_delay(_make_response(503), 4) is None
+
+    @pytest.mark.parametrize("status", [200, 304, 401, 404, 422])
+    def test_non_retryable_statuses(self, scheduler, status):
+        """Verify successes and client errors are never retried."""
+        assert scheduler.retry_delay(_make_response(status), 1) is None
+
+    def test_plain_forbidden_is_not_retried(self, scheduler):
+        """Verify a 403 without rate-limit signals is treated as a permission error."""
+        response = _make_response(403, {"X-RateLimit-Remaining": "4999"}, "Resource not accessible")
+        assert scheduler.retry_delay(response, 1) is None
+
+    def test_retry_after_header_is_honoured_exactly(self, scheduler):
+        """Verify Retry-After wins over backoff and is not jittered."""
+        response = _make_response(403, {"Retry-After": "7"})
+        assert scheduler.retry_delay(response, 1) == 7
+
+    def test_exhausted_primary_limit_waits_until_reset(self, scheduler):
+        """Verify the wait is exactly the time left until X-RateLimit-Reset."""
+        response = _make_response(403, {
+            "X-RateLimit-Remaining": "0",
+            "X-RateLimit-Reset": str(int(self.NOW) + 42),
+        })
+        assert scheduler.retry_delay(response, 1) == 42
+
+    @pytest.mark.parametrize("status,text", [
+        pytest.param(429, "", id="429 without headers"),
+        pytest.param(403, "You have exceeded a secondary rate limit", id="403 secondary limit message"),
+    ])
+    def test_secondary_rate_limit_waits_at_least_a_minute(self, scheduler, status, text):
+        """Verify secondary rate limits without Retry-After wait the documented minute."""
+        assert scheduler.retry_delay(_make_response(status, text=text), 1) == 60
+
+    def test_proactively_waits_when_remaining_is_zero(self, scheduler, sleeps):
+        """Verify a success reporting zero remaining delays the next request until reset."""
+        scheduler.observe(_make_response(200, {
+            "X-RateLimit-Remaining": "0",
+            "X-RateLimit-Reset": str(int(self.NOW) + 10),
+        }))
+
+        scheduler.wait_for_rate_limit()
+        scheduler.wait_for_rate_limit()
+
+        assert sleeps == [10]
+
+    def test_no_proactive_wait_while_requests_remain(self, scheduler, sleeps):
+        """Verify nothing sleeps while the rate limit has headroom."""
+        scheduler.observe(_make_response(200, {"X-RateLimit-Remaining": "10"}))
+        scheduler.wait_for_rate_limit()
+        assert sleeps == []
+
+    def test_wait_beyond_budget_fails_fast_without_sleeping(self, scheduler, sleeps):
+        """Verify an over-budget wait raises immediately instead of hanging."""
+        scheduler.wait(60, "first")
+
+        with pytest.raises(RequestBudgetExceeded, match="wait budget of 100s"):
+            scheduler.wait(50, "second")
+
+        assert sleeps == [60]
+        assert scheduler.waited_seconds == 60
+
+    def test_concurrent_waits_share_the_budget(self):
+        """Verify waits from several threads can never overrun the budget together.
+
+        TDD Rationale: The pipeline and fetch_deploy_configs wait from
+        worker threads; a check-then-add race let each of them spend the
+        whole budget.
+        """
+        scheduler = RequestScheduler(RetryPolicy(budget_seconds=100.0), sleep=lambda seconds: time.sleep(0.2))
+        errors = []
+
+        def _wait():
+            try:
+                scheduler.wait(60, "concurrent")
+            except RequestBudgetExceeded as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=_wait) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(errors) == 1
+        assert scheduler.waited_seconds == 60
+
+    def test_reset_budget_allows_further_waits(self, scheduler, sleeps):
+        """Verify a long-running watch can start each cycle with a full budget."""
+        scheduler.wait(60, "first")
+        scheduler.reset_budget()
+
+        scheduler.wait(50, "second")
+
+        assert sleeps == [60, 50]
+
+
+class TestClientRetries:
+    """Tests for GitHubClient retrying against a scripted localhost server."""
+
+    @pytest.fixture
+    def scripted_server(self):
+        """Serve scripted responses; yields (url, handler class)."""
+        handler = type("Handler", (_SequenceHandler,), {"responses": []})
+        url, server = _serve(handler)
+        yield url, handler
+        server.shutdown()
+        server.server_close()
+
+    def _client(self, url, sleeps, budget=DEFAULT_TEST_BUDGET):
+        scheduler = RequestScheduler(
+            RetryPolicy(max_attempts=3, budget_seconds=budget), sleep=sleeps.append, jitter=lambda: 0.5
+        )
+        return GitHubClient("token", base_url=url, scheduler=scheduler)
+
+    def test_transient_bad_gateway_is_retried(self, scripted_server):
+        """Verify a 502 followed by a 200 returns the successful response."""
+        url, handler = scripted_server
+        handler.responses = [(502, {}, b"bad gateway"), (200, {}, b'{"ok": true}')]
+        sleeps = []
+        with self._client(url, sleeps) as client:
+            response = client.get("repos/owner/repo")
+
+        assert response.json() == {"ok": True}
+        assert [call.attempt for call in client.stats.calls] == [1, 2]
+        assert client.stats.retries == 1
+        assert sleeps == [0.5]
+
+    def test_returns_last_response_when_retries_exhausted(self, scripted_server):
+        """Verify the final 5xx is returned for the caller's error handling."""
+        url, handler = scripted_server
+        handler.responses = [(503, {}, b"unavailable")]
+        sleeps = []
+        with self._client(url, sleeps) as client:
+            response = client.get("repos/owner/repo")
+
+        assert response.status_code == 503
+        assert client.stats.request_count == 3
+
+    def test_rate_limit_beyond_budget_raises(self, scripted_server):
+        """Verify a Retry-After longer than the budget aborts the run immediately."""
+        url, handler = scripted_server
+        handler.responses = [(429, {"Retry-After": "600"}, b"")]
+        sleeps = []
+        with self._client(url, sleeps, budget=60) as client:
+            with pytest.raises(RequestBudgetExceeded):
+                client.get("repos/owner/repo")
+
+        assert sleeps == []
+
+    def test_waits_are_reported_in_stats(self, scripted_server, capsys):
+        """Verify retries and waiting time appear in the run summary."""
+        url, handler = scripted_server
+        handler.responses = [(429, {"Retry-After": "2"}, b""), (200, {}, b"{}")]
+        sleeps = []
+        with self._client(url, sleeps) as client:
+            client.get("repos/owner/repo")
+        client.stats.print_summary()
+
+        assert client.stats.waited_seconds == 2
+        assert "Retried 1 requests, waited 2.0s for GitHub" in capsys.readouterr().out
+
+
+class TestClientStats:
+    """Tests for ClientStats aggregation and summary output."""
+
+    def test_summary_reports_totals(self, capsys):
+        """Verify the summary line reports requests, time and connection reuse."""
+        stats = ClientStats(calls=[
+            RequestStats("repos/a", 200, 0.25, True),
+            RequestStats("repos/b", 200, 0.05, False),
+        ])
+
+        stats.print_summary()
+
+        out = capsys.readouterr().out
+        assert "GET repos/a -> 200 in 250ms (new connection)" in out
+        assert "GET repos/b -> 200 in 50ms (reused connection)" in out
+        assert "GitHub API: 2 requests in 0.30s (1 connections opened, 1 reused, 0 cache hits)" in out
+
+    def test_empty_stats(self):
+        """Verify totals are zero before any request is sent."""
+        stats = ClientStats()
+        assert stats.request_count == 0
+        assert stats.connections_opened == 0
+        assert stats.total_seconds == 0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,294 @@
+#!/usr/bin/env -S uv run
+# /// script
+# requires-python = ">=3.12"
+# dependencies = ["ruamel.yaml", "requests", "pytest"]
+# ///
+"""Unit tests for release_index.py and its use by the update script."""
+
+import sqlite3
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+# Add the script's directory to sys.path so we can import it directly
+sys.path.insert(0, str(Path(__file__).parent))
+
+from conftest import get_chart_value
+from fake_github_api import FakeGitHubAPI
+from github_api import GitHubClient, RequestScheduler, RetryPolicy
+from release_index import SCHEMA, Release, ReleaseIndex, TagChanges, print_changes
+from update_openhands_charts import (
+    DeployEnvCache,
+    fetch_release_deploy_config,
+    list_cloud_tag_refs,
+    process_updates,
+    refresh_release_index,
+    resolve_openhands_version,
+)
+
+TAG_SHAS = {
+    "cloud-1.9.0": "a" * 40,
+    "cloud-1.10.0": "b" * 40,
+    "cloud-1.2.0": "c" * 40,
+}
+
+# cloud-2.0.0 is an annotated tag; cloud-2.1.0 is a tag of an annotated tag
+ANNOTATED_REPO = {
+    "tags": {"cloud-1.0.0": "a" * 40, "cloud-2.0.0": "1" * 40, "cloud-2.1.0": "2" * 40},
+    "tag_objects": {"1" * 40: "b" * 40, "2" * 40: "3" * 40, "3" * 40: "c" * 40},
+}
+
+
+@pytest.fixture
+def index():
+    with ReleaseIndex(":memory:") as release_index:
+        yield release_index
+
+
+class TestReleaseIndex:
+    """Tests for the SQLite release index."""
+
+    def test_sync_tags_adds_only_new_tags(self, index):
+        """Test that refreshes are incremental.
+
+        TDD Rationale: Existing rows (and their deploy configs) must survive
+        a refresh, and callers only need to act on tags they have not seen.
+        """
+        assert sorted(index.sync_tags(TAG_SHAS).added) == sorted(TAG_SHAS)
+        index.set_deploy_config("cloud-1.9.0", "abc", "1.9.0-nikolaik")
+
+        changes = index.sync_tags({**TAG_SHAS, "cloud-1.11.0": "d" * 40})
+
+        assert changes == TagChanges(added=["cloud-1.11.0"])
+        assert index.get("cloud-1.9.0").runtime_api_sha == "abc"
+
+    def test_sync_tags_updates_moved_tags(self, index):
+        """Test that a tag re-pointed upstream gets its new commit.
+
+        TDD Rationale: The indexed deploy config was read at the old commit,
+        so it is dropped and refetched instead of being served for the new one.
+        """
+        index.sync_tags(TAG_SHAS)
+        index.set_deploy_config("cloud-1.9.0", "abc", "1.9.0-nikolaik")
+
+        changes = index.sync_tags({**TAG_SHAS, "cloud-1.9.0": "d" * 40})
+
+        assert changes == TagChanges(moved=["cloud-1.9.0"])
+        assert index.get("cloud-1.9.0") == Release("cloud-1.9.0", (1, 9, 0), "d" * 40)
+
+    def test_sync_tags_removes_deleted_tags(self, index):
+        index.sync_tags(TAG_SHAS)
+
+        changes = index.sync_tags({"cloud-1.10.0": "b" * 40})
+
+        assert changes == TagChanges(removed=["cloud-1.2.0", "cloud-1.9.0"])
+        assert index.tags() == {"cloud-1.10.0"}
+
+    def test_ignores_non_cloud_tags(self, index):
+        assert index.sync_tags({"cloud-1.0": "e" * 40, "v1.0.0": "f" * 40}) == TagChanges()
+        assert index.tags() == set()
+
+    def test_remembers_peeled_tag_objects(self, tmp_path):
+        path = tmp_path / "releases.sqlite3"
+        with ReleaseIndex(path) as index:
+            index.add_peeled_tags({"1" * 40: "a" * 40})
+
+        with ReleaseIndex(path) as reopened:
+            assert reopened.peeled_tags() == {"1" * 40: "a" * 40}
+
+    def test_latest_orders_numerically(self, index):
+        """Test that cloud-1.10.0 beats cloud-1.9.0 (not lexical ordering)."""
+        index.sync_tags(TAG_SHAS)
+
+        assert index.latest().tag == "cloud-1.10.0"
+
+    def test_latest_of_empty_index_is_none(self, index):
+        assert index.latest() is None
+
+    def test_between_is_inclusive_and_ordered(self, index):
+        index.sync_tags({**TAG_SHAS, "cloud-1.9.1": "d" * 40})
+
+        tags = [release.tag for release in index.between("cloud-1.9.0", "cloud-1.10.0")]
+
+        assert tags == ["cloud-1.9.0", "cloud-1.9.1", "cloud-1.10.0"]
+
+    def test_between_rejects_non_cloud_tags(self, index):
+        with pytest.raises(ValueError):
+            index.between("1.9.0", "cloud-1.10.0")
+
+    def test_persists_to_disk(self, tmp_path):
+        path = tmp_path / "index" / "releases.sqlite3"
+        with ReleaseIndex(path) as index:
+            index.sync_tags(TAG_SHAS)
+            index.set_deploy_config("cloud-1.10.0", "abc", "1.10.0-nikolaik")
+
+        with ReleaseIndex(path) as reopened:
+            assert reopened.get("cloud-1.10.0") == Release(
+                "cloud-1.10.0", (1, 10, 0), "b" * 40, "abc", "1.10.0-nikolaik"
+            )
+
+    def test_stores_image_map(self, index):
+        index.sync_tags(TAG_SHAS)
+        index.set_deploy_config("cloud-1.10.0", "abc", "1.10.0-nikolaik", {"AUTOMATION_SHA": "cf93073"})
+
+        assert index.get("cloud-1.10.0").images == {"AUTOMATION_SHA": "cf93073"}
+        assert index.get("cloud-1.10.0").deploy_values["AUTOMATION_SHA"] == "cf93073"
+
+    def test_adds_images_column_to_existing_index(self, tmp_path):
+        """Test that an index written before image maps were stored still opens.
+
+        TDD Rationale: Its rows have no image map, so the update script must
+        refetch their deploy config rather than trust a partial one.
+        """
+        path = tmp_path / "releases.sqlite3"
+        connection = sqlite3.connect(path)
+        connection.executescript(SCHEMA.replace("    images TEXT,\n", ""))
+        connection.execute(
+            "INSERT INTO releases VALUES ('cloud-1.9.0', 1, 9, 0, ?, 'abc', '1.9.0-nikolaik', 0)", ("a" * 40,)
+        )
+        connection.commit()
+        connection.close()
+
+        with ReleaseIndex(path) as index:
+            release = index.get("cloud-1.9.0")
+
+        assert release.has_deploy_config
+        assert release.images is None
+
+    def test_is_safe_to_share_between_threads(self, index):
+        """Test that worker threads of the update pipeline can use one index."""
+        index.sync_tags(TAG_SHAS)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(index.latest().tag)) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert results == ["cloud-1.10.0"] * 8
+
+    def test_print_changes_marks_changed_values(self, index, capsys):
+        index.sync_tags(TAG_SHAS)
+        index.set_deploy_config("cloud-1.9.0", "abc", "1.9.0-nikolaik")
+        index.set_deploy_config("cloud-1.10.0", "abc", "1.10.0-nikolaik")
+
+        print_changes(index.between("cloud-1.2.0", "cloud-1.10.0"))
+
+        output = capsys.readouterr().out
+        assert "cloud-1.2.0 (ccccccc)\n  deploy config not indexed yet" in output
+        assert "RUNTIME_API_SHA: abc\n" in output
+        assert "OPENHANDS_RUNTIME_IMAGE_TAG: 1.10.0-nikolaik (changed)" in output
+
+
+class TestUpdateScriptWithReleaseIndex:
+    """Tests that the update script answers lookups from the index."""
+
+    @pytest.fixture
+    def fake_api(self):
+        with FakeGitHubAPI.from_fixture() as api:
+            yield api
+
+    def test_refresh_then_resolve_latest_from_index(self, fake_api, index):
+        with GitHubClient("fake-token", base_url=fake_api.url) as client:
+            assert resolve_openhands_version(client, None, index) == "cloud-1.30.0"
+
+        assert fake_api.request_counts == {"matching-refs": 1}
+        assert "cloud-1.28.0" in index.tags()
+
+    def test_indexed_tag_skips_existence_request(self, fake_api, index):
+        with GitHubClient("fake-token", base_url=fake_api.url) as client:
+            assert resolve_openhands_version(client, "cloud-1.29.0", index) == "cloud-1.29.0"
+
+        assert "git-ref" not in fake_api.request_counts
+
+    def test_falls_back_to_index_when_refresh_fails(self, index, capsys):
+        """Test that an unreachable API still resolves from indexed releases."""
+        index.sync_tags(TAG_SHAS)
+        scheduler = RequestScheduler(RetryPolicy(max_attempts=1))
+        with GitHubClient("fake-token", base_url="http://127.0.0.1:9", timeout=0.5, scheduler=scheduler) as client:
+            assert resolve_openhands_version(client, None, index) == "cloud-1.10.0"
+
+        assert "using indexed releases" in capsys.readouterr().out
+
+    def test_deploy_config_is_stored_and_reused(self, fake_api, index):
+        with GitHubClient("fake-token", base_url=fake_api.url) as client:
+            resolve_openhands_version(client, None, index)
+            first = fetch_release_deploy_config(client, "cloud-1.30.0", index=index)
+            requests_after_first = sum(fake_api.request_counts.values())
+            second = fetch_release_deploy_config(client, "cloud-1.30.0", index=index)
+
+        assert second == first
+        assert second.images["INTEGRATIONS_HUB_IMAGE_TAG"] == "0.2.0"
+        assert index.get("cloud-1.30.0").runtime_api_sha == first.runtime_api_sha
+        assert sum(fake_api.request_counts.values()) == requests_after_first
+
+    def test_refresh_syncs_moved_and_deleted_tags(self, fake_api, index, capsys):
+        with GitHubClient("fake-token", base_url=fake_api.url) as client:
+            refresh_release_index(client, index)
+            tags = fake_api.repos["All-Hands-AI/OpenHands"]["tags"]
+            del tags["cloud-1.28.0"]
+            tags["cloud-1.29.0"] = "f" * 40
+            changes = refresh_release_index(client, index)
+
+        assert changes == TagChanges(moved=["cloud-1.29.0"], removed=["cloud-1.28.0"])
+        assert "cloud-1.28.0" not in index.tags()
+        assert index.get("cloud-1.29.0").commit_sha == "f" * 40
+        output = capsys.readouterr().out
+        assert "Release index: updated 1 moved cloud tag(s)" in output
+        assert "Release index: removed 1 deleted cloud tag(s)" in output
+
+    def test_second_run_needs_only_the_tag_listing(self, fake_api, index, chart_paths):
+        """Test that a repeated run fetches no deploy config.
+
+        TDD Rationale: Repeated and dry runs should cost one listing request
+        (a 304 with the response cache) instead of re-walking the API.
+        """
+        with GitHubClient("fake-token", base_url=fake_api.url) as client:
+            process_updates(client, dry_run=True, env_cache=DeployEnvCache(directory=None), index=index)
+            fake_api.request_counts.clear()
+            process_updates(client, env_cache=DeployEnvCache(directory=None), index=index)
+
+        assert fake_api.request_counts == {"matching-refs": 1}
+        assert get_chart_value(chart_paths["CHART_PATH"], "appVersion") == "cloud-1.30.0"
+
+
+
+class TestAnnotatedTags:
+    """Tests that the REST path peels annotated tags like the git backend does."""
+
+    @pytest.fixture
+    def fake_api(self):
+        with FakeGitHubAPI({"repos": {"All-Hands-AI/OpenHands": ANNOTATED_REPO}}) as api:
+            yield api
+
+    def test_list_cloud_tag_refs_peels_annotated_tags(self, fake_api):
+        """Test that each tag maps to its commit, not to its tag object.
+
+        TDD Rationale: git_backend.list_tag_refs peels annotated tags, so the
+        REST path must too or a release's commit_sha depends on the backend.
+        """
+        with GitHubClient("fake-token", base_url=fake_api.url) as client:
+            refs = list_cloud_tag_refs(client, "All-Hands-AI/OpenHands")
+
+        assert refs == {"cloud-1.0.0": "a" * 40, "cloud-2.0.0": "b" * 40, "cloud-2.1.0": "c" * 40}
+        assert fake_api.request_counts == {"matching-refs": 1, "git-tag": 3}
+
+    def test_refresh_peels_each_tag_object_once(self, fake_api, tmp_path):
+        """Test that peeled tag objects are remembered across runs."""
+        path = tmp_path / "releases.sqlite3"
+        with GitHubClient("fake-token", base_url=fake_api.url) as client:
+            with ReleaseIndex(path) as index:
+                refresh_release_index(client, index)
+            fake_api.request_counts.clear()
+            with ReleaseIndex(path) as index:
+                changes = refresh_release_index(client, index)
+                assert index.get("cloud-2.1.0").commit_sha == "c" * 40
+
+        assert changes == TagChanges()
+        assert fake_api.request_counts == {"matching-refs": 1}
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
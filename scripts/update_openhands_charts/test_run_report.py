@@ -0,0 +1,97 @@
+#!/usr/bin/env -S uv run
+# /// script
+# requires-python = ">=3.12"
+# dependencies = ["ruamel.yaml", "requests", "pytest"]
+# ///
+"""Unit tests for run_report.py."""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add the script's directory to sys.path so we can import it directly
+sys.path.insert(0, str(Path(__file__).parent))
+
+from run_report import RunReport
+from update_openhands_charts import UpdateResult
+
+
+def read_records(path: Path) -> list[dict]:
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+class TestRunReport:
+    """Tests for the JSON Lines run report."""
+
+    def test_records_changes_no_ops_and_errors(self, tmp_path):
+        path = tmp_path / "report.jsonl"
+        result = UpdateResult(
+            has_changes=True,
+            changes=[("image tag", "sha-aaaaaaa", "sha-bbbbbbb")],
+            unchanged=[("runtime image tag", "1.0.0")],
+            errors=["Could not find warm runtime image in values.yaml"],
+            locations={"image tag": 12},
+        )
+
+        with RunReport(path, repo="OpenHands-Cloud") as report:
+            report.start_run("cloud-1.1.0", dry_run=False)
+            report.add_result("runtime-api", "charts/runtime-api/values.yaml", result)
+            report.finish_run()
+
+        records = read_records(path)
+        assert [record["event"] for record in records] == ["run_start", "change", "unchanged", "error", "run_end"]
+        change = {
+            "chart": "runtime-api",
+            "file": "charts/runtime-api/values.yaml",
+            "key": "image tag",
+            "old": "sha-aaaaaaa",
+            "new": "sha-bbbbbbb",
+            "line": 12,
+        }
+        assert {key: records[1][key] for key in change} == change
+        assert records[3]["message"] == "Could not find warm runtime image in values.yaml"
+        assert records[-1]["status"] == "error"
+        assert len({record["run"] for record in records}) == 1
+
+    @pytest.mark.parametrize("events,failed,expected", [
+        pytest.param([], False, "unchanged", id="nothing changed"),
+        pytest.param(["change"], False, "changed", id="changed"),
+        pytest.param(["skip"], False, "skipped", id="skipped run"),
+        pytest.param(["chart skip"], False, "unchanged", id="skipped chart"),
+        pytest.param(["change"], True, "failed", id="raised"),
+    ])
+    def test_run_status(self, tmp_path, events, failed, expected):
+        path = tmp_path / "report.jsonl"
+        with RunReport(path, repo="OpenHands-Cloud") as report:
+            report.start_run(None, dry_run=True)
+            if "change" in events:
+                report.add_result("openhands", "charts/openhands/Chart.yaml", UpdateResult(changes=[("version", "1", "2")]))
+            if "skip" in events:
+                report.skip("charts already at cloud-1.1.0")
+            if "chart skip" in events:
+                report.skip("AUTOMATION_SHA not pinned in deploy.yaml", chart="automation")
+            report.finish_run(failed=failed)
+
+        assert read_records(path)[-1]["status"] == expected
+
+    def test_runs_append_to_one_file(self, tmp_path):
+        """Test that each run gets its own id and later runs do not truncate the file."""
+        path = tmp_path / "report.jsonl"
+        for tag in ("cloud-1.0.0", "cloud-1.1.0"):
+            with RunReport(path, repo="OpenHands-Cloud") as report:
+                report.start_run(tag, dry_run=True)
+                report.add_files(["charts/openhands/Chart.yaml"])
+                report.add_timings([("write chart files", 0.5, 0.25), ("rewrite values", 0.0, 0.25)])
+                report.finish_run()
+
+        records = read_records(path)
+        ends = [record for record in records if record["event"] == "run_end"]
+        assert len(ends) == 2 and ends[0]["run"] != ends[1]["run"]
+        assert ends[0]["changed_files"] == ["charts/openhands/Chart.yaml"]
+        assert [record["phase"] for record in records[1:3]] == ["rewrite values", "write chart files"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,87 @@
+#!/usr/bin/env -S uv run
+# /// script
+# requires-python = ">=3.12"
+# dependencies = ["pytest"]
+# ///
+"""Unit tests for trace_events.py."""
+
+import json
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+# Add the script's directory to sys.path so we can import it directly
+sys.path.insert(0, str(Path(__file__).parent))
+
+from trace_events import active_tracer, span, start_tracing, stop_tracing, traced
+
+
+@pytest.fixture
+def tracer():
+    tracer = start_tracing()
+    yield tracer
+    stop_tracing()
+
+
+@traced("charts")
+def bump(version: int) -> int:
+    return version + 1
+
+
+class TestTracing:
+    """Tests for recording spans and exporting Chrome trace events."""
+
+    def test_nothing_is_recorded_when_off(self):
+        assert active_tracer() is None
+        with span("GET repos", "http") as args:
+            args["status"] = 200
+
+        assert bump(1) == 2
+
+    def test_records_nested_spans_with_args(self, tracer, tmp_path):
+        with span("update_chart_workflow", "charts"):
+            with span("GET repos", "http", attempt=1) as args:
+                args["status"] = 200
+            bump(1)
+
+        tracer.write(tmp_path / "trace.json")
+        events = json.loads((tmp_path / "trace.json").read_text())["traceEvents"]
+        spans = {event["name"]: event for event in events if event["ph"] == "X"}
+        outer, request = spans["update_chart_workflow"], spans["GET repos"]
+        assert request["args"] == {"attempt": 1, "status": 200}
+        assert spans["bump"]["cat"] == "charts"
+        assert outer["ts"] <= request["ts"] and request["ts"] + request["dur"] <= outer["ts"] + outer["dur"]
+        assert {event["name"] for event in events if event["ph"] == "M"} == {"thread_name"}
+
+    def test_failed_span_records_the_exception(self, tracer):
+        with pytest.raises(KeyError):
+            with span("compose yaml", "yaml"):
+                raise KeyError("image")
+
+        assert tracer.spans[0][5] == {"error": "KeyError"}
+
+    def test_spans_keep_their_threads(self, tracer):
+        thread = threading.Thread(target=bump, args=(1,), name="deploy-config")
+        thread.start()
+        thread.join()
+        bump(2)
+
+        events = tracer.trace_events()
+        names = {event["tid"]: event["args"]["name"] for event in events if event["ph"] == "M"}
+        assert sorted(names[event["tid"]] for event in events if event["ph"] == "X") == [
+            "MainThread", "deploy-config"
+        ]
+
+    def test_async_spans_pair_begin_and_end(self, tracer):
+        tracer.add_async_span("resolve cloud tag", "phase", tracer.origin, tracer.origin + 0.5)
+
+        begin, end = tracer.trace_events()
+        assert (begin["ph"], end["ph"]) == ("b", "e")
+        assert begin["id"] == end["id"]
+        assert end["ts"] - begin["ts"] == pytest.approx(500_000)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -1,12 +1,16 @@
 #!/usr/bin/env -S uv run
 # /// script
 # requires-python = ">=3.12"
-# dependencies = ["PyGithub", "ruamel.yaml", "requests", "pytest"]
+# dependencies = ["ruamel.yaml", "requests", "pytest"]
 # ///
 """Unit tests for update_openhands_charts.py."""
 
-import base64
+import asyncio
+import gc
+import json
+import subprocess
 import sys
+import threading
 from pathlib import Path
 from unittest.mock import MagicMock, Mock
 
@@ -34,8 +38,17 @@ from conftest import (
     NEW_APP_VERSION,
     NEW_RUNTIME_API_VERSION,
 )
+from fake_github_api import EndpointBehavior, FakeGitHubAPI
+from github_api import GitHubClient, ResponseCache
+from run_report import RunReport
 from update_openhands_charts import (
+    CHART_REWRITERS,
+    IMAGE_TAG_RULES,
+    ChartFiles,
     DeployConfig,
+    DeployEnvCache,
+    TagRewriter,
+    TagRule,
     bump_patch_version,
     cloud_tag_exists,
     extract_version_from_cloud_tag,
@@ -46,10 +59,13 @@ from update_openhands_charts import (
     get_short_sha,
     main,
     parse_args,
+    parse_workflow_env,
+    select_latest_cloud_tag,
     update_openhands_chart,
     update_openhands_values,
     update_runtime_api_chart,
     update_runtime_api_values,
+    update_charts_workflow,
 )
 
 
@@ -115,6 +131,33 @@ class TestExtractVersionFromCloudTag:
         assert extract_version_from_cloud_tag(invalid_tag) is None
 
 
+class TestSelectLatestCloudTag:
+    """Tests for select_latest_cloud_tag function.
+
+    Tag discovery must be deterministic: the highest cloud-X.Y.Z version is
+    returned no matter how the input list is ordered.
+    """
+
+    @pytest.mark.parametrize("tag_names,expected", [
+        pytest.param(["cloud-1.0.0", "cloud-1.0.1"], "cloud-1.0.1", id="patch ordering"),
+        pytest.param(["cloud-2.0.0", "cloud-1.99.99"], "cloud-2.0.0", id="major outranks minor"),
+        pytest.param(["cloud-0.9.0", "cloud-0.10.0"], "cloud-0.10.0", id="numeric not lexical"),
+        pytest.param(["latest", "cloud-1.0.0-beta", "cloud-1.0.0"], "cloud-1.0.0", id="ignores non-cloud tags"),
+    ])
+    def test_returns_highest_version(self, tag_names, expected):
+        """Verify the highest semantic version is selected."""
+        assert select_latest_cloud_tag(tag_names) == expected
+
+    def test_result_is_independent_of_order(self):
+        """Verify shuffled inputs give the same result."""
+        tags = ["cloud-1.2.3", "cloud-1.10.0", "cloud-1.9.9"]
+        assert select_latest_cloud_tag(tags) == select_latest_cloud_tag(list(reversed(tags)))
+
+    def test_returns_none_without_cloud_tags(self):
+        """Verify None is returned when nothing matches."""
+        assert select_latest_cloud_tag(["v1.0.0", "latest"]) is None
+
+
 class TestGetShortSha:
     """Tests for get_short_sha function.
 
@@ -226,6 +269,44 @@ class TestBumpPatchVersion:
         with pytest.raises(ValueError, match="Invalid semver format"):
             bump_patch_version(invalid_version)
 
+    def test_prerelease_is_bumped_to_its_release(self):
+        assert bump_patch_version("1.2.4-rc.1") == "1.2.4"
+
+
+class TestUpdateDependencyVersion:
+    """Tests for update_dependency_version with exact and range versions."""
+
+    CHART = "dependencies:\n  - name: runtime-api\n    version: {version}\n"
+
+    @pytest.mark.parametrize("pinned,new_version,expected", [
+        pytest.param("0.3.1", "0.3.2", "0.3.2", id="exact"),
+        pytest.param("0.3.x", "0.3.2", "0.3.x", id="range still satisfied"),
+        pytest.param("~0.3.0", "0.4.0", "0.4.0", id="range no longer satisfied"),
+    ])
+    def test_dependency_version(self, pinned, new_version, expected):
+        chart = update_openhands_charts.YamlEditor(self.CHART.format(version=pinned))
+        result = update_openhands_charts.UpdateResult()
+
+        update_openhands_charts.update_dependency_version(chart, "runtime-api", new_version, result)
+
+        assert chart.get("dependencies[name=runtime-api].version") == expected
+        assert result.has_changes == (expected != pinned)
+
+    def test_unsupported_range_is_reported_and_left_unchanged(self):
+        """Test that a constraint parse_range rejects is a per-chart error.
+
+        TDD Rationale: One hand-edited Chart.yaml should not abort the whole
+        run with a traceback.
+        """
+        chart = update_openhands_charts.YamlEditor(self.CHART.format(version="1.2.3 - 1.4.0"))
+        result = update_openhands_charts.UpdateResult()
+
+        update_openhands_charts.update_dependency_version(chart, "runtime-api", "1.5.0", result)
+
+        assert chart.get("dependencies[name=runtime-api].version") == "1.2.3 - 1.4.0"
+        assert result.has_error_containing("Could not update runtime-api version")
+        assert not result.has_changes
+
 
 # =============================================================================
 # CHART AND VALUES UPDATE TESTS
@@ -453,6 +534,47 @@ class TestUpdateResultHelpers:
         count_property = field.rstrip("s") + "_count"  # errors->error_count, changes->change_count
         assert getattr(result, count_property) == expected_count
 
+    def test_lookups_see_entries_added_after_earlier_lookups(self):
+        """Verify the key index picks up entries added between lookups.
+
+        TDD Rationale: Results are filled step by step, and the index must
+        not go stale when a lookup happens in between.
+        """
+        result = update_openhands_charts.UpdateResult(changes=[("appVersion", "cloud-1.0.0", "cloud-1.1.0")])
+        assert not result.has_change_for("version")
+
+        result.add_change("version", "0.1.0", "0.1.1")
+        result.add_unchanged("runtime-api version", "0.2.6")
+
+        assert result.change_for("version") == ("0.1.0", "0.1.1")
+        assert result.change_for("appVersion") == ("cloud-1.0.0", "cloud-1.1.0")
+        assert result.unchanged_value("runtime-api version") == "0.2.6"
+        assert not hasattr(result, "__dict__")
+
+    def test_entries_cannot_be_changed_behind_the_index(self):
+        """Verify changes and unchanged are read-only, so the index cannot go stale."""
+        result = update_openhands_charts.UpdateResult(changes=[("version", "0.1.0", "0.1.1")])
+
+        with pytest.raises(AttributeError):
+            result.changes.append(("appVersion", "cloud-1.0.0", "cloud-1.1.0"))
+        with pytest.raises(AttributeError):
+            result.changes = []
+
+        assert result.has_change_for("version")
+
+    def test_keys_recorded_with_none_are_found(self):
+        """Verify membership does not depend on the recorded value, as with the linear scan."""
+        result = update_openhands_charts.UpdateResult(unchanged=[("appVersion", None)], changes=[("version", None, None)])
+
+        assert result.is_unchanged("appVersion")
+        assert result.has_change_for("version")
+        assert not result.is_unchanged("version")
+
+    def test_first_entry_for_a_key_wins(self):
+        result = update_openhands_charts.UpdateResult(unchanged=[("tag", "a"), ("tag", "b")])
+
+        assert result.unchanged_value("tag") == "a"
+
 
 class TestAssertVersionBumped:
     """Tests for assert_version_bumped helper function.
@@ -583,60 +705,101 @@ env:
 """
 
     @pytest.fixture
-    def mock_successful_response(self):
-        """Create a mock response with valid workflow content."""
-        encoded_content = base64.b64encode(self.VALID_WORKFLOW_YAML.encode()).decode()
-        mock_response = Mock()
-        mock_response.raise_for_status = Mock()
-        mock_response.json.return_value = {"content": encoded_content}
-        return mock_response
-
-    def test_returns_deploy_config_on_success(self, monkeypatch, mock_successful_response):
+    def mock_successful_response(self, make_workflow_response):
+        """Create a mock response serving the workflow listing and raw content."""
+        return make_workflow_response(self.VALID_WORKFLOW_YAML)
+
+    def test_returns_deploy_config_on_success(self, monkeypatch, mock_successful_response, github_client):
         """Test that valid response returns DeployConfig with correct values."""
         monkeypatch.setattr(
-            "update_openhands_charts.requests.get",
+            github_client.session, "get",
             Mock(return_value=mock_successful_response)
         )
 
-        result = get_deploy_config("fake-token", "owner/repo", ref="1.0.0")
+        result = get_deploy_config(github_client, "owner/repo", ref="1.0.0")
 
         assert result is not None
         assert isinstance(result, DeployConfig)
         assert result.runtime_api_sha == "abc123def456"
         assert result.openhands_runtime_image_tag == "cloud-1.21.0-nikolaik"
 
-    def test_constructs_correct_url_without_ref(self, monkeypatch, mock_successful_response):
-        """Test that URL is constructed correctly without ref parameter."""
+    def test_constructs_correct_url_without_ref(self, monkeypatch, mock_successful_response, github_client):
+        """Test that URLs are constructed correctly without ref parameter.
+
+        The directory listing comes first (for the blob SHA), then the file.
+        """
         mock_get = Mock(return_value=mock_successful_response)
-        monkeypatch.setattr("update_openhands_charts.requests.get", mock_get)
+        monkeypatch.setattr(github_client.session, "get", mock_get)
 
-        get_deploy_config("fake-token", "owner/repo")
+        get_deploy_config(github_client, "owner/repo")
 
-        called_url = mock_get.call_args[0][0]
-        assert called_url == "https://api.github.com/repos/owner/repo/contents/.github/workflows/deploy.yaml"
-        assert "?ref=" not in called_url
+        called_urls = [call[0][0] for call in mock_get.call_args_list]
+        assert called_urls == [
+            "https://api.github.com/repos/owner/repo/contents/.github/workflows",
+            "https://api.github.com/repos/owner/repo/contents/.github/workflows/deploy.yaml",
+        ]
 
-    def test_constructs_correct_url_with_ref(self, monkeypatch, mock_successful_response):
-        """Test that URL includes ref parameter when provided."""
+    def test_constructs_correct_url_with_ref(self, monkeypatch, mock_successful_response, github_client):
+        """Test that both URLs include the ref parameter when provided."""
         mock_get = Mock(return_value=mock_successful_response)
-        monkeypatch.setattr("update_openhands_charts.requests.get", mock_get)
+        monkeypatch.setattr(github_client.session, "get", mock_get)
 
-        get_deploy_config("fake-token", "owner/repo", ref="v1.2.3")
+        get_deploy_config(github_client, "owner/repo", ref="v1.2.3")
 
-        called_url = mock_get.call_args[0][0]
-        assert "?ref=v1.2.3" in called_url
+        assert all("?ref=v1.2.3" in call[0][0] for call in mock_get.call_args_list)
+
+    def test_requests_raw_media_type_for_file(self, monkeypatch, mock_successful_response, github_client):
+        """Test that the workflow is downloaded as raw text.
 
-    def test_includes_authorization_header(self, monkeypatch, mock_successful_response):
-        """Test that Authorization header is included with token."""
+        TDD Rationale: The default JSON media type wraps the file in a
+        base64 envelope that is ~33% larger and must be decoded again.
+        """
         mock_get = Mock(return_value=mock_successful_response)
-        monkeypatch.setattr("update_openhands_charts.requests.get", mock_get)
+        monkeypatch.setattr(github_client.session, "get", mock_get)
 
-        get_deploy_config("my-secret-token", "owner/repo")
+        get_deploy_config(github_client, "owner/repo")
 
-        called_headers = mock_get.call_args[1]["headers"]
-        assert called_headers["Authorization"] == "Bearer my-secret-token"
+        listing_call, file_call = mock_get.call_args_list
+        assert "Accept" not in (listing_call.kwargs.get("headers") or {})
+        assert file_call.kwargs["headers"]["Accept"] == "application/vnd.github.raw+json"
 
-    def test_returns_empty_string_when_env_key_missing(self, monkeypatch, make_workflow_response):
+    def test_skips_download_when_blob_sha_cached(self, monkeypatch, make_workflow_response, github_client):
+        """Test that a known blob SHA is served from the env cache.
+
+        TDD Rationale: Consecutive cloud tags usually share the same
+        deploy.yaml blob; only the cheap listing request should be made.
+        """
+        env_cache = DeployEnvCache(directory=None)
+        mock_get = Mock(return_value=make_workflow_response(self.VALID_WORKFLOW_YAML, blob_sha="blob1"))
+        monkeypatch.setattr(github_client.session, "get", mock_get)
+
+        first = get_deploy_config(github_client, "owner/repo", ref="1.0.0", env_cache=env_cache)
+        second = get_deploy_config(github_client, "owner/repo", ref="1.0.1", env_cache=env_cache)
+
+        assert first == second
+        assert second.runtime_api_sha == "abc123def456"
+        called_urls = [call[0][0] for call in mock_get.call_args_list]
+        assert len(called_urls) == 3
+        assert called_urls[2].endswith("/contents/.github/workflows?ref=1.0.1")
+
+    def test_downloads_again_when_blob_sha_changes(self, monkeypatch, make_workflow_response, github_client):
+        """Test that a different blob SHA is never answered from the cache."""
+        env_cache = DeployEnvCache(directory=None)
+        old = make_workflow_response("env:\n  RUNTIME_API_SHA: old\n", blob_sha="blob1")
+        new = make_workflow_response("env:\n  RUNTIME_API_SHA: new\n", blob_sha="blob2")
+        monkeypatch.setattr(github_client.session, "get", Mock(side_effect=[old, old, new, new]))
+
+        get_deploy_config(github_client, "owner/repo", ref="1.0.0", env_cache=env_cache)
+        result = get_deploy_config(github_client, "owner/repo", ref="1.0.1", env_cache=env_cache)
+
+        assert result.runtime_api_sha == "new"
+
+    def test_includes_authorization_header(self):
+        """Test that the shared client sends the token as a Bearer Authorization header."""
+        with update_openhands_charts.GitHubClient("my-secret-token") as client:
+            assert client.session.headers["Authorization"] == "Bearer my-secret-token"
+
+    def test_returns_empty_string_when_env_key_missing(self, monkeypatch, make_workflow_response, github_client):
         """Test that missing env keys return empty string (not None).
 
         Edge case: Workflow has env section but lacks expected keys.
@@ -645,17 +808,17 @@ env:
         # Workflow without expected keys - simulates incomplete workflow config
         response = make_workflow_response("env:\n  OTHER_VAR: value\n")
         monkeypatch.setattr(
-            "update_openhands_charts.requests.get",
+            github_client.session, "get",
             Mock(return_value=response)
         )
 
-        result = get_deploy_config("token", "owner/repo")
+        result = get_deploy_config(github_client, "owner/repo")
 
         assert result is not None
         assert result.runtime_api_sha == ""
         assert result.openhands_runtime_image_tag == ""
 
-    def test_returns_empty_string_when_env_section_missing(self, monkeypatch, make_workflow_response):
+    def test_returns_empty_string_when_env_section_missing(self, monkeypatch, make_workflow_response, github_client):
         """Test that missing env section returns empty string.
 
         Edge case: Valid workflow YAML but no env section at all.
@@ -664,11 +827,11 @@ env:
         # Workflow without env section - simulates minimal workflow file
         response = make_workflow_response("name: deploy\njobs: {}\n")
         monkeypatch.setattr(
-            "update_openhands_charts.requests.get",
+            github_client.session, "get",
             Mock(return_value=response)
         )
 
-        result = get_deploy_config("token", "owner/repo")
+        result = get_deploy_config(github_client, "owner/repo")
 
         assert result is not None
         assert result.runtime_api_sha == ""
@@ -690,15 +853,15 @@ env:
         # =====================================================================
         (
             "connection_timeout",
-            lambda Mock, _: Mock(side_effect=Exception("Connection timed out")),
+            lambda Mock: Mock(side_effect=Exception("Connection timed out")),
         ),
         (
             "connection_refused",
-            lambda Mock, _: Mock(side_effect=Exception("Connection refused")),
+            lambda Mock: Mock(side_effect=Exception("Connection refused")),
         ),
         (
             "dns_resolution_failed",
-            lambda Mock, _: Mock(side_effect=Exception("Name resolution failed")),
+            lambda Mock: Mock(side_effect=Exception("Name resolution failed")),
         ),
         # =====================================================================
         # HTTP error responses (4xx client errors vs 5xx server errors)
@@ -707,57 +870,48 @@ env:
         # =====================================================================
         (
             "http_401_unauthorized",
-            lambda Mock, _: _make_http_error_response(Mock, 401, "Unauthorized"),
+            lambda Mock: _make_http_error_response(Mock, 401, "Unauthorized"),
         ),
         (
             "http_403_forbidden",
-            lambda Mock, _: _make_http_error_response(Mock, 403, "Forbidden"),
+            lambda Mock: _make_http_error_response(Mock, 403, "Forbidden"),
         ),
         (
             "http_404_not_found",
-            lambda Mock, _: _make_http_error_response(Mock, 404, "Not Found"),
+            lambda Mock: _make_http_error_response(Mock, 404, "Not Found"),
         ),
         (
             "http_500_server_error",
-            lambda Mock, _: _make_http_error_response(Mock, 500, "Internal Server Error"),
+            lambda Mock: _make_http_error_response(Mock, 500, "Internal Server Error"),
         ),
         (
             "http_502_bad_gateway",
-            lambda Mock, _: _make_http_error_response(Mock, 502, "Bad Gateway"),
+            lambda Mock: _make_http_error_response(Mock, 502, "Bad Gateway"),
         ),
         (
             "http_503_unavailable",
-            lambda Mock, _: _make_http_error_response(Mock, 503, "Service Unavailable"),
+            lambda Mock: _make_http_error_response(Mock, 503, "Service Unavailable"),
         ),
         # =====================================================================
-        # Response parsing errors (data corruption or API contract violations)
-        # Recovery: These indicate unexpected API behavior; check GitHub status
-        #           or report bug if persistent. Update should be skipped.
+        # Directory listing errors (data corruption or API contract violations)
+        # Recovery: These indicate unexpected API behavior or a renamed
+        #           workflow; check the deploy repository. Update should be skipped.
         # =====================================================================
         (
             "invalid_json_response",
-            lambda Mock, _: _make_json_error_response(Mock),
-        ),
-        (
-            "missing_content_key",
-            lambda Mock, _: _make_missing_key_response(Mock, {}),
+            lambda Mock: _make_json_error_response(Mock),
         ),
         (
-            "null_content_value",
-            lambda Mock, _: _make_missing_key_response(Mock, {"content": None}),
+            "deploy_yaml_missing_from_listing",
+            lambda Mock: _make_listing_response(Mock, [{"name": "ci.yaml", "sha": "abc"}]),
         ),
-        # =====================================================================
-        # Base64 decoding errors (corrupted file content in repository)
-        # Recovery: Check the workflow file in the repository for corruption;
-        #           these errors indicate the file content itself is invalid.
-        # =====================================================================
         (
-            "invalid_base64_content",
-            lambda Mock, _: _make_invalid_base64_response(Mock, "not-valid-base64!!!"),
+            "missing_sha_key",
+            lambda Mock: _make_listing_response(Mock, [{"name": "deploy.yaml"}]),
         ),
         (
-            "corrupted_base64_content",
-            lambda Mock, _: _make_invalid_base64_response(Mock, "YWJj==="),  # Invalid padding
+            "listing_not_a_directory",
+            lambda Mock: _make_listing_response(Mock, {"name": "workflows", "type": "file"}),
         ),
         # =====================================================================
         # YAML parsing errors (malformed workflow file syntax)
@@ -766,14 +920,14 @@ env:
         # =====================================================================
         (
             "invalid_yaml_syntax",
-            lambda Mock, base64: _make_invalid_yaml_response(Mock, base64, "{{invalid: yaml: ::"),
+            lambda Mock: _make_invalid_yaml_response(Mock, "{{invalid: yaml: ::"),
         ),
         (
             "yaml_with_tabs",
-            lambda Mock, base64: _make_invalid_yaml_response(Mock, base64, "env:\n\t\tinvalid_indent: true"),
+            lambda Mock: _make_invalid_yaml_response(Mock, "env:\n\t\tinvalid_indent: true"),
         ),
     ])
-    def test_returns_none_and_prints_error(self, error_name, setup_mock, monkeypatch, capsys):
+    def test_returns_none_and_prints_error(self, error_name, setup_mock, monkeypatch, capsys, github_client):
         """Test that error scenarios return None and print an error message.
 
         All error paths in get_deploy_config should:
@@ -784,10 +938,10 @@ env:
         deploy config is temporarily unavailable, while providing clear diagnostic
         output for operators to investigate and resolve the underlying issue.
         """
-        mock_get = setup_mock(Mock, base64)
-        monkeypatch.setattr("update_openhands_charts.requests.get", mock_get)
+        mock_get = setup_mock(Mock)
+        monkeypatch.setattr(github_client.session, "get", mock_get)
 
-        result = get_deploy_config("fake-token", "owner/repo")
+        result = get_deploy_config(github_client, "owner/repo")
 
         assert result is None, f"Expected None for {error_name}, got {result}"
         captured = capsys.readouterr()
@@ -813,29 +967,90 @@ def _make_json_error_response(Mock):
     return Mock(return_value=mock_response)
 
 
-def _make_missing_key_response(Mock, json_data):
-    """Create a mock with JSON response missing required keys."""
+def _make_listing_response(Mock, json_data):
+    """Create a mock whose directory listing lacks a usable deploy.yaml entry."""
     mock_response = Mock()
     mock_response.raise_for_status = Mock()
     mock_response.json.return_value = json_data
     return Mock(return_value=mock_response)
 
 
-def _make_invalid_base64_response(Mock, invalid_content):
-    """Create a mock with invalid base64 content."""
+def _make_invalid_yaml_response(Mock, invalid_yaml):
+    """Create a mock with a valid listing but invalid raw YAML content."""
     mock_response = Mock()
     mock_response.raise_for_status = Mock()
-    mock_response.json.return_value = {"content": invalid_content}
+    mock_response.json.return_value = [{"name": "deploy.yaml", "sha": "abc"}]
+    mock_response.text = invalid_yaml
     return Mock(return_value=mock_response)
 
 
-def _make_invalid_yaml_response(Mock, base64_module, invalid_yaml):
-    """Create a mock with valid base64 but invalid YAML content."""
-    encoded = base64_module.b64encode(invalid_yaml.encode()).decode()
-    mock_response = Mock()
-    mock_response.raise_for_status = Mock()
-    mock_response.json.return_value = {"content": encoded}
-    return Mock(return_value=mock_response)
+class TestParseWorkflowEnv:
+    """Tests for parse_workflow_env, which reads the top-level env mapping."""
+
+    def test_reads_top_level_env(self):
+        content = """\
+name: deploy
+on: push
+env:
+  # pinned by release tooling
+  RUNTIME_API_SHA: abc123
+
+  OPENHANDS_RUNTIME_IMAGE_TAG: "1.0.0"
+jobs:
+  deploy:
+    runs-on: ubuntu-latest
+"""
+        assert parse_workflow_env(content) == {
+            "RUNTIME_API_SHA": "abc123",
+            "OPENHANDS_RUNTIME_IMAGE_TAG": "1.0.0",
+        }
+
+    def test_ignores_nested_env_keys(self):
+        """Test that job-level env blocks are not mistaken for the top-level one."""
+        content = "jobs:\n  deploy:\n    env:\n      RUNTIME_API_SHA: nested\n"
+
+        assert parse_workflow_env(content) == {}
+
+    @pytest.mark.parametrize("content", [
+        pytest.param("env: {RUNTIME_API_SHA: abc123}\n", id="flow style"),
+        pytest.param("shared: &pins\n  RUNTIME_API_SHA: abc123\nenv: *pins\n", id="alias"),
+        pytest.param(
+            "shared: &pins\n  RUNTIME_API_SHA: old\nenv:\n  <<: *pins\n  RUNTIME_API_SHA: abc123\n",
+            id="merge key",
+        ),
+    ])
+    def test_reads_env_in_any_yaml_form(self, content):
+        """Test that env is read the way any YAML reader would.
+
+        TDD Rationale: Cutting the env block out of the text gave an empty or
+        wrong env for these forms without any error.
+        """
+        assert parse_workflow_env(content)["RUNTIME_API_SHA"] == "abc123"
+
+
+class TestDeployEnvCache:
+    """Tests for the blob-SHA keyed DeployEnvCache."""
+
+    def test_persists_entries_across_instances(self, tmp_path):
+        """Test that a later run reads entries written by an earlier one."""
+        DeployEnvCache(tmp_path).put("blob1", {"RUNTIME_API_SHA": "abc123"})
+
+        assert DeployEnvCache(tmp_path).get("blob1") == {"RUNTIME_API_SHA": "abc123"}
+        assert DeployEnvCache(tmp_path).get("blob2") is None
+
+    def test_ignores_corrupt_entries(self, tmp_path):
+        """Test that an unreadable entry is treated as a miss, not an error."""
+        (tmp_path / "blob1.json").write_text("{truncated")
+
+        assert DeployEnvCache(tmp_path).get("blob1") is None
+
+    def test_memory_only_without_directory(self, tmp_path):
+        """Test that directory=None (--no-cache) keeps entries in memory only."""
+        cache = DeployEnvCache(directory=None)
+        cache.put("blob1", {"RUNTIME_API_SHA": "abc123"})
+
+        assert cache.get("blob1") == {"RUNTIME_API_SHA": "abc123"}
+        assert list(tmp_path.iterdir()) == []
 
 
 class TestUpdateValues:
@@ -1073,6 +1288,139 @@ serviceAccount:
         assert result.has_error_containing("warmRuntimes")
 
 
+class TestTagRewriter:
+    """Tests for TagRewriter, which resolves every tag rule of a file from one parse."""
+
+    REWRITER = TagRewriter([
+        TagRule("first tag", "first", "FIRST_IMAGE_TAG"),
+        TagRule("second tag", "items[name=b].image", "SECOND_IMAGE_TAG", reference=True),
+    ])
+    PINS = {"FIRST_IMAGE_TAG": "aa", "SECOND_IMAGE_TAG": "2.0"}
+
+    def test_replaces_only_tag_spans(self):
+        """Test that everything outside the matched tags is byte-identical."""
+        content = '# keep   this\nfirst:   a  # comment\nitems:\n  - name: b\n    image: "repo/b:1.0"\n'
+        result = update_openhands_charts.UpdateResult()
+
+        updated = self.REWRITER.rewrite(content, self.PINS, result)
+
+        assert updated == '# keep   this\nfirst:   aa  # comment\nitems:\n  - name: b\n    image: "repo/b:2.0"\n'
+        assert result.changes == (("first tag", "a", "aa"), ("second tag", "1.0", "2.0"))
+
+    def test_paths_survive_reformatting(self):
+        """Test that layout changes do not break the rules.
+
+        TDD Rationale: The regexes these rules replace stopped matching
+        whenever someone reindented a file or reordered keys.
+        """
+        content = "items: [{image: 'repo/b:2.0', name: b}]\nfirst:\n      a\n"
+        result = update_openhands_charts.UpdateResult()
+
+        updated = self.REWRITER.rewrite(content, self.PINS, result)
+
+        assert updated == "items: [{image: 'repo/b:2.0', name: b}]\nfirst:\n      aa\n"
+        assert result.unchanged == (("second tag", "2.0"),)
+
+    def test_reports_match_lines(self):
+        result = update_openhands_charts.UpdateResult()
+
+        self.REWRITER.rewrite("items:\n- name: b\n  image: repo/b:1.0\nfirst: a\n", self.PINS, result)
+
+        assert result.locations == {"first tag": 4, "second tag": 3}
+
+    def test_multiple_matches_are_an_error(self):
+        """Test that an ambiguous rule changes nothing.
+
+        TDD Rationale: re.sub used to rewrite every match while reporting
+        only the first, silently changing tags nobody asked about.
+        """
+        content = "first: a\nitems:\n- name: b\n  image: repo/b:1.0\n- name: b\n  image: repo/b:1.0\n"
+        result = update_openhands_charts.UpdateResult()
+
+        updated = self.REWRITER.rewrite(content, self.PINS, result)
+
+        assert updated == content.replace("first: a", "first: aa")
+        assert result.errors == ["Found 2 matches for second tag in values.yaml (lines 4, 6)"]
+
+    @pytest.mark.parametrize("content,error", [
+        pytest.param("first: aa\nitems:\n- name: b\n  image: registry:5000/b\n",
+                     "Could not find second tag", id="reference-without-tag"),
+        pytest.param("first:\n  nested: a\n", "Could not update first tag", id="not-a-scalar"),
+        pytest.param("first: [a\n", "Could not parse values.yaml", id="invalid-yaml"),
+    ])
+    def test_reports_errors(self, content, error):
+        result = update_openhands_charts.UpdateResult()
+
+        updated = self.REWRITER.rewrite(content, self.PINS, result)
+
+        assert updated == content
+        assert result.has_error_containing(error)
+
+    def test_openhands_warm_runtimes_keeps_closing_quote(self, sample_openhands_values_full):
+        result = update_openhands_charts.UpdateResult()
+
+        updated = update_openhands_charts.apply_openhands_values(
+            sample_openhands_values_full, "cloud-1.1.0", "cloud-1.1.0-nikolaik", result
+        )
+
+        assert 'image: "ghcr.io/openhands/runtime:cloud-1.1.0-nikolaik"\n' in updated
+        assert result.change_count == 3
+
+
+class TestImageTagRules:
+    """Tests for the IMAGE_TAG_RULES table against the charts in this repository."""
+
+    CHARTS_DIR = Path(__file__).parent.parent.parent / "charts"
+
+    def test_covers_every_chart(self):
+        charts = {path.parent.name for path in self.CHARTS_DIR.glob("*/Chart.yaml")}
+
+        assert set(IMAGE_TAG_RULES) == charts
+
+    @pytest.mark.parametrize("chart", [chart for chart, rules in IMAGE_TAG_RULES.items() if rules])
+    def test_every_rule_matches_once(self, chart):
+        """Test that each rule resolves to exactly one tag in the real values.yaml.
+
+        The charts may run agent-server instead of the runtime image; the
+        layout is the same, so the check runs with the runtime image in its place.
+        """
+        result = update_openhands_charts.UpdateResult()
+        pins = {rule.source: "0000000000" for rule in IMAGE_TAG_RULES[chart]}
+        content = (self.CHARTS_DIR / chart / "values.yaml").read_text()
+        content = content.replace("ghcr.io/openhands/agent-server", update_openhands_charts.RUNTIME_IMAGE_REPOSITORY)
+
+        CHART_REWRITERS[chart].rewrite(content, pins, result)
+
+        assert result.errors == []
+        assert set(result.locations) == {rule.name for rule in IMAGE_TAG_RULES[chart]}
+
+    @pytest.mark.parametrize("chart,values_fixture", [
+        ("openhands", "sample_openhands_values_full"),
+        ("runtime-api", "sample_runtime_api_values"),
+    ])
+    def test_agent_server_images_are_left_alone(self, chart, values_fixture, request):
+        """Test that the runtime image tag is never written into an agent-server image.
+
+        TDD Rationale: OPENHANDS_RUNTIME_IMAGE_TAG is a tag of
+        ghcr.io/openhands/runtime; written into an agent-server pin it names
+        an image that does not exist.
+        """
+        result = update_openhands_charts.UpdateResult()
+        content = request.getfixturevalue(values_fixture).replace(
+            "ghcr.io/openhands/runtime\n", "ghcr.io/openhands/agent-server\n"
+        ).replace("ghcr.io/openhands/runtime:", "ghcr.io/openhands/agent-server:")
+
+        updated = CHART_REWRITERS[chart].rewrite(content, {"OPENHANDS_RUNTIME_IMAGE_TAG": "9.9.9-nikolaik"}, result)
+
+        assert "agent-server" in content
+        assert "9.9.9-nikolaik" not in updated
+        assert any(error.startswith("Could not find") and "runtime" in error for error in result.errors)
+
+    def test_image_loader_follows_no_pin(self):
+        """Test that image-loader, which pre-pulls agent-server, has no release-pinned tag."""
+        assert IMAGE_TAG_RULES["image-loader"] == ()
+
+
 class TestConditionalChartVersionBump:
     """Tests for conditional chart version bumping across both chart types.
 
@@ -1251,6 +1599,44 @@ class TestDryRun:
         assert temp_values_file.read_text() != original_content
 
 
+    @pytest.mark.parametrize("constant,update", [
+        pytest.param(
+            "CHART_PATH",
+            lambda path: update_openhands_chart(path, NEW_APP_VERSION, NEW_RUNTIME_API_VERSION),
+            id="openhands chart",
+        ),
+        pytest.param(
+            "VALUES_PATH",
+            lambda path: update_openhands_values(path, "cloud-1.1.0", "cloud-1.1.0-nikolaik"),
+            id="openhands values",
+        ),
+        pytest.param("RUNTIME_API_CHART_PATH", update_runtime_api_chart, id="runtime-api chart"),
+        pytest.param(
+            "RUNTIME_API_VALUES_PATH",
+            lambda path: update_runtime_api_values(path, "c4b5a6978d8e9f0", "cloud-1.1.0-nikolaik"),
+            id="runtime-api values",
+        ),
+    ])
+    def test_writes_go_through_commit_files(self, chart_paths, monkeypatch, constant, update):
+        """Test that the single-file updaters replace files atomically.
+
+        TDD Rationale: A bare write_text interrupted midway leaves a truncated
+        chart; commit_files only renames a fully written temporary file.
+        """
+        path = chart_paths[constant]
+        original = path.read_text()
+        committed = []
+        monkeypatch.setattr(
+            update_openhands_charts, "commit_files", lambda files, originals: committed.append((files, originals))
+        )
+
+        update(path)
+
+        assert list(committed[0][0]) == [path]
+        assert committed[0][1] == {path: original}
+        assert path.read_text() == original
+
+
 class TestUpdateRuntimeApiChart:
     """Tests for update_runtime_api_chart function."""
 
@@ -1420,53 +1806,64 @@ class TestMainOutputMessages:
 class TestGetLatestCloudTag:
     """Tests for get_latest_cloud_tag function.
 
-    Uses mocked GitHub API responses for fast, deterministic tests.
+    Uses a mocked matching-refs response for fast, deterministic tests. The
+    endpoint only returns refs starting with the cloud- prefix, but may still
+    include tags that are not strict cloud-X.Y.Z releases.
     """
 
-    def test_returns_first_matching_cloud_tag(self, mock_github_tags):
-        """Test that function returns the first cloud-X.Y.Z formatted tag."""
-        mock_github_tags(["latest", "cloud-1.20.0", "cloud-1.19.0"])
+    def test_returns_highest_cloud_tag_regardless_of_listing_order(self, mock_github_tags, github_client):
+        """Test that the highest semantic version wins, not the first listed tag."""
+        mock_github_tags(["cloud-1.19.0", "cloud-1.20.0", "cloud-1.2.0"])
 
-        result = get_latest_cloud_tag("fake-token", "All-Hands-AI/OpenHands")
+        result = get_latest_cloud_tag(github_client, "All-Hands-AI/OpenHands")
 
         assert result == "cloud-1.20.0"
 
-    def test_skips_non_cloud_tags(self, mock_github_tags):
-        """Test that non-cloud tags are skipped."""
-        mock_github_tags(["v1.0.0", "release-2.0", "cloud-1.5.0"])
+    def test_compares_versions_numerically(self, mock_github_tags, github_client):
+        """Test that 1.10.0 sorts above 1.9.0 (numeric, not lexical, comparison)."""
+        mock_github_tags(["cloud-1.9.0", "cloud-1.10.0"])
+
+        result = get_latest_cloud_tag(github_client, "owner/repo")
+
+        assert result == "cloud-1.10.0"
 
-        result = get_latest_cloud_tag("fake-token", "owner/repo")
+    def test_skips_non_semver_cloud_tags(self, mock_github_tags, github_client):
+        """Test that prefix matches that are not cloud-X.Y.Z are skipped."""
+        mock_github_tags(["cloud-9.0.0-rc1", "cloud-latest", "cloud-1.5.0"])
+
+        result = get_latest_cloud_tag(github_client, "owner/repo")
 
         assert result == "cloud-1.5.0"
 
-    def test_returns_none_when_no_cloud_tags(self, mock_github_tags):
+    def test_returns_none_when_no_cloud_tags(self, mock_github_tags, github_client):
         """Test that None is returned when no cloud tags exist."""
-        mock_github_tags(["v1.0.0", "latest"])
+        mock_github_tags([])
 
-        result = get_latest_cloud_tag("fake-token", "owner/repo")
+        result = get_latest_cloud_tag(github_client, "owner/repo")
 
         assert result is None
 
-    def test_returns_none_for_invalid_repo(self, mock_github_tags, capsys):
+    def test_fetches_prefix_filtered_refs_in_single_request(self, mock_github_tags, github_client):
+        """Test that tags are listed with one matching-refs request."""
+        mock_get = mock_github_tags([f"cloud-1.{minor}.0" for minor in range(100)])
+
+        result = get_latest_cloud_tag(github_client, "owner/repo")
+
+        assert result == "cloud-1.99.0"
+        mock_get.assert_called_once()
+        called_url = mock_get.call_args[0][0]
+        assert called_url == "https://api.github.com/repos/owner/repo/git/matching-refs/tags/cloud-"
+
+    def test_returns_none_for_invalid_repo(self, mock_github_tags, capsys, github_client):
         """Test that None is returned and error is printed for invalid repository."""
         mock_github_tags(repo_error=Exception("Repository not found"))
 
-        result = get_latest_cloud_tag("fake-token", "nonexistent/repo")
+        result = get_latest_cloud_tag(github_client, "nonexistent/repo")
 
         assert result is None
         captured = capsys.readouterr()
         assert "Error fetching tags" in captured.out
 
-    def test_no_redirect_message_in_output(self, mock_github_tags, capsys):
-        """Test that PyGithub redirect messages are suppressed."""
-        mock_github_tags(["cloud-1.0.0"])
-
-        get_latest_cloud_tag("fake-token", "owner/repo")
-
-        captured = capsys.readouterr()
-        assert "redirect" not in captured.out.lower()
-        assert "following" not in captured.out.lower()
-
 
 class TestCloudTagExists:
     """Tests for cloud_tag_exists function.
@@ -1474,43 +1871,875 @@ class TestCloudTagExists:
     Uses mocked GitHub API responses for fast, deterministic tests.
     """
 
-    def test_returns_true_when_tag_exists(self, mock_github_ref):
+    def test_returns_true_when_tag_exists(self, mock_github_ref, github_client):
         """Test that function returns True when the tag reference is found."""
-        _, mock_repo = mock_github_ref(tag_exists=True)
+        mock_get = mock_github_ref(tag_exists=True)
 
-        result = cloud_tag_exists("fake-token", "All-Hands-AI/OpenHands", "cloud-1.20.0")
+        result = cloud_tag_exists(github_client, "All-Hands-AI/OpenHands", "cloud-1.20.0")
 
         assert result is True
-        mock_repo.get_git_ref.assert_called_once_with("tags/cloud-1.20.0")
+        mock_get.assert_called_once()
+        called_url = mock_get.call_args[0][0]
+        assert called_url == "https://api.github.com/repos/All-Hands-AI/OpenHands/git/ref/tags/cloud-1.20.0"
 
-    def test_returns_false_when_tag_not_found(self, mock_github_ref):
-        """Test that function returns False when get_git_ref raises exception."""
+    def test_returns_false_when_tag_not_found(self, mock_github_ref, github_client):
+        """Test that function returns False when the ref lookup returns 404."""
         mock_github_ref(tag_exists=False)
 
-        result = cloud_tag_exists("fake-token", "All-Hands-AI/OpenHands", "cloud-99999.0.0")
+        result = cloud_tag_exists(github_client, "All-Hands-AI/OpenHands", "cloud-99999.0.0")
 
         assert result is False
 
-    def test_returns_false_for_invalid_repo(self, mock_github_ref):
-        """Test that function returns False when repository doesn't exist."""
-        mock_github_ref(repo_error=Exception("Repository not found"))
+    def test_returns_false_when_request_fails(self, mock_github_ref, github_client):
+        """Test that function returns False when the request itself fails."""
+        mock_github_ref(request_error=Exception("Connection refused"))
 
-        result = cloud_tag_exists("fake-token", "nonexistent/repo", "cloud-1.0.0")
+        result = cloud_tag_exists(github_client, "nonexistent/repo", "cloud-1.0.0")
 
         assert result is False
 
-    def test_handles_various_tag_formats(self, mock_github_ref):
+    def test_handles_various_tag_formats(self, mock_github_ref, github_client):
         """Test that function correctly queries different tag formats."""
-        _, mock_repo = mock_github_ref(tag_exists=True)
+        mock_get = mock_github_ref(tag_exists=True)
 
         # Test various tag formats
-        cloud_tag_exists("fake-token", "owner/repo", "cloud-1.0.0")
-        cloud_tag_exists("fake-token", "owner/repo", "cloud-10.20.30")
+        cloud_tag_exists(github_client, "owner/repo", "cloud-1.0.0")
+        cloud_tag_exists(github_client, "owner/repo", "cloud-10.20.30")
 
         # Verify correct ref format is used
-        calls = mock_repo.get_git_ref.call_args_list
-        assert calls[0][0][0] == "tags/cloud-1.0.0"
-        assert calls[1][0][0] == "tags/cloud-10.20.30"
+        calls = mock_get.call_args_list
+        assert calls[0][0][0].endswith("/git/ref/tags/cloud-1.0.0")
+        assert calls[1][0][0].endswith("/git/ref/tags/cloud-10.20.30")
+
+    def test_requests_share_the_client_session(self, mock_github_ref, github_client):
+        """Test that repeated lookups go through the single injected client."""
+        mock_get = mock_github_ref(tag_exists=True)
+
+        cloud_tag_exists(github_client, "owner/repo", "cloud-1.0.0")
+        cloud_tag_exists(github_client, "owner/repo", "cloud-1.0.1")
+
+        assert mock_get.call_count == 2
+        assert github_client.stats.request_count == 2
+
+
+class TestUpdatePipeline:
+    """Tests for the concurrent process_updates pipeline.
+
+    The four local chart files are written to a temporary directory by the
+    chart_paths fixture; GitHub lookups are replaced with plain
+    functions so tests can observe how calls overlap.
+    """
+
+    DEPLOY_CONFIG = DeployConfig(
+        runtime_api_sha="abc1234567890def",
+        openhands_runtime_image_tag="cloud-1.1.0-nikolaik",
+    )
+
+    @pytest.fixture
+    def fake_github(self, monkeypatch):
+        """Replace GitHub lookups with fakes; returns a dict of call hooks."""
+        hooks = {
+            "latest": lambda: "cloud-1.1.0",
+            "exists": lambda tag: True,
+            "deploy": lambda ref: self.DEPLOY_CONFIG,
+        }
+        monkeypatch.setattr(
+            "update_openhands_charts.get_latest_cloud_tag", lambda client, repo: hooks["latest"]()
+        )
+        monkeypatch.setattr(
+            "update_openhands_charts.cloud_tag_exists", lambda client, repo, tag: hooks["exists"](tag)
+        )
+        monkeypatch.setattr(
+            "update_openhands_charts.fetch_deploy_config", lambda client, repo, ref, env_cache=None: hooks["deploy"](ref)
+        )
+        return hooks
+
+    def test_explicit_tag_checks_existence_and_fetches_config_in_parallel(
+        self, chart_paths, fake_github, github_client
+    ):
+        """Verify both network steps are in flight at the same time.
+
+        Each fake waits on a two-party barrier, which only releases if the
+        other call is running concurrently; a sequential pipeline would time out.
+        """
+        barrier = threading.Barrier(2, timeout=5)
+        fake_github["exists"] = lambda tag: barrier.wait() is not None
+        fake_github["deploy"] = lambda ref: (barrier.wait(), self.DEPLOY_CONFIG)[1]
+
+        update_openhands_charts.process_updates(github_client, dry_run=True, cloud_tag="cloud-1.1.0")
+
+    def test_output_order_matches_sequential_run(self, chart_paths, fake_github, github_client, capsys):
+        """Verify progress lines are printed in the original sequential order."""
+        update_openhands_charts.process_updates(github_client, dry_run=True)
+
+        out = capsys.readouterr().out
+        expected_order = [
+            "Fetching latest versions...",
+            "OpenHands cloud tag: cloud-1.1.0",
+            "OpenHands-Cloud openhands chart appVersion: cloud-1.0.0",
+            "Using deploy tag: 1.1.0",
+            "Deploy config (from 1.1.0):",
+            "Updating runtime-api chart...",
+            "Updated runtime-api image tag: sha-0c907c9 -> sha-abc1234",
+            "Updated runtime-api chart version: 0.2.6 -> 0.2.7",
+            "Updating openhands chart...",
+            "Updated enterprise-server image tag: cloud-1.0.0 -> cloud-1.1.0",
+            "Updated runtime-api version: 0.1.10 -> 0.2.7",
+            "Phase timings",
+        ]
+        positions = [out.index(line) for line in expected_order]
+        assert positions == sorted(positions)
+
+    def test_reports_wall_time_per_phase(self, chart_paths, fake_github, github_client, capsys):
+        """Verify each pipeline phase appears in the timing report."""
+        update_openhands_charts.process_updates(github_client, dry_run=True, cloud_tag="cloud-1.1.0")
+
+        out = capsys.readouterr().out
+        timings = out[out.index("Phase timings"):]
+        for phase in [
+            "parse local charts",
+            "resolve cloud tag",
+            "fetch deploy config",
+            "rewrite values",
+            "update runtime-api chart",
+            "update openhands chart",
+            "write chart files",
+            "Total wall time",
+        ]:
+            assert phase in timings
+
+    def test_missing_tag_hides_parallel_deploy_fetch_error(self, chart_paths, fake_github, github_client, capsys):
+        """Verify a failed speculative deploy fetch adds no output for a missing tag."""
+        fake_github["exists"] = lambda tag: False
+
+        def _not_found(ref):
+            raise Exception("404 Not Found")
+
+        fake_github["deploy"] = _not_found
+
+        update_openhands_charts.process_updates(github_client, dry_run=True, cloud_tag="cloud-9.9.9")
+
+        out = capsys.readouterr().out
+        assert "Error: Cloud tag 'cloud-9.9.9' does not exist" in out
+        assert "Error fetching deploy config" not in out
+
+    def test_already_current_discards_speculative_deploy_fetch(
+        self, chart_paths, fake_github, github_client, capsys, caplog
+    ):
+        """Verify an unneeded deploy fetch is retrieved, so its error is neither raised nor logged.
+
+        TDD Rationale: With an explicit tag the fetch starts before the
+        current appVersion is known. Left unawaited, its exception is logged
+        as "Task exception was never retrieved" when the task is collected.
+        """
+        fetched = threading.Event()
+
+        def _budget_exceeded(ref):
+            fetched.set()
+            raise update_openhands_charts.RequestBudgetExceeded("budget spent")
+
+        fake_github["deploy"] = _budget_exceeded
+        fake_github["exists"] = lambda tag: fetched.wait(timeout=5)
+
+        update_openhands_charts.process_updates(github_client, dry_run=True, cloud_tag="cloud-1.0.0")
+        gc.collect()
+
+        assert "Charts are already up to date" in capsys.readouterr().out
+        assert "never retrieved" not in caplog.text
+
+    def test_deploy_fetch_error_is_reported_in_sequence(self, chart_paths, fake_github, github_client, capsys):
+        """Verify deploy fetch failures print the same messages as before."""
+        def _server_error(ref):
+            raise Exception("HTTP 500")
+
+        fake_github["deploy"] = _server_error
+
+        update_openhands_charts.process_updates(github_client, dry_run=True)
+
+        out = capsys.readouterr().out
+        assert out.index("Using deploy tag: 1.1.0") < out.index("Error fetching deploy config: HTTP 500")
+        assert "Could not fetch deploy config from tag 1.1.0" in out
+
+    def test_writes_all_four_files(self, chart_paths, fake_github, github_client):
+        """Verify a non-dry run still writes the updated files."""
+        update_openhands_charts.process_updates(github_client, cloud_tag="cloud-1.1.0")
+
+        assert get_chart_value(chart_paths["CHART_PATH"], "appVersion") == "cloud-1.1.0"
+        assert get_dependency_version(chart_paths["CHART_PATH"], "runtime-api") == "0.2.7"
+        assert get_chart_value(chart_paths["RUNTIME_API_CHART_PATH"], "version") == "0.2.7"
+        assert_file_contains(chart_paths["VALUES_PATH"], "tag: cloud-1.1.0")
+        assert_file_contains(chart_paths["RUNTIME_API_VALUES_PATH"], "tag: sha-abc1234")
+
+    def test_failure_midway_leaves_files_untouched(self, chart_paths, fake_github, github_client, monkeypatch):
+        """Verify runtime-api changes are not written when a later step fails.
+
+        TDD Rationale: Files are written in one final phase, so a run that
+        stops after the runtime-api update must not leave a half-bumped tree.
+        """
+        originals = {name: path.read_text() for name, path in chart_paths.items()}
+
+        def _fail(*args, **kwargs):
+            raise RuntimeError("openhands update failed")
+
+        monkeypatch.setattr("update_openhands_charts.apply_openhands_chart", _fail)
+
+        with pytest.raises(RuntimeError):
+            update_openhands_charts.process_updates(github_client, cloud_tag="cloud-1.1.0")
+
+        assert {name: path.read_text() for name, path in chart_paths.items()} == originals
+
+    def test_reads_each_file_once(self, chart_paths, fake_github, github_client, monkeypatch):
+        reads = []
+        read_text = Path.read_text
+        monkeypatch.setattr(Path, "read_text", lambda path, *args: reads.append(path) or read_text(path, *args))
+
+        update_openhands_charts.process_updates(github_client, cloud_tag="cloud-1.1.0")
+
+        chart_reads = [path for path in reads if path in chart_paths.values()]
+        assert sorted(chart_reads) == sorted(chart_paths.values())
+
+    def test_patch_out_applies_to_an_untouched_tree(self, chart_paths, fake_github, github_client, tmp_path):
+        """Verify --patch-out writes a patch equivalent to a normal run and no chart files.
+
+        TDD Rationale: CI computes the patch once and applies it elsewhere;
+        it must apply cleanly with git apply and produce the same files.
+        """
+        originals = {name: path.read_text() for name, path in chart_paths.items()}
+        patch_path = tmp_path / "charts.patch"
+
+        update_openhands_charts.process_updates(github_client, cloud_tag="cloud-1.1.0", patch_out=patch_path)
+
+        assert {name: path.read_text() for name, path in chart_paths.items()} == originals
+        subprocess.run(["git", "apply", patch_path], cwd=tmp_path.parent, check=True)
+        assert get_chart_value(chart_paths["CHART_PATH"], "appVersion") == "cloud-1.1.0"
+        assert get_chart_value(chart_paths["RUNTIME_API_CHART_PATH"], "version") == "0.2.7"
+        assert_file_contains(chart_paths["RUNTIME_API_VALUES_PATH"], "tag: sha-abc1234")
+
+    def test_worker_processes_match_sequential_run(
+        self, chart_paths, subchart_paths, fake_github, github_client, tmp_path, capsys
+    ):
+        """Verify a run on a process pool produces the same patch and report.
+
+        TDD Rationale: Values rewrites may finish in any order on the pool,
+        but the output and the openhands dependencies on the new sub-chart
+        and runtime-api versions must not depend on it.
+        """
+        deploy_config = DeployConfig(
+            "abc1234567890def", "cloud-1.1.0-nikolaik", {"AUTOMATION_SHA": "d82e4f1a", "PLUGIN_DIRECTORY_SHA": "1234567"}
+        )
+        fake_github["deploy"] = lambda ref: deploy_config
+        outputs = {}
+        for jobs in (1, 3):
+            patch_path = tmp_path / f"jobs-{jobs}.patch"
+            update_openhands_charts.process_updates(github_client, cloud_tag="cloud-1.1.0", patch_out=patch_path, jobs=jobs)
+            out = capsys.readouterr().out
+            outputs[jobs] = (patch_path.read_text(), out[:out.index("Writing chart files...")])
+
+        assert outputs[3] == outputs[1]
+        assert "+    version: 0.1.10" in outputs[3][0]
+
+    def test_diff_prints_changes_without_writing(self, chart_paths, fake_github, github_client, capsys):
+        original = chart_paths["CHART_PATH"].read_text()
+
+        update_openhands_charts.process_updates(github_client, cloud_tag="cloud-1.1.0", show_diff=True)
+
+        out = capsys.readouterr().out
+        assert f"+++ b/{chart_paths['CHART_PATH'].parent.parent.name}/openhands/Chart.yaml" in out
+        assert "\n-appVersion: cloud-1.0.0\n" in out
+        assert "\n+appVersion: cloud-1.1.0\n" in out
+        assert chart_paths["CHART_PATH"].read_text() == original
+
+    def test_report_records_every_change(self, chart_paths, fake_github, github_client, tmp_path):
+        """Verify --report writes one JSON object per change, timing and run event.
+
+        TDD Rationale: Orchestrators running many updates read the report
+        instead of parsing the human-readable output.
+        """
+        report_path = tmp_path / "report.jsonl"
+        with RunReport(report_path, repo="OpenHands-Cloud") as report:
+            update_openhands_charts.process_updates(github_client, cloud_tag="cloud-1.1.0", report=report)
+            update_openhands_charts.process_updates(github_client, cloud_tag="cloud-1.1.0", report=report)
+
+        records = [json.loads(line) for line in report_path.read_text().splitlines()]
+        first, second = ([r for r in records if r["run"] == run] for run in dict.fromkeys(r["run"] for r in records))
+        changes = {(r["chart"], r["key"]): (r["old"], r["new"]) for r in first if r["event"] == "change"}
+        assert changes[("openhands", "appVersion")] == ("cloud-1.0.0", "cloud-1.1.0")
+        assert changes[("runtime-api", "runtime-api chart version")] == ("0.2.6", "0.2.7")
+        assert {r["phase"] for r in first if r["event"] == "timing"} >= {"rewrite values", "write chart files"}
+        assert first[-1]["status"] == "changed"
+        assert f"{chart_paths['CHART_PATH'].parent.parent.name}/openhands/Chart.yaml" in first[-1]["changed_files"]
+        assert [r["event"] for r in second if r["event"] != "timing"] == ["run_start", "skipped", "run_end"]
+        assert second[-1]["status"] == "skipped"
+
+
+class TestChartFiles:
+    """Tests for the run-scoped store of chart files."""
+
+    def test_changes_are_staged_until_flush(self, chart_paths):
+        values_path = chart_paths["VALUES_PATH"]
+        original = values_path.read_text()
+        chart_files = ChartFiles()
+
+        chart_files.write(values_path, original + "# edited\n")
+        chart_files.openhands_chart.set("version", "9.9.9")
+
+        assert chart_files.read(values_path).endswith("# edited\n")
+        assert values_path.read_text() == original
+        assert sorted(chart_files.flush()) == sorted([values_path, chart_paths["CHART_PATH"]])
+        assert values_path.read_text().endswith("# edited\n")
+        assert get_chart_value(chart_paths["CHART_PATH"], "version") == "9.9.9"
+
+    def test_unchanged_text_is_not_written(self, chart_paths):
+        chart_files = ChartFiles()
+        chart_files.write(chart_paths["VALUES_PATH"], chart_files.openhands_values)
+
+        assert chart_files.flush() == []
+
+    def test_diff_marks_missing_final_newline(self, tmp_path):
+        path = tmp_path / "openhands" / "Chart.yaml"
+        chart_files = ChartFiles({path: "version: 0.1.0"})
+        chart_files.chart(path).set("version", "0.1.1")
+
+        assert chart_files.diff(tmp_path) == (
+            "--- a/openhands/Chart.yaml\n"
+            "+++ b/openhands/Chart.yaml\n"
+            "@@ -1 +1 @@\n"
+            "-version: 0.1.0\n"
+            "\\ No newline at end of file\n"
+            "+version: 0.1.1\n"
+            "\\ No newline at end of file\n"
+        )
+
+    def test_shares_one_editor_per_chart(self, chart_paths):
+        chart_files = ChartFiles()
+
+        assert chart_files.chart(chart_paths["CHART_PATH"]) is chart_files.openhands_chart
+
+
+class TestSubchartImages:
+    """Tests for updating the image-pinned sub-charts from the deploy.yaml image map."""
+
+    DEPLOY_CONFIG = DeployConfig(
+        runtime_api_sha="abc1234567890def",
+        openhands_runtime_image_tag="cloud-1.1.0-nikolaik",
+        images={
+            "AUTOMATION_SHA": "d82e4f1a6b7c8d9e",
+            "PLUGIN_DIRECTORY_SHA": "0e9a6d1f2b3c4d5e",
+            "INTEGRATIONS_HUB_IMAGE_TAG": "0.2.0",
+        },
+    )
+
+    def test_deploy_config_collects_every_image_pin(self, monkeypatch, make_workflow_response, github_client):
+        """Test that one deploy.yaml fetch yields the complete image map."""
+        workflow = """\
+env:
+  RUNTIME_API_SHA: abc123def456
+  OPENHANDS_RUNTIME_IMAGE_TAG: "cloud-1.21.0-nikolaik"
+  AUTOMATION_SHA: cf93073abc
+  INTEGRATIONS_HUB_IMAGE_TAG: latest
+  AWS_REGION: us-east-1
+"""
+        monkeypatch.setattr(github_client.session, "get", Mock(return_value=make_workflow_response(workflow)))
+
+        result = get_deploy_config(github_client, "owner/repo", ref="1.0.0")
+
+        assert result.images == {
+            "RUNTIME_API_SHA": "abc123def456",
+            "OPENHANDS_RUNTIME_IMAGE_TAG": "cloud-1.21.0-nikolaik",
+            "AUTOMATION_SHA": "cf93073abc",
+            "INTEGRATIONS_HUB_IMAGE_TAG": "latest",
+        }
+
+    @pytest.mark.parametrize("chart,pin,expected_tag", [
+        pytest.param("automation", "d82e4f1a6b7c8d9e", "sha-d82e4f1", id="sha-pin"),
+        pytest.param("integrations-hub", "0.2.0", "0.2.0", id="literal-tag"),
+    ])
+    def test_image_tag_formatting(self, chart, pin, expected_tag):
+        assert IMAGE_TAG_RULES[chart][0].format_tag(pin) == expected_tag
+
+    def test_updates_every_repository_and_keeps_quotes(self):
+        """Test that both plugin-directory images are rewritten in place.
+
+        TDD Rationale: The client and server tags are quoted strings; the
+        closing quote must survive the rewrite.
+        """
+        content = (
+            'client:\n  image:\n    repository: ghcr.io/openhands/plugin-directory-client\n    tag: "sha-0e9a6d1"\n'
+            'server:\n  image:\n    repository: ghcr.io/openhands/plugin-directory-server\n    tag: "sha-0e9a6d1"\n'
+        )
+        result = update_openhands_charts.UpdateResult()
+
+        content = CHART_REWRITERS["plugin-directory"].rewrite(content, {"PLUGIN_DIRECTORY_SHA": "1234567abc"}, result)
+
+        assert content.count('tag: "sha-1234567"\n') == 2
+        assert result.change_count == 2
+
+    def test_update_pass_bumps_changed_subcharts_only(self, subchart_paths):
+        chart_files = ChartFiles()
+        versions = update_charts_workflow(self.DEPLOY_CONFIG, "cloud-1.1.0", chart_files)
+        chart_files.flush()
+
+        assert {chart: versions[chart] for chart in update_openhands_charts.SUBCHARTS} == {
+            "automation": "0.1.10",
+            "plugin-directory": "0.1.9",
+            "integrations-hub": "0.1.10",
+        }
+        assert_file_contains(subchart_paths["automation"] / "values.yaml", "tag: sha-d82e4f1")
+        assert_file_contains(subchart_paths["integrations-hub"] / "values.yaml", "tag: 0.2.0")
+        assert_file_contains(subchart_paths["image-loader"] / "values.yaml", "tag: cloud-1.0.0-nikolaik")
+        assert get_chart_value(subchart_paths["plugin-directory"] / "Chart.yaml", "version") == "0.1.9"
+
+    def test_unpinned_subchart_is_skipped(self, subchart_paths, capsys):
+        deploy_config = DeployConfig("abc1234567890def", "cloud-1.1.0-nikolaik", {"AUTOMATION_SHA": "d82e4f1a"})
+
+        chart_files = ChartFiles()
+        versions = update_charts_workflow(deploy_config, "cloud-1.1.0", chart_files)
+        chart_files.flush()
+
+        assert set(update_openhands_charts.SUBCHARTS) & set(versions) == {"automation"}
+        assert "integrations-hub: INTEGRATIONS_HUB_IMAGE_TAG not pinned in deploy.yaml, skipping" in capsys.readouterr().out
+        assert_file_contains(subchart_paths["integrations-hub"] / "values.yaml", "tag: latest")
+
+    def test_pin_keys_map_rule_keys_to_deploy_keys(self, subchart_paths):
+        """Test that a sub-chart follows a deploy.yaml key with a different name.
+
+        TDD Rationale: The sub-chart key names are not confirmed against the
+        deploy workflow; --pin-key must fix a mismatch without a code change.
+        """
+        deploy_config = DeployConfig(
+            "abc1234567890def", "cloud-1.1.0-nikolaik", {"AUTOMATION_IMAGE_SHA": "d82e4f1a"}
+        ).with_pin_keys({"AUTOMATION_SHA": "AUTOMATION_IMAGE_SHA", "PLUGIN_DIRECTORY_SHA": "PLUGINS_SHA"})
+
+        chart_files = ChartFiles()
+        versions = update_charts_workflow(deploy_config, "cloud-1.1.0", chart_files)
+        chart_files.flush()
+
+        assert deploy_config.images == {"AUTOMATION_IMAGE_SHA": "d82e4f1a", "AUTOMATION_SHA": "d82e4f1a"}
+        assert versions["automation"] == "0.1.10"
+        assert_file_contains(subchart_paths["automation"] / "values.yaml", "tag: sha-d82e4f1")
+
+    def test_pin_key_argument(self, monkeypatch):
+        monkeypatch.setattr(sys, "argv", ["update_openhands_charts.py", "--pin-key", "AUTOMATION_SHA=AUTOMATION_IMAGE_SHA"])
+
+        assert dict(parse_args().pin_key) == {"AUTOMATION_SHA": "AUTOMATION_IMAGE_SHA"}
+
+    def test_malformed_pin_key_is_rejected(self, monkeypatch, capsys):
+        monkeypatch.setattr(sys, "argv", ["update_openhands_charts.py", "--pin-key", "AUTOMATION_SHA"])
+
+        with pytest.raises(SystemExit):
+            parse_args()
+
+        assert "expected RULE_KEY=DEPLOY_KEY" in capsys.readouterr().err
+
+    def test_nothing_is_written_before_flush(self, subchart_paths):
+        original = (subchart_paths["automation"] / "values.yaml").read_text()
+        chart_files = ChartFiles()
+
+        versions = update_charts_workflow(self.DEPLOY_CONFIG, "cloud-1.1.0", chart_files)
+
+        assert versions["automation"] == "0.1.10"
+        assert subchart_paths["automation"] / "values.yaml" in chart_files.changed_files()
+        assert (subchart_paths["automation"] / "values.yaml").read_text() == original
+        assert get_chart_value(subchart_paths["automation"] / "Chart.yaml", "version") == "0.1.9"
+
+    def test_update_pass_moves_openhands_dependencies(self, subchart_paths, chart_paths):
+        chart_files = ChartFiles()
+        update_charts_workflow(self.DEPLOY_CONFIG, "cloud-1.1.0", chart_files)
+        chart_files.flush()
+
+        assert get_dependency_version(chart_paths["CHART_PATH"], "automation") == "0.1.10"
+        assert get_dependency_version(chart_paths["CHART_PATH"], "plugin-directory") == "0.1.9"
+        assert get_dependency_version(chart_paths["CHART_PATH"], "runtime-api") == "0.2.7"
+
+    def test_dependency_bump_propagates_to_charts_without_image_tags(self, subchart_paths, chart_paths, tmp_path):
+        """Test that a chart depending on openhands is bumped in the same pass.
+
+        TDD Rationale: Dependents are found from every Chart.yaml, not a
+        fixed list, so a new umbrella chart needs no code change to follow
+        the charts it bundles.
+        """
+        (tmp_path / "platform").mkdir()
+        (tmp_path / "platform" / "Chart.yaml").write_text(
+            "name: platform\nversion: 1.0.0\ndependencies:\n  - name: openhands\n    version: 0.1.0\n"
+        )
+        chart_files = ChartFiles()
+
+        versions = update_charts_workflow(self.DEPLOY_CONFIG, "cloud-1.1.0", chart_files)
+        chart_files.flush()
+
+        assert versions["openhands"] == "0.1.1"
+        assert versions["platform"] == "1.0.1"
+        assert get_dependency_version(tmp_path / "platform" / "Chart.yaml", "openhands") == "0.1.1"
+
+    def test_openhands_chart_depends_on_new_subchart_versions(self, subchart_paths, chart_paths):
+        """Test that the openhands chart update moves the sub-chart dependencies."""
+        update_openhands_chart(
+            chart_paths["CHART_PATH"],
+            "cloud-1.1.0",
+            None,
+            subchart_versions={"automation": "0.1.10", "plugin-directory": "0.1.9"},
+        )
+
+        assert get_dependency_version(chart_paths["CHART_PATH"], "automation") == "0.1.10"
+        assert get_dependency_version(chart_paths["CHART_PATH"], "plugin-directory") == "0.1.9"
+        assert get_dependency_version(chart_paths["CHART_PATH"], "integrations-hub") == "0.1.9"
+
+
+class TestBackfill:
+    """Tests for --backfill planning across a range of cloud tags.
+
+    Planning runs the update workflow on in-memory copies of the charts,
+    so each release's chart state matches what a normal run would write.
+    """
+
+    CONFIG_1_1 = DeployConfig(runtime_api_sha="1111111aaaa", openhands_runtime_image_tag="cloud-1.1.0-nikolaik")
+    CONFIG_1_2 = DeployConfig(runtime_api_sha="1111111aaaa", openhands_runtime_image_tag="cloud-1.1.0-nikolaik")
+    CONFIG_1_3 = DeployConfig(runtime_api_sha="3333333cccc", openhands_runtime_image_tag="cloud-1.3.0-nikolaik")
+
+    @pytest.fixture
+    def chart_files(self, chart_paths):
+        return update_openhands_charts.load_chart_files()
+
+    @pytest.mark.parametrize("current,target,expected", [
+        pytest.param("cloud-1.1.0", "cloud-1.10.0", ["cloud-1.2.0", "cloud-1.9.0", "cloud-1.10.0"], id="numeric_order"),
+        pytest.param("cloud-1.2.0", "cloud-1.9.0", ["cloud-1.9.0"], id="target_inclusive"),
+        pytest.param(None, "cloud-1.2.0", ["cloud-1.1.0", "cloud-1.2.0"], id="no_current_version"),
+        pytest.param("cloud-1.10.0", "cloud-1.10.0", [], id="already_current"),
+    ])
+    def test_select_backfill_tags(self, current, target, expected):
+        tags = ["cloud-1.10.0", "cloud-1.2.0", "cloud-1.9.0", "cloud-1.1.0", "v2.0.0"]
+
+        assert update_openhands_charts.select_backfill_tags(tags, current, target) == expected
+
+    def test_plan_tracks_chart_versions_across_releases(self, chart_files):
+        """Test that each release builds on the previous release's state.
+
+        TDD Rationale: cloud-1.2 pins the same runtime-api SHA and image as
+        cloud-1.1, so only the openhands chart moves; the runtime-api chart
+        is bumped again only when cloud-1.3 changes its values.
+        """
+        plan = update_openhands_charts.build_backfill_plan(
+            chart_files,
+            ["cloud-1.1.0", "cloud-1.2.0", "cloud-1.3.0"],
+            {"cloud-1.1.0": self.CONFIG_1_1, "cloud-1.2.0": self.CONFIG_1_2, "cloud-1.3.0": self.CONFIG_1_3},
+        )
+
+        versions = [
+            (entry["appVersion"], entry["chart_versions"]["openhands"], entry["chart_versions"]["runtime-api"])
+            for entry in plan["releases"]
+        ]
+        assert versions == [
+            ("cloud-1.1.0", "0.1.1", "0.2.7"),
+            ("cloud-1.2.0", "0.1.2", "0.2.7"),
+            ("cloud-1.3.0", "0.1.3", "0.2.8"),
+        ]
+        assert plan["start"]["dependencies"]["openhands"]["runtime-api"] == "0.1.10"
+        assert plan["end"]["dependencies"]["openhands"]["runtime-api"] == "0.2.8"
+        assert plan["from"] == "cloud-1.0.0" and plan["to"] == "cloud-1.3.0"
+
+    def test_plan_lists_image_tag_changes(self, chart_files):
+        plan = update_openhands_charts.build_backfill_plan(
+            chart_files, ["cloud-1.3.0"], {"cloud-1.3.0": self.CONFIG_1_3}
+        )
+
+        changes = {(change["chart"], change["name"]): (change["old"], change["new"])
+                   for change in plan["releases"][0]["changes"]}
+        assert changes[("runtime-api", "runtime-api image tag")] == ("sha-0c907c9", "sha-3333333")
+        assert changes[("openhands", "runtime image tag")] == ("cloud-1.0.0-nikolaik", "cloud-1.3.0-nikolaik")
+        assert changes[("openhands", "enterprise-server image tag")] == ("cloud-1.0.0", "cloud-1.3.0")
+
+    def test_plan_updates_subcharts_and_openhands_dependencies(self, subchart_paths):
+        """Test that the plan covers every chart a normal update run touches."""
+        deploy_config = DeployConfig(
+            "1111111aaaa", "cloud-1.1.0-nikolaik", {"AUTOMATION_SHA": "d82e4f1a", "INTEGRATIONS_HUB_IMAGE_TAG": "0.2.0"}
+        )
+
+        plan = update_openhands_charts.build_backfill_plan(
+            update_openhands_charts.load_chart_files(), ["cloud-1.1.0"], {"cloud-1.1.0": deploy_config}
+        )
+
+        entry = plan["releases"][0]
+        changes = {(change["chart"], change["name"]): (change["old"], change["new"]) for change in entry["changes"]}
+        assert changes[("automation", "automation image tag")] == ("sha-cf93073", "sha-d82e4f1")
+        assert changes[("automation", "automation chart version")] == ("0.1.9", "0.1.10")
+        assert changes[("openhands", "automation version")] == ("0.1.9", "0.1.10")
+        assert entry["chart_versions"]["integrations-hub"] == "0.1.10"
+        assert entry["dependencies"]["openhands"]["integrations-hub"] == "0.1.10"
+        assert entry["errors"] == []
+        assert entry["chart_versions"]["plugin-directory"] == "0.1.9"
+
+    def test_backfill_matches_sequential_update_runs(self, subchart_paths, chart_paths, tmp_path):
+        """Test that the state after each planned release equals the charts after one update run per release.
+
+        TDD Rationale: The plan is only useful if it predicts what the
+        sequential runs will write, including version bumps that propagate
+        through the chart dependency graph.
+        """
+        plan_path = tmp_path / "plan.json"
+        with FakeGitHubAPI.from_fixture() as api, GitHubClient("fake-token", base_url=api.url) as client:
+            plan = update_openhands_charts.run_backfill(
+                client, plan_path, cloud_tag="cloud-1.30.0", env_cache=DeployEnvCache(directory=None)
+            )
+            sequential = []
+            for entry in plan["releases"]:
+                update_openhands_charts.process_updates(
+                    client, cloud_tag=entry["cloud_tag"], env_cache=DeployEnvCache(directory=None)
+                )
+                sequential.append(update_openhands_charts.chart_state(update_openhands_charts.load_chart_files()))
+
+        planned = [
+            {key: entry[key] for key in ("appVersion", "chart_versions", "dependencies")}
+            for entry in plan["releases"]
+        ]
+        assert len(planned) == 4
+        assert planned == sequential
+        assert plan["end"] == sequential[-1]
+        assert plan["end"]["chart_versions"]["automation"] != plan["start"]["chart_versions"]["automation"]
+
+    def test_failed_release_keeps_state_and_records_error(self, chart_files):
+        plan = update_openhands_charts.build_backfill_plan(
+            chart_files,
+            ["cloud-1.1.0", "cloud-1.2.0"],
+            {"cloud-1.1.0": self.CONFIG_1_1, "cloud-1.2.0": Exception("HTTP 404")},
+        )
+
+        failed = plan["releases"][1]
+        assert failed["errors"] == ["Error fetching deploy config: HTTP 404"]
+        assert failed["chart_versions"]["openhands"] == "0.1.1"
+        assert plan["end"]["appVersion"] == "cloud-1.1.0"
+
+    def test_fetches_deploy_configs_concurrently(self, monkeypatch):
+        """Test that deploy configs for different releases are fetched in parallel."""
+        barrier = threading.Barrier(3, timeout=5)
+
+        def fetch(client, cloud_tag, env_cache=None, index=None):
+            barrier.wait()
+            return cloud_tag
+
+        monkeypatch.setattr("update_openhands_charts.fetch_release_deploy_config", fetch)
+        tags = ["cloud-1.1.0", "cloud-1.2.0", "cloud-1.3.0"]
+
+        results = asyncio.run(update_openhands_charts.fetch_deploy_configs(None, tags))
+
+        assert results == {tag: tag for tag in tags}
+
+    def test_run_backfill_writes_plan_without_touching_charts(self, chart_paths, tmp_path):
+        """Test an end-to-end backfill over HTTP: one listing, JSON plan, charts untouched."""
+        original = {name: path.read_text() for name, path in chart_paths.items()}
+        plan_path = tmp_path / "plan.json"
+
+        with FakeGitHubAPI.from_fixture() as api, GitHubClient("fake-token", base_url=api.url) as client:
+            update_openhands_charts.run_backfill(
+                client, plan_path, cloud_tag="cloud-1.29.1", env_cache=DeployEnvCache(directory=None)
+            )
+
+        plan = json.loads(plan_path.read_text())
+        assert [entry["cloud_tag"] for entry in plan["releases"]] == [
+            "cloud-1.28.0", "cloud-1.29.0", "cloud-1.29.1",
+        ]
+        assert api.request_counts["matching-refs"] == 1
+        assert "git-ref" not in api.request_counts
+        assert {name: path.read_text() for name, path in chart_paths.items()} == original
+
+    def test_run_backfill_rejects_unknown_target(self, chart_paths, tmp_path, capsys):
+        with FakeGitHubAPI.from_fixture() as api, GitHubClient("fake-token", base_url=api.url) as client:
+            result = update_openhands_charts.run_backfill(client, tmp_path / "plan.json", cloud_tag="cloud-9.9.9")
+
+        assert result is None
+        assert not (tmp_path / "plan.json").exists()
+        assert "does not exist" in capsys.readouterr().out
+
+
+    @pytest.mark.parametrize("flags,rejected", [
+        pytest.param(["--watch"], "--watch", id="watch"),
+        pytest.param(["--diff"], "--diff", id="diff"),
+        pytest.param(["--patch-out", "charts.patch"], "--patch-out", id="patch-out"),
+        pytest.param(["--jobs", "4"], "--jobs", id="jobs"),
+        pytest.param(["--report", "runs.jsonl"], "--report", id="report"),
+        pytest.param(["--watch", "--diff"], "--watch, --diff", id="several"),
+    ])
+    def test_flags_a_backfill_ignores_are_rejected(self, monkeypatch, capsys, flags, rejected):
+        """Test that flags --backfill would silently drop are argument errors."""
+        monkeypatch.setattr(sys, "argv", ["update_openhands_charts.py", "--backfill", "plan.json", *flags])
+
+        with pytest.raises(SystemExit) as exc_info:
+            parse_args()
+
+        assert exc_info.value.code == 2
+        assert f"{rejected} cannot be used with --backfill" in capsys.readouterr().err
+
+    def test_backfill_accepts_its_own_flags(self, monkeypatch):
+        monkeypatch.setattr(
+            sys, "argv", ["update_openhands_charts.py", "--backfill", "plan.json", "--cloud-tag", "cloud-1.30.0", "--jobs", "1"]
+        )
+
+        assert parse_args().backfill == Path("plan.json")
+
+
+class TestWatch:
+    """Tests for --watch polling of the cloud tag list."""
+
+    @pytest.fixture
+    def api(self):
+        with FakeGitHubAPI.from_fixture() as fake_api:
+            yield fake_api
+
+    def _tags(self, api):
+        return api.repos[update_openhands_charts.OPENHANDS_REPO]["tags"]
+
+    def test_reacts_to_new_tags_in_version_order(self, api, tmp_path):
+        """Test that each poll only triggers updates for tags not seen before."""
+        new_tags = iter([["cloud-1.31.0"], [], ["cloud-1.32.1", "cloud-1.32.0"]])
+
+        def sleep(seconds):
+            for tag in next(new_tags):
+                self._tags(api)[tag] = "f" * 40
+
+        updated = []
+        with GitHubClient("fake-token", base_url=api.url, cache=ResponseCache(tmp_path)) as client:
+            update_openhands_charts.watch_cloud_tags(client, updated.append, sleep=sleep, max_polls=3)
+
+        assert updated == ["cloud-1.31.0", "cloud-1.32.0", "cloud-1.32.1"]
+
+    def test_unchanged_tag_list_costs_only_304s(self, api, tmp_path):
+        """Test that idle polls are conditional requests.
+
+        TDD Rationale: 304 responses do not count against GitHub's rate
+        limit, so an idle watch costs nothing compared to cron re-fetching.
+        """
+        with GitHubClient("fake-token", base_url=api.url, cache=ResponseCache(tmp_path)) as client:
+            update_openhands_charts.watch_cloud_tags(client, lambda tag: None, sleep=lambda s: None, max_polls=3)
+
+        assert [status for _, _, status in api.requests] == [200, 304, 304, 304]
+
+    def test_ignores_tags_older_than_latest(self, api, capsys):
+        """Test that a late hotfix tag for an older release does not downgrade the charts."""
+        def sleep(seconds):
+            self._tags(api)["cloud-1.28.5"] = "f" * 40
+
+        updated = []
+        with GitHubClient("fake-token", base_url=api.url) as client:
+            update_openhands_charts.watch_cloud_tags(client, updated.append, sleep=sleep, max_polls=1)
+
+        assert updated == []
+        assert "Ignoring new tag cloud-1.28.5" in capsys.readouterr().out
+
+    def test_keeps_watching_after_poll_errors(self, api, capsys):
+        polls = iter([EndpointBehavior(error_rate=1.0, error_status=404), EndpointBehavior()])
+
+        def sleep(seconds):
+            api.behaviors["matching-refs"] = next(polls)
+            self._tags(api)["cloud-1.31.0"] = "f" * 40
+
+        updated = []
+        with GitHubClient("fake-token", base_url=api.url) as client:
+            update_openhands_charts.watch_cloud_tags(client, updated.append, sleep=sleep, max_polls=2)
+
+        assert updated == ["cloud-1.31.0"]
+        assert "Error polling tags" in capsys.readouterr().out
+
+    @pytest.mark.parametrize("error", [
+        pytest.param(ValueError("bad chart"), id="update error"),
+        pytest.param(update_openhands_charts.RequestBudgetExceeded("budget spent"), id="request budget"),
+    ])
+    def test_keeps_watching_after_update_errors(self, api, capsys, error):
+        """Test that a failed update is reported and later tags still update.
+
+        TDD Rationale: A watch is meant to run unattended; one bad release
+        must not stop every later one from landing.
+        """
+        new_tags = iter(["cloud-1.31.0", "cloud-1.32.0"])
+
+        def sleep(seconds):
+            self._tags(api)[next(new_tags)] = "f" * 40
+
+        updated = []
+
+        def on_new_tag(tag):
+            if tag == "cloud-1.31.0":
+                raise error
+            updated.append(tag)
+
+        with GitHubClient("fake-token", base_url=api.url) as client:
+            update_openhands_charts.watch_cloud_tags(client, on_new_tag, sleep=sleep, max_polls=2)
+
+        assert updated == ["cloud-1.32.0"]
+        assert f"Error updating to cloud-1.31.0: {error}" in capsys.readouterr().out
+
+    def test_patch_out_is_rejected_with_watch(self, monkeypatch, capsys):
+        monkeypatch.setattr(sys, "argv", ["update_openhands_charts.py", "--watch", "--patch-out", "charts.patch"])
+
+        with pytest.raises(SystemExit) as exc_info:
+            parse_args()
+
+        assert exc_info.value.code == 2
+        assert "--patch-out cannot be used with --watch" in capsys.readouterr().err
+
+    def test_each_poll_gets_a_fresh_wait_budget(self, api):
+        with GitHubClient("fake-token", base_url=api.url) as client:
+            client.scheduler.waited_seconds = 1000.0
+            update_openhands_charts.poll_cloud_tags(client)
+
+            assert client.scheduler.waited_seconds == 0.0
+
+    def test_runs_update_pipeline_for_new_tag(self, api, chart_paths):
+        """Test the --watch wiring end to end: a new tag updates the charts."""
+        def sleep(seconds):
+            self._tags(api)["cloud-1.31.0"] = "f" * 40
+            deploy = api.repos[update_openhands_charts.DEPLOY_REPO]["files"]
+            deploy["1.31.0"] = deploy["1.30.0"]
+
+        with GitHubClient("fake-token", base_url=api.url) as client:
+            update_openhands_charts.watch_cloud_tags(
+                client,
+                lambda tag: update_openhands_charts.process_updates(
+                    client, cloud_tag=tag, env_cache=DeployEnvCache(directory=None)
+                ),
+                sleep=sleep,
+                max_polls=1,
+            )
+
+        assert get_chart_value(chart_paths["CHART_PATH"], "appVersion") == "cloud-1.31.0"
+
+
+class TestRequestBudgetPropagation:
+    """Tests that an exhausted wait budget aborts the run instead of being swallowed.
+
+    The GitHub helpers turn ordinary failures into None/False so the update can
+    be skipped gracefully, but running out of wait budget must reach main() so
+    CI fails fast with a non-zero exit code.
+    """
+
+    @pytest.fixture
+    def budget_exceeded(self, monkeypatch, github_client):
+        """Make every request through the shared client exceed the budget."""
+        error = update_openhands_charts.RequestBudgetExceeded("budget exhausted")
+        monkeypatch.setattr(github_client.session, "get", Mock(side_effect=error))
+
+    @pytest.mark.parametrize("call", [
+        pytest.param(lambda client: get_latest_cloud_tag(client, "owner/repo"), id="get_latest_cloud_tag"),
+        pytest.param(lambda client: cloud_tag_exists(client, "owner/repo", "cloud-1.0.0"), id="cloud_tag_exists"),
+        pytest.param(lambda client: get_deploy_config(client, "owner/repo"), id="get_deploy_config"),
+    ])
+    def test_helpers_reraise_budget_errors(self, budget_exceeded, github_client, call):
+        """Verify each GitHub helper lets RequestBudgetExceeded propagate."""
+        with pytest.raises(update_openhands_charts.RequestBudgetExceeded):
+            call(github_client)
+
+    def test_main_exits_non_zero(self, monkeypatch, capsys):
+        """Verify main() reports the budget error and exits with status 1."""
+        monkeypatch.setenv("GITHUB_TOKEN", "dummy-token")
+
+        def _exceed(client, cloud_tag, index=None):
+            raise update_openhands_charts.RequestBudgetExceeded("budget exhausted")
+
+        monkeypatch.setattr("update_openhands_charts.resolve_openhands_version", _exceed)
+
+        with pytest.raises(SystemExit) as exc_info:
+            main(use_cache=False)
+
+        assert exc_info.value.code == 1
+        assert "Error: budget exhausted" in capsys.readouterr().out
 
 
 if __name__ == "__main__":
@@ -0,0 +1,185 @@
+#!/usr/bin/env -S uv run
+# /// script
+# requires-python = ">=3.12"
+# dependencies = ["ruamel.yaml", "pytest"]
+# ///
+"""Unit tests for yaml_paths.py."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add the script's directory to sys.path so we can import it directly
+sys.path.insert(0, str(Path(__file__).parent))
+
+from trace_events import start_tracing, stop_tracing
+from yaml_paths import YamlDocument, YamlEditor, YamlPathError, index_document, parse_path
+
+VALUES = """\
+image:
+  repository: ghcr.io/openhands/enterprise-server
+  tag: cloud-1.0.0  # pinned
+client:
+  image:
+    repository: ghcr.io/openhands/plugin-directory-client
+    tag: "sha-0e9a6d1"
+warmRuntimes:
+  configs:
+    - name: default
+      image: 'ghcr.io/openhands/runtime:1.0.0'
+    - name: large
+      image: ghcr.io/openhands/runtime:1.0.0
+"""
+
+
+class TestParsePath:
+    @pytest.mark.parametrize("path,expected", [
+        pytest.param("image.tag", ["image", "tag"], id="keys"),
+        pytest.param("runtime-api.configs[0].image", ["runtime-api", "configs", 0, "image"], id="index"),
+        pytest.param("configs[name=default].image", ["configs", ("name", "default"), "image"], id="selector"),
+        pytest.param("dependencies[*].name", ["dependencies", slice(None), "name"], id="wildcard"),
+    ])
+    def test_splits_steps(self, path, expected):
+        assert parse_path(path) == expected
+
+    @pytest.mark.parametrize("path", [
+        pytest.param("image..tag", id="empty-segment"),
+        pytest.param("configs[default].image", id="selector-without-value"),
+    ])
+    def test_rejects_malformed_paths(self, path):
+        with pytest.raises(YamlPathError):
+            parse_path(path)
+
+
+class TestYamlDocument:
+    """Tests for resolving paths to exact character spans."""
+
+    @pytest.fixture
+    def document(self):
+        return YamlDocument(VALUES)
+
+    @pytest.mark.parametrize("path,value,line", [
+        pytest.param("image.tag", "cloud-1.0.0", 3, id="plain"),
+        pytest.param("client.image.tag", "sha-0e9a6d1", 7, id="double-quoted"),
+        pytest.param("warmRuntimes.configs[name=default].image", "ghcr.io/openhands/runtime:1.0.0", 11, id="selector"),
+        pytest.param("warmRuntimes.configs[1].image", "ghcr.io/openhands/runtime:1.0.0", 13, id="index"),
+    ])
+    def test_span_covers_the_value_only(self, document, path, value, line):
+        """Test that spans exclude quotes and trailing comments."""
+        [span] = document.find(path)
+
+        assert span.value == value
+        assert span.line == line
+        assert VALUES[span.start:span.end] == value
+
+    def test_missing_path_finds_nothing(self, document):
+        assert document.find("runtime.image.tag") == []
+        assert document.find("warmRuntimes.configs[name=missing].image") == []
+
+    def test_where_filters_on_sibling_values(self, document):
+        assert document.find("image.tag", where={"repository": "ghcr.io/openhands/enterprise-server"})
+        assert document.find("image.tag", where={"repository": "ghcr.io/other/image"}) == []
+
+    def test_wildcard_matches_every_item(self, document):
+        spans = document.find("warmRuntimes.configs[*].name")
+
+        assert [span.value for span in spans] == ["default", "large"]
+
+    def test_selector_can_match_several_items(self):
+        document = YamlDocument("configs:\n  - name: a\n    image: x\n  - name: a\n    image: y\n")
+
+        assert [span.value for span in document.find("configs[name=a].image")] == ["x", "y"]
+
+    @pytest.mark.parametrize("content", [
+        pytest.param("image:\n  tag: {a: b}\n", id="mapping"),
+        pytest.param("image:\n  tag: |\n    cloud-1.0.0\n", id="block-scalar"),
+        pytest.param("image:\n  tag:\n", id="empty"),
+    ])
+    def test_rejects_values_that_are_not_one_line_scalars(self, content):
+        with pytest.raises(YamlPathError):
+            YamlDocument(content).find("image.tag")
+
+    def test_empty_document(self):
+        assert YamlDocument("").find("image.tag") == []
+
+
+CHART = """\
+apiVersion: v2
+name: openhands
+appVersion: cloud-1.0.0
+version: 0.1.20 # Change this and the appVersion together
+dependencies:
+  - name: runtime-api
+    version: "0.1.10"
+    repository: oci://ghcr.io/all-hands-ai/helm-charts
+  - name: automation
+    version: 0.1.9
+"""
+
+
+class TestYamlEditor:
+    """Tests for editing scalars without a load/dump round trip."""
+
+    def test_only_edited_values_change(self):
+        """Test that comments, quotes and key order survive an edit.
+
+        TDD Rationale: A ruamel dump re-indents and can drop comments or
+        quotes; chart diffs should show only the values that changed.
+        """
+        editor = YamlEditor(CHART)
+        editor.set("version", "0.1.21")
+        editor.set("dependencies[name=runtime-api].version", "0.1.11")
+
+        assert editor.text() == CHART.replace("0.1.20 #", "0.1.21 #").replace('"0.1.10"', '"0.1.11"')
+
+    def test_get_returns_pending_edits(self):
+        editor = YamlEditor(CHART)
+        assert editor.get("dependencies[name=automation].version") == "0.1.9"
+
+        editor.set("dependencies[name=automation].version", "0.2.0")
+
+        assert editor.get("dependencies[name=automation].version") == "0.2.0"
+        assert editor.dirty
+
+    def test_setting_the_original_value_drops_the_edit(self):
+        editor = YamlEditor(CHART)
+        editor.set("appVersion", "cloud-1.1.0")
+        editor.set("appVersion", "cloud-1.0.0")
+
+        assert not editor.dirty
+        assert editor.text() == CHART
+
+    def test_missing_path(self):
+        editor = YamlEditor(CHART)
+
+        assert editor.get("dependencies[name=missing].version") is None
+        with pytest.raises(YamlPathError):
+            editor.set("dependencies[name=missing].version", "1.0.0")
+
+    def test_ambiguous_path_is_rejected(self):
+        with pytest.raises(YamlPathError):
+            YamlEditor("configs:\n  - name: a\n    image: x\n  - name: a\n    image: y\n").get("configs[name=a].image")
+
+    def test_same_content_reuses_the_index(self):
+        """Test that re-editing known content skips composing it again."""
+        first, second = YamlEditor(CHART), YamlEditor(CHART)
+        first.set("version", "0.1.21")
+
+        assert index_document(CHART) is index_document(CHART)
+        assert second.get("version") == "0.1.20"
+
+    def test_only_cache_misses_are_traced(self):
+        content = "name: traced-once\nversion: 0.1.0\n"
+        tracer = start_tracing()
+        try:
+            index_document(content)
+            index_document(content)
+        finally:
+            stop_tracing()
+
+        assert [(name, args) for name, _, _, _, _, args in tracer.spans] == [("compose yaml", {"bytes": len(content)})]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
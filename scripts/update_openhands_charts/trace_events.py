@@ -0,0 +1,178 @@
+"""Span tracing for the chart update scripts, exported as Chrome trace events.
+
+Tracing is off unless start_tracing() has been called. While it is off,
+span() returns a shared no-op context manager and functions wrapped with
+@traced only pay one global lookup, so the calls can stay in place in CI.
+While it is on, each span is one tuple appended to a list; the conversion
+to JSON happens once, in Tracer.write().
+
+The output is the Chrome trace-event format, which chrome://tracing and
+https://ui.perfetto.dev open directly:
+
+- every span is a complete event ("ph": "X") on the thread that ran it;
+- pipeline phases, which overlap across threads, are async events
+  ("ph": "b"/"e") on a track of their own;
+- threads are named with metadata events.
+
+Spans from worker processes (--jobs > 1) are not collected; the parent's
+"rewrite values" phase covers them.
+"""
+
+import itertools
+import json
+import os
+import threading
+import time
+from collections.abc import Callable
+from functools import wraps
+from pathlib import Path
+from typing import Any, TypeVar
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+class Tracer:
+    """Collects spans for one process, with times relative to its creation."""
+
+    def __init__(self):
+        self.origin = time.perf_counter()
+        # (name, category, start, end, thread id, args) with times from perf_counter()
+        self.spans: list[tuple[str, str, float, float, int, dict[str, Any] | None]] = []
+        self.async_spans: list[tuple[str, str, float, float]] = []
+        self.thread_names: dict[int, str] = {}
+
+    def add_span(self, name: str, category: str, start: float, end: float, args: dict[str, Any] | None = None) -> None:
+        """Record a span that ran on the current thread."""
+        thread_id = threading.get_ident()
+        if thread_id not in self.thread_names:
+            self.thread_names[thread_id] = threading.current_thread().name
+        self.spans.append((name, category, start, end, thread_id, args))
+
+    def add_async_span(self, name: str, category: str, start: float, end: float) -> None:
+        """Record a span that is not tied to one thread, such as a pipeline phase."""
+        self.async_spans.append((name, category, start, end))
+
+    def trace_events(self) -> list[dict[str, Any]]:
+        """Return every recorded span as Chrome trace events, times in microseconds."""
+        pid = os.getpid()
+        thread_ids = {thread_id: index for index, thread_id in enumerate(self.thread_names, start=1)}
+        events: list[dict[str, Any]] = [
+            {"name": "thread_name", "ph": "M", "pid": pid, "tid": thread_ids[thread_id], "args": {"name": name}}
+            for thread_id, name in self.thread_names.items()
+        ]
+        for name, category, start, end, thread_id, args in self.spans:
+            event = {
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                "ts": (start - self.origin) * 1e6,
+                "dur": (end - start) * 1e6,
+                "pid": pid,
+                "tid": thread_ids[thread_id],
+            }
+            if args:
+                event["args"] = args
+            events.append(event)
+        ids = itertools.count(1)
+        for name, category, start, end in self.async_spans:
+            span_id = next(ids)
+            for phase, ts in (("b", start), ("e", end)):
+                events.append({
+                    "name": name,
+                    "cat": category,
+                    "ph": phase,
+                    "id": span_id,
+                    "ts": (ts - self.origin) * 1e6,
+                    "pid": pid,
+                    "tid": 0,
+                })
+        return events
+
+    def write(self, path: Path) -> None:
+        """Write the trace as JSON to path."""
+        path.write_text(json.dumps({"traceEvents": self.trace_events(), "displayTimeUnit": "ms"}))
+
+
+_tracer: Tracer | None = None
+
+
+def start_tracing() -> Tracer:
+    """Start recording spans into a new tracer and return it."""
+    global _tracer
+    _tracer = Tracer()
+    return _tracer
+
+
+def stop_tracing() -> None:
+    global _tracer
+    _tracer = None
+
+
+def active_tracer() -> Tracer | None:
+    return _tracer
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "category", "args", "start")
+
+    def __init__(self, tracer: Tracer, name: str, category: str, args: dict[str, Any]):
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.args = args
+
+    def __enter__(self) -> dict[str, Any]:
+        self.start = time.perf_counter()
+        return self.args
+
+    def __exit__(self, exc_type: type | None, *exc_info: object) -> None:
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        self.tracer.add_span(self.name, self.category, self.start, time.perf_counter(), self.args)
+
+
+class _NoSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> dict[str, Any]:
+        return {}
+
+    def __exit__(self, *exc_info: object) -> None:
+        pass
+
+
+_NO_SPAN = _NoSpan()
+
+
+def span(name: str, category: str, **args: Any) -> _Span | _NoSpan:
+    """Time the enclosed block as a span.
+
+    The context manager yields the span's args dict, so values known only at
+    the end (a status code, a size) can be added to it.
+    """
+    tracer = _tracer
+    if tracer is None:
+        return _NO_SPAN
+    return _Span(tracer, name, category, args)
+
+
+def traced(category: str) -> Callable[[F], F]:
+    """Decorate a function so that each call is a span named after the function."""
+
+    def decorate(func: F) -> F:
+        name = func.__name__
+
+        @wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            tracer = _tracer
+            if tracer is None:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                tracer.add_span(name, category, start, time.perf_counter())
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorate
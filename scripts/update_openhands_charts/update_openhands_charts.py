@@ -1,74 +1,163 @@
 #!/usr/bin/env -S uv run
 # /// script
 # requires-python = ">=3.12"
-# dependencies = ["PyGithub", "ruamel.yaml", "requests"]
+# dependencies = ["ruamel.yaml", "requests"]
 # ///
 """Update OpenHands chart script."""
 
 import argparse
-import base64
+import difflib
 import io
-import logging
+import json
 import os
-import re
-from dataclasses import dataclass
+import tempfile
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager, nullcontext, redirect_stdout, suppress
+from dataclasses import dataclass, field
 from pathlib import Path
+from typing import TYPE_CHECKING, Any, Protocol
+
+# Third-party and heavyweight standard-library modules (ruamel, requests,
+# asyncio, concurrent.futures) are imported in the functions that use them,
+# so --help and argument errors never load them. benchmark_startup.py
+# measures the start-up time.
+from chart_graph import ChartGraph, build_chart_graph
+from chart_semver import (
+    Version,
+    is_exact_version,
+    latest_tag,
+    parse_range,
+    parse_release_tag,
+    parse_version,
+    sort_tags,
+)
+from file_commit import commit_files
+from git_backend import GitError, LocalReleaseSource
+from github_api import (
+    DEFAULT_CACHE_DIR,
+    DEFAULT_POOL_SIZE,
+    DEFAULT_WAIT_BUDGET_SECONDS,
+    GITHUB_API_URL,
+    GitHubClient,
+    RequestBudgetExceeded,
+    RequestScheduler,
+    ResponseCache,
+    RetryPolicy,
+)
+from release_index import DEFAULT_INDEX_PATH, ReleaseIndex, TagChanges
+from run_report import RunReport
+from trace_events import active_tracer, span, start_tracing, stop_tracing, traced
+from yaml_paths import YamlDocument, YamlEditor, YamlPathError, index_document
 
-import requests
-from github import Auth, Github
-from ruamel.yaml import YAML
-
-# Suppress PyGithub's redirect messages
-logging.getLogger("github").setLevel(logging.WARNING)
+if TYPE_CHECKING:
+    import asyncio
 
-CLOUD_SEMVER_PATTERN = re.compile(r"^cloud-(\d+\.\d+\.\d+)$")
+CLOUD_TAG_PREFIX = "cloud-"
 SHORT_SHA_LENGTH = 7
 OPENHANDS_REPO = "All-Hands-AI/OpenHands"
 DEPLOY_REPO = "OpenHands/deploy"
+DEPLOY_WORKFLOW_PATH = ".github/workflows/deploy.yaml"
+DEPLOY_ENV_CACHE_DIR = DEFAULT_CACHE_DIR.parent / "deploy-env"
+GITHUB_RAW_MEDIA_TYPE = "application/vnd.github.raw+json"
+DEFAULT_WATCH_INTERVAL_SECONDS = 30.0
 SEPARATOR = "=" * 60
 SCRIPT_DIR = Path(__file__).parent
 REPO_ROOT = SCRIPT_DIR.parent.parent
+CHARTS_DIR = REPO_ROOT / "charts"
 CHART_PATH = REPO_ROOT / "charts" / "openhands" / "Chart.yaml"
 VALUES_PATH = REPO_ROOT / "charts" / "openhands" / "values.yaml"
 RUNTIME_API_CHART_PATH = REPO_ROOT / "charts" / "runtime-api" / "Chart.yaml"
 RUNTIME_API_VALUES_PATH = REPO_ROOT / "charts" / "runtime-api" / "values.yaml"
 
-# Regex patterns for values.yaml image tag updates
-ENTERPRISE_SERVER_TAG_PATTERN = (
-    r"(image:\s*\n\s*repository:\s*ghcr\.io/openhands/enterprise-server\s*\n\s*tag:\s*)(\S+)"
-)
-RUNTIME_TAG_PATTERN = (
-    r"(runtime:\s*\n\s*image:\s*\n\s*repository:\s*ghcr\.io/openhands/runtime\s*\n\s*tag:\s*)(\S+)"
-)
-WARM_RUNTIMES_TAG_PATTERN = r'(image:\s*"ghcr\.io/openhands/runtime:)([^"]+)"'
-RUNTIME_API_TAG_PATTERN = (
-    r'(image:\n\s+repository: ghcr\.io/openhands/runtime-api\n\s+tag: )(sha-[a-f0-9]+)'
-)
+# Pin source for tags that follow the cloud tag itself rather than a deploy.yaml key
+CLOUD_TAG_SOURCE = "CLOUD_TAG"
+
+# deploy.yaml env keys that pin an image: commit SHAs and literal image tags
+IMAGE_PIN_SUFFIXES = ("_SHA", "_IMAGE_TAG")
 
 
-@dataclass
 class UpdateResult:
-    """Stores the outcome of a file update operation."""
-    has_changes: bool = False
-    changes: list[tuple[str, str, str]] = None  # [(key, old, new)]
-    unchanged: list[tuple[str, str]] = None     # [(key, val)]
-    errors: list[str] = None                    # [error_message]
-
-    def __post_init__(self):
-        if self.changes is None:
-            self.changes = []
-        if self.unchanged is None:
-            self.unchanged = []
-        if self.errors is None:
-            self.errors = []
+    """Stores the outcome of a file update operation.
+
+    changes and unchanged are read-only tuples; entries are recorded with
+    add_change and add_unchanged, which also index them by key, so checking
+    many keys does not rescan the entries.
+    """
+
+    __slots__ = (
+        "has_changes", "errors", "locations",
+        "_changes", "_unchanged", "_change_index", "_unchanged_index",
+    )
+
+    def __init__(
+        self,
+        has_changes: bool = False,
+        changes: list[tuple[str, str, str]] | None = None,  # [(key, old, new)]
+        unchanged: list[tuple[str, str]] | None = None,     # [(key, val)]
+        errors: list[str] | None = None,                    # [error_message]
+        locations: dict[str, int] | None = None,            # {key: line}
+    ):
+        self.has_changes = has_changes
+        self.errors = [] if errors is None else errors
+        self.locations = {} if locations is None else locations
+        self._changes: list[tuple[str, str, str]] = []
+        self._unchanged: list[tuple[str, str]] = []
+        self._change_index: dict[str, tuple[str, str]] = {}  # {key: (old, new)}
+        self._unchanged_index: dict[str, str] = {}  # {key: val}
+        for key, old, new in changes or ():
+            self.add_change(key, old, new)
+        for key, val in unchanged or ():
+            self.add_unchanged(key, val)
+
+    @property
+    def changes(self) -> tuple[tuple[str, str, str], ...]:
+        """Return the (key, old, new) changes in the order they were recorded."""
+        return tuple(self._changes)
+
+    @property
+    def unchanged(self) -> tuple[tuple[str, str], ...]:
+        """Return the (key, val) unchanged entries in the order they were recorded."""
+        return tuple(self._unchanged)
+
+    def add_change(self, key: str, old: str, new: str) -> None:
+        """Record a changed key; lookups return the first value recorded for a key."""
+        self._changes.append((key, old, new))
+        self._change_index.setdefault(key, (old, new))
+
+    def add_unchanged(self, key: str, val: str) -> None:
+        """Record an unchanged key; lookups return the first value recorded for a key."""
+        self._unchanged.append((key, val))
+        self._unchanged_index.setdefault(key, val)
+
+    def __repr__(self) -> str:
+        return (
+            f"UpdateResult(has_changes={self.has_changes!r}, changes={self._changes!r}, "
+            f"unchanged={self._unchanged!r}, errors={self.errors!r}, locations={self.locations!r})"
+        )
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, UpdateResult):
+            return NotImplemented
+        return (self.has_changes, self._changes, self._unchanged, self.errors, self.locations) == (
+            other.has_changes, other._changes, other._unchanged, other.errors, other.locations
+        )
+
+    def change_for(self, key: str) -> tuple[str, str] | None:
+        """Return the (old, new) values recorded for a changed key, or None."""
+        return self._change_index.get(key)
+
+    def unchanged_value(self, key: str) -> str | None:
+        """Return the value recorded for an unchanged key, or None."""
+        return self._unchanged_index.get(key)
 
     def is_unchanged(self, key: str) -> bool:
         """Check if a key exists in the unchanged list."""
-        return any(k == key for k, _ in self.unchanged)
+        return key in self._unchanged_index
 
     def has_change_for(self, key: str) -> bool:
         """Check if a key exists in the changes list."""
-        return any(k == key for k, _, _ in self.changes)
+        return key in self._change_index
 
     def has_error_containing(self, substring: str) -> bool:
         """Check if any error message contains the given substring."""
@@ -105,11 +194,28 @@ def get_short_sha(sha: str) -> str:
 
 
 def extract_version_from_cloud_tag(cloud_tag: str) -> str | None:
-    """Extract version number from cloud-X.Y.Z format."""
-    match = CLOUD_SEMVER_PATTERN.match(cloud_tag)
-    if match:
-        return match.group(1)
-    return None
+    """Extract version number from cloud-X.Y.Z format.
+
+    Pre-release and build tags (cloud-1.2.3-rc.1, cloud-1.2.3+abc) are not
+    releases and give None.
+    """
+    if parse_cloud_version(cloud_tag) is None:
+        return None
+    return cloud_tag[len(CLOUD_TAG_PREFIX):]
+
+
+def parse_cloud_version(cloud_tag: str) -> Version | None:
+    """Parse a cloud-X.Y.Z release tag into a comparable Version."""
+    return parse_release_tag(cloud_tag, CLOUD_TAG_PREFIX)
+
+
+def select_latest_cloud_tag(tag_names: list[str]) -> str | None:
+    """Return the cloud-X.Y.Z tag with the highest semantic version.
+
+    Names that are not strict cloud-X.Y.Z tags are ignored, so the result does
+    not depend on the order in which GitHub lists the tags.
+    """
+    return latest_tag(tag_names, CLOUD_TAG_PREFIX)
 
 
 def get_current_app_version(chart_path: Path) -> str | None:
@@ -117,9 +223,7 @@ def get_current_app_version(chart_path: Path) -> str | None:
     if not chart_path.exists():
         return None
     try:
-        yaml = YAML()
-        chart_data = yaml.load(chart_path)
-        return chart_data.get("appVersion")
+        return YamlEditor(chart_path.read_text()).get("appVersion")
     except Exception:
         return None
 
@@ -135,120 +239,599 @@ class DeployConfig:
 
     runtime_api_sha: str
     openhands_runtime_image_tag: str
+    images: dict[str, str] = field(default_factory=dict)  # every image pin, by env key
+
+    @property
+    def pins(self) -> dict[str, str]:
+        """Return every non-empty image pin, including the two named fields."""
+        pins = {
+            **self.images,
+            "RUNTIME_API_SHA": self.runtime_api_sha,
+            "OPENHANDS_RUNTIME_IMAGE_TAG": self.openhands_runtime_image_tag,
+        }
+        return {key: value for key, value in pins.items() if value}
+
+    def with_pin_keys(self, pin_keys: dict[str, str]) -> "DeployConfig":
+        """Return a copy whose images also hold each deploy.yaml key under the rule key it is mapped to.
+
+        pin_keys maps the keys IMAGE_TAG_RULES follow (e.g. AUTOMATION_SHA)
+        to the names deploy.yaml actually uses for them.
+        """
+        images = dict(self.images)
+        for rule_key, deploy_key in pin_keys.items():
+            if deploy_key in self.images:
+                images[rule_key] = self.images[deploy_key]
+        return DeployConfig(self.runtime_api_sha, self.openhands_runtime_image_tag, images)
+
+
+class ReleaseSource(Protocol):
+    """Where tags and deploy.yaml are read from: GitHubClient (the REST API) or LocalReleaseSource (clones)."""
+
+    def blob_sha(self, repo_name: str, file_path: str, ref: str | None = None) -> str:
+        """Return the git blob SHA of a file at ref (HEAD by default) without downloading it."""
+        ...
+
+
+def fetch_cloud_tag_refs(client: GitHubClient, repo_name: str) -> list[dict]:
+    """Fetch the raw ref of every tag starting with the cloud- prefix in a single API request.
+
+    Uses the git matching-refs endpoint, which filters by prefix server-side
+    and returns all matches at once instead of paging through every tag.
+    """
+    response = client.get(f"repos/{repo_name}/git/matching-refs/tags/{CLOUD_TAG_PREFIX}")
+    response.raise_for_status()
+    return response.json()
 
 
-def get_latest_cloud_tag(token: str, repo_name: str) -> str | None:
-    """Fetch the latest cloud-X.Y.Z tag from a GitHub repository."""
-    gh = Github(auth=Auth.Token(token))
+def peel_tag(client: GitHubClient, repo_name: str, sha: str) -> str:
+    """Follow an annotated tag object (and any tag it tags) to the commit it points at."""
+    while True:
+        response = client.get(f"repos/{repo_name}/git/tags/{sha}")
+        response.raise_for_status()
+        target = response.json()["object"]
+        sha = target["sha"]
+        if target["type"] != "tag":
+            return sha
+
+
+def list_cloud_tag_refs(
+    client: ReleaseSource, repo_name: str, peeled: dict[str, str] | None = None
+) -> dict[str, str]:
+    """Map every tag starting with the cloud- prefix to the commit it points at.
+
+    Annotated tags are peeled to their commit, as LocalReleaseSource does, so
+    both backends index the same commit_sha for a release. Each tag object
+    costs one extra request; peeled maps tag object SHAs to commits already
+    looked up and is filled in place, since a tag object never changes.
+    """
+    if isinstance(client, LocalReleaseSource):
+        return client.list_tag_refs(repo_name, CLOUD_TAG_PREFIX)
+    peeled = {} if peeled is None else peeled
+    refs = {}
+    for ref in fetch_cloud_tag_refs(client, repo_name):
+        target = ref["object"]
+        sha = target["sha"]
+        if target["type"] == "tag":
+            if sha not in peeled:
+                peeled[sha] = peel_tag(client, repo_name, sha)
+            sha = peeled[sha]
+        refs[ref["ref"].removeprefix("refs/tags/")] = sha
+    return refs
+
+
+def list_cloud_tags(client: ReleaseSource, repo_name: str) -> list[str]:
+    """List every tag starting with the cloud- prefix in a single API request (tags are not peeled)."""
+    if isinstance(client, LocalReleaseSource):
+        return list(client.list_tag_refs(repo_name, CLOUD_TAG_PREFIX))
+    return [ref["ref"].removeprefix("refs/tags/") for ref in fetch_cloud_tag_refs(client, repo_name)]
+
+
+def get_latest_cloud_tag(client: ReleaseSource, repo_name: str) -> str | None:
+    """Fetch the highest cloud-X.Y.Z tag from a GitHub repository."""
     try:
-        repo = gh.get_repo(repo_name)
-        tags = repo.get_tags()
-        for tag in tags:
-            if CLOUD_SEMVER_PATTERN.match(tag.name):
-                return tag.name
+        return select_latest_cloud_tag(list_cloud_tags(client, repo_name))
+    except RequestBudgetExceeded:
+        raise
     except Exception as e:
         print(f"Error fetching tags from {repo_name}: {e}")
     return None
 
 
-def cloud_tag_exists(token: str, repo_name: str, tag_name: str) -> bool:
+def cloud_tag_exists(client: ReleaseSource, repo_name: str, tag_name: str) -> bool:
     """Check if a specific cloud tag exists in a GitHub repository."""
-    gh = Github(auth=Auth.Token(token))
+    if isinstance(client, LocalReleaseSource):
+        return client.tag_exists(repo_name, tag_name)
     try:
-        repo = gh.get_repo(repo_name)
-        repo.get_git_ref(f"tags/{tag_name}")
+        response = client.get(f"repos/{repo_name}/git/ref/tags/{tag_name}")
+        response.raise_for_status()
         return True
+    except RequestBudgetExceeded:
+        raise
     except Exception:
         return False
 
 
-def get_deploy_config(token: str, repo_name: str, ref: str | None = None) -> DeployConfig | None:
-    """Fetch deployment config values from deploy.yaml workflow."""
-    headers = {"Authorization": f"Bearer {token}"}
-    url = f"https://api.github.com/repos/{repo_name}/contents/.github/workflows/deploy.yaml"
+class DeployEnvCache:
+    """Parsed deploy workflow env mappings keyed by the workflow's git blob SHA.
+
+    Blob SHAs are content hashes, so an entry never goes stale and tags that
+    share a deploy.yaml blob resolve from the same entry. Entries are kept in
+    memory for the run and, when a directory is given, one JSON file each on disk.
+    """
+
+    def __init__(self, directory: Path | None = DEPLOY_ENV_CACHE_DIR):
+        self.directory = directory
+        self._entries: dict[str, dict[str, Any]] = {}
+
+    def get(self, blob_sha: str) -> dict[str, Any] | None:
+        """Return the cached env mapping for a blob, or None."""
+        if blob_sha in self._entries:
+            return self._entries[blob_sha]
+        if self.directory is None:
+            return None
+        try:
+            env = json.loads((self.directory / f"{blob_sha}.json").read_text())
+        except (OSError, ValueError):
+            return None
+        self._entries[blob_sha] = env
+        return env
+
+    def put(self, blob_sha: str, env: dict[str, Any]) -> None:
+        """Store the env mapping for a blob."""
+        self._entries[blob_sha] = env
+        if self.directory is None:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as tmp:
+            json.dump(env, tmp, default=str)
+        os.replace(tmp_name, self.directory / f"{blob_sha}.json")
+
+
+def fetch_raw_file(client: ReleaseSource, repo_name: str, file_path: str, ref: str | None = None) -> str:
+    """Download a file's content with the raw media type (no JSON/base64 envelope)."""
+    if isinstance(client, LocalReleaseSource):
+        return client.read_file(repo_name, file_path, ref)
+    path = f"repos/{repo_name}/contents/{file_path}"
     if ref:
-        url += f"?ref={ref}"
+        path += f"?ref={ref}"
 
-    try:
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()
+    response = client.get(path, headers={"Accept": GITHUB_RAW_MEDIA_TYPE})
+    response.raise_for_status()
+    return response.text
 
-        content = base64.b64decode(response.json()["content"]).decode("utf-8")
-        yaml = YAML()
-        workflow = yaml.load(io.StringIO(content))
 
-        env = workflow.get("env", {})
-        return DeployConfig(
-            runtime_api_sha=env.get("RUNTIME_API_SHA", ""),
-            openhands_runtime_image_tag=env.get("OPENHANDS_RUNTIME_IMAGE_TAG", ""),
-        )
+def parse_workflow_env(content: str) -> dict[str, Any]:
+    """Parse the top-level env mapping of a workflow file.
+
+    The whole file is parsed, so anchors, aliases and flow-style mappings
+    resolve as in any YAML reader. fetch_deploy_config only calls this for
+    a blob SHA the DeployEnvCache has not seen.
+    """
+    from ruamel.yaml import YAML
+
+    workflow = YAML(typ="safe").load(content)
+    if not isinstance(workflow, dict):
+        return {}
+    return workflow.get("env") or {}
+
+
+@traced("github")
+def fetch_deploy_config(
+    client: ReleaseSource,
+    repo_name: str,
+    ref: str | None = None,
+    env_cache: DeployEnvCache | None = None,
+) -> DeployConfig:
+    """Fetch deployment config values from deploy.yaml workflow.
+
+    Looks up the workflow's blob SHA first and only downloads and parses the
+    file when env_cache has no entry for that SHA. Raises on any failure; see
+    get_deploy_config for the reporting variant.
+    """
+    blob_sha = client.blob_sha(repo_name, DEPLOY_WORKFLOW_PATH, ref)
+    env = env_cache.get(blob_sha) if env_cache else None
+    if env is None:
+        env = parse_workflow_env(fetch_raw_file(client, repo_name, DEPLOY_WORKFLOW_PATH, ref))
+        if env_cache:
+            env_cache.put(blob_sha, env)
+
+    return DeployConfig(
+        runtime_api_sha=env.get("RUNTIME_API_SHA", ""),
+        openhands_runtime_image_tag=env.get("OPENHANDS_RUNTIME_IMAGE_TAG", ""),
+        images={key: str(value) for key, value in env.items() if key.endswith(IMAGE_PIN_SUFFIXES)},
+    )
+
+
+@traced("github")
+def get_deploy_config(
+    client: ReleaseSource,
+    repo_name: str,
+    ref: str | None = None,
+    env_cache: DeployEnvCache | None = None,
+) -> DeployConfig | None:
+    """Fetch deployment config values from deploy.yaml workflow."""
+    try:
+        return fetch_deploy_config(client, repo_name, ref, env_cache)
+    except RequestBudgetExceeded:
+        raise
     except Exception as e:
         print(f"Error fetching deploy config: {e}")
         return None
 
 
-def create_yaml_parser() -> YAML:
-    """Create a YAML parser configured for chart file preservation."""
-    yaml = YAML()
-    yaml.preserve_quotes = True
-    yaml.indent(mapping=2, sequence=4, offset=2)
-    return yaml
+class ChartFiles:
+    """Chart and values files of one update run, each read at most once.
 
+    Every update step works on the same in-memory documents: values.yaml
+    files as text staged with write(), Chart.yaml files as span-indexed
+    editors from chart(). Nothing reaches disk until flush(), so a run that
+    fails midway leaves the tree as it was, and flush() replaces every
+    changed file together.
 
-def update_tag_in_content(
-    content: str,
-    pattern: str,
-    new_tag: str,
-    tag_name: str,
-    result: UpdateResult,
-    replacement_suffix: str = "",
-) -> str:
-    """Update a regex-matched tag in content and track the result.
-    
     Args:
-        content: The file content to update
-        pattern: Regex pattern with group(2) capturing the old tag
-        new_tag: The new tag value to set
-        tag_name: Human-readable name for reporting (e.g., "enterprise-server image tag")
-        result: UpdateResult to record changes/unchanged/errors
-        replacement_suffix: Optional suffix to append after new_tag in replacement
-        
-    Returns:
-        Updated content string
-    """
-    match = re.search(pattern, content)
-    if match:
-        old_tag = match.group(2)
-        if old_tag == new_tag:
-            result.unchanged.append((tag_name, old_tag))
-        else:
-            replacement = rf"\g<1>{new_tag}{replacement_suffix}"
-            content = re.sub(pattern, replacement, content)
-            result.changes.append((tag_name, old_tag, new_tag))
-            result.has_changes = True
-    else:
-        result.errors.append(f"Could not find {tag_name} in values.yaml")
-    return content
+        texts: Already known file contents by path; other files are read on first use
+    """
 
+    def __init__(self, texts: dict[Path, str] | None = None):
+        self._read: dict[Path, str] = dict(texts or {})
+        self._staged: dict[Path, str] = {}
+        self._charts: dict[Path, YamlEditor] = {}
+
+    def read(self, path: Path) -> str:
+        """Return the current text of path, including staged changes."""
+        if path in self._staged:
+            return self._staged[path]
+        if path not in self._read:
+            self._read[path] = path.read_text()
+        return self._read[path]
+
+    def write(self, path: Path, content: str) -> None:
+        """Stage new text for path; it is written by flush()."""
+        self.read(path)
+        self._staged[path] = content
+
+    def chart(self, path: Path) -> YamlEditor:
+        """Return the shared editor for a Chart.yaml file."""
+        editor = self._charts.get(path)
+        if editor is None:
+            editor = self._charts[path] = YamlEditor(self.read(path))
+        return editor
+
+    def changed_files(self) -> dict[Path, str]:
+        """Return the new text of every file that differs from what was read."""
+        changed = {path: content for path, content in self._staged.items() if content != self._read[path]}
+        changed.update({path: editor.text() for path, editor in self._charts.items() if editor.dirty})
+        return changed
+
+    def flush(self) -> list[Path]:
+        """Write every changed file together and return their paths.
+
+        Either all changed files are replaced or, if writing fails, none are
+        (see file_commit).
+        """
+        changed = self.changed_files()
+        commit_files(changed, originals=self._read)
+        self._read.update(changed)
+        self._staged.clear()
+        self._charts = {path: editor for path, editor in self._charts.items() if path not in changed}
+        return list(changed)
+
+    def copy(self) -> "ChartFiles":
+        """Return new ChartFiles that start from this run's current text, staged changes included."""
+        texts = {**self._read, **self._staged}
+        texts.update({path: editor.text() for path, editor in self._charts.items()})
+        return ChartFiles(texts)
+
+    def diff(self, root: Path) -> str:
+        """Return a unified diff of every changed file, with paths relative to root.
+
+        The diff uses git's a/ and b/ prefixes, so it applies with
+        `git apply` or `patch -p1` from root.
+        """
+        pieces = []
+        for path, content in sorted(self.changed_files().items()):
+            name = path.relative_to(root).as_posix() if path.is_relative_to(root) else path.as_posix()
+            lines = difflib.unified_diff(
+                self._read[path].splitlines(keepends=True),
+                content.splitlines(keepends=True),
+                f"a/{name}",
+                f"b/{name}",
+            )
+            for line in lines:
+                pieces.append(line if line.endswith("\n") else line + "\n\\ No newline at end of file\n")
+        return "".join(pieces)
 
-def update_runtime_api_dependency(
-    chart_data: dict,
+    @property
+    def openhands_chart(self) -> YamlEditor:
+        return self.chart(CHART_PATH)
+
+    @property
+    def openhands_values(self) -> str:
+        return self.read(VALUES_PATH)
+
+    @property
+    def runtime_api_chart(self) -> YamlEditor:
+        return self.chart(RUNTIME_API_CHART_PATH)
+
+    @property
+    def runtime_api_values(self) -> str:
+        return self.read(RUNTIME_API_VALUES_PATH)
+
+    @property
+    def current_app_version(self) -> str | None:
+        """Return the openhands chart appVersion."""
+        return self.openhands_chart.get("appVersion")
+
+
+@traced("charts")
+def load_chart_files() -> ChartFiles:
+    """Read the openhands and runtime-api chart and values files and index the charts."""
+    chart_files = ChartFiles()
+    for path in (VALUES_PATH, RUNTIME_API_VALUES_PATH):
+        chart_files.read(path)
+    for path in (CHART_PATH, RUNTIME_API_CHART_PATH):
+        chart_files.chart(path)
+    return chart_files
+
+
+@dataclass
+class PhaseTimer:
+    """Records when each pipeline phase started and ended, relative to the run start.
+
+    Offsets make overlapping phases visible: concurrent phases share part of
+    their start-to-end window.
+    """
+
+    origin: float = field(default_factory=time.perf_counter)
+    phases: list[tuple[str, float, float]] = field(default_factory=list)
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time the enclosed block as the named phase."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            self.phases.append((name, start - self.origin, end - self.origin))
+            tracer = active_tracer()
+            if tracer is not None:
+                tracer.add_async_span(name, "phase", start, end)
+
+    def print_summary(self) -> None:
+        """Print each phase's duration and window, then the total wall time."""
+        for name, start, end in sorted(self.phases, key=lambda phase: phase[1]):
+            print(f"{name}: {(end - start) * 1000:.0f}ms (at {start * 1000:.0f}-{end * 1000:.0f}ms)")
+        print(f"Total wall time: {(time.perf_counter() - self.origin) * 1000:.0f}ms")
+
+
+@dataclass(frozen=True)
+class TagRule:
+    """An image tag in a chart's values.yaml, located by a structural path.
+
+    See yaml_paths for the path syntax. The tag follows `source`: a
+    deploy.yaml env key, or CLOUD_TAG_SOURCE for the cloud tag. Sources
+    ending in _SHA are written as sha-<short sha> tags. With reference=True
+    the value is a full image reference and only the part after its last
+    ":" is the tag. If repository is set, values whose image repository
+    differs (the sibling `repository` key, or the part of a reference before
+    the tag) do not match.
+    """
+
+    name: str     # Human-readable name for reporting (e.g., "enterprise-server image tag")
+    path: str     # e.g., "runtime-api.warmRuntimes.configs[name=default].image"
+    source: str
+    reference: bool = False
+    repository: str | None = None
+
+    def format_tag(self, pin: str) -> str:
+        return format_sha_tag(pin) if self.source.endswith("_SHA") else pin
+
+
+@dataclass(frozen=True)
+class TagMatch:
+    """Where a rule matched: the tag's character span and 1-based line number."""
+
+    rule: str
+    start: int
+    end: int
+    line: int
+    tag: str
+
+
+class TagRewriter:
+    """Applies a chart's tag rules to its values.yaml content, splicing all edits in one pass.
+
+    The content is composed once and every rule's path is resolved against
+    it. The content is then rebuilt once, replacing only the tag characters,
+    so formatting, quoting and comments elsewhere are kept as they are.
+    Every rule must match exactly once: a missing tag and a path matching
+    more than one value are both reported as errors and left unchanged.
+    """
+
+    def __init__(self, rules: list[TagRule], file_name: str = "values.yaml"):
+        self.rules = rules
+        self.file_name = file_name
+
+    def find(self, document: YamlDocument, rule: TagRule) -> list[TagMatch]:
+        """Return the tag of every value the rule's path resolves to."""
+        matches = []
+        where = {"repository": rule.repository} if rule.repository and not rule.reference else None
+        for span in document.find(rule.path, where):
+            start = span.start
+            if rule.reference:
+                separator = span.value.rfind(":")
+                if separator < 0 or "/" in span.value[separator:]:
+                    continue  # no tag, e.g. "registry:5000/image"
+                if rule.repository and span.value[:separator] != rule.repository:
+                    continue
+                start += separator + 1
+            matches.append(TagMatch(rule.name, start, span.end, span.line, document.content[start:span.end]))
+        return matches
+
+    def rewrite(self, content: str, pins: dict[str, str], result: UpdateResult) -> str:
+        """Set each rule's tag from pins[rule.source], recording the outcome in result.
+
+        Returns the updated content; result.locations maps each matched rule
+        to the line of its tag.
+        """
+        with span("rewrite tags", "charts", file=self.file_name):
+            return self._rewrite(content, pins, result)
+
+    def _rewrite(self, content: str, pins: dict[str, str], result: UpdateResult) -> str:
+        from ruamel.yaml.error import YAMLError
+
+        try:
+            document = index_document(content)
+        except YAMLError as e:
+            result.errors.append(f"Could not parse {self.file_name}: {e}")
+            return content
+
+        edits = []
+        for rule in self.rules:
+            if rule.source not in pins:
+                result.errors.append(f"No {rule.source} value for {rule.name}")
+                continue
+            try:
+                found = self.find(document, rule)
+            except YamlPathError as e:
+                result.errors.append(f"Could not update {rule.name} in {self.file_name}: {e}")
+                continue
+            if not found:
+                result.errors.append(f"Could not find {rule.name} in {self.file_name}")
+                continue
+            if len(found) > 1:
+                lines = ", ".join(str(match.line) for match in found)
+                result.errors.append(f"Found {len(found)} matches for {rule.name} in {self.file_name} (lines {lines})")
+                continue
+            match = found[0]
+            result.locations[rule.name] = match.line
+            new_tag = rule.format_tag(pins[rule.source])
+            if match.tag == new_tag:
+                result.add_unchanged(rule.name, match.tag)
+            else:
+                edits.append((match.start, match.end, new_tag))
+                result.add_change(rule.name, match.tag, new_tag)
+                result.has_changes = True
+
+        pieces = []
+        position = 0
+        for start, end, new_tag in sorted(edits):
+            pieces += [content[position:start], new_tag]
+            position = end
+        pieces.append(content[position:])
+        return "".join(pieces)
+
+
+# OPENHANDS_RUNTIME_IMAGE_TAG is a tag of this image only; other runtime images
+# (e.g. ghcr.io/openhands/agent-server) are left alone
+RUNTIME_IMAGE_REPOSITORY = "ghcr.io/openhands/runtime"
+# Image tags the update script keeps in step with a release, for every chart under charts/
+IMAGE_TAG_RULES: dict[str, tuple[TagRule, ...]] = {
+    "openhands": (
+        TagRule(
+            "enterprise-server image tag", "image.tag", CLOUD_TAG_SOURCE, repository="ghcr.io/openhands/enterprise-server"
+        ),
+        TagRule(
+            "runtime image tag", "runtime.image.tag", "OPENHANDS_RUNTIME_IMAGE_TAG", repository=RUNTIME_IMAGE_REPOSITORY
+        ),
+        TagRule(
+            "warmRuntimes image tag",
+            "runtime-api.warmRuntimes.configs[name=default].image",
+            "OPENHANDS_RUNTIME_IMAGE_TAG",
+            reference=True,
+            repository=RUNTIME_IMAGE_REPOSITORY,
+        ),
+    ),
+    "runtime-api": (
+        TagRule("runtime-api image tag", "image.tag", "RUNTIME_API_SHA", repository="ghcr.io/openhands/runtime-api"),
+        TagRule(
+            "runtime-api warmRuntimes image tag",
+            "warmRuntimes.configs[name=default].image",
+            "OPENHANDS_RUNTIME_IMAGE_TAG",
+            reference=True,
+            repository=RUNTIME_IMAGE_REPOSITORY,
+        ),
+    ),
+    "automation": (
+        TagRule("automation image tag", "image.tag", "AUTOMATION_SHA", repository="ghcr.io/openhands/automation"),
+    ),
+    "plugin-directory": (
+        TagRule(
+            "plugin-directory-client image tag",
+            "client.image.tag",
+            "PLUGIN_DIRECTORY_SHA",
+            repository="ghcr.io/openhands/plugin-directory-client",
+        ),
+        TagRule(
+            "plugin-directory-server image tag",
+            "server.image.tag",
+            "PLUGIN_DIRECTORY_SHA",
+            repository="ghcr.io/openhands/plugin-directory-server",
+        ),
+    ),
+    "integrations-hub": (
+        TagRule(
+            "integrations-hub image tag",
+            "image.tag",
+            "INTEGRATIONS_HUB_IMAGE_TAG",
+            repository="ghcr.io/openhands/integrations-hub",
+        ),
+    ),
+    # Pre-pulls the agent-server image, which OPENHANDS_RUNTIME_IMAGE_TAG does not pin
+    "image-loader": (),
+    # Third-party images only (kubectl), pinned by hand
+    "infra": (),
+    # The kubectl image is set by the charts that use crd-check
+    "crd-check": (),
+    "openhands-secrets": (),
+}
+CHART_REWRITERS = {chart: TagRewriter(list(rules)) for chart, rules in IMAGE_TAG_RULES.items()}
+# Charts besides openhands and runtime-api whose images follow deploy.yaml
+SUBCHARTS = tuple(chart for chart, rules in IMAGE_TAG_RULES.items() if rules and chart not in ("openhands", "runtime-api"))
+
+
+def update_dependency_version(
+    chart: YamlEditor,
+    dependency_name: str,
     new_version: str | None,
     result: UpdateResult,
 ) -> None:
-    """Update runtime-api dependency version in chart data."""
+    """Update the version of a named dependency in a Chart.yaml editor.
+
+    A dependency pinned with a range (0.3.x, ~0.3.0) is left alone while the
+    new version satisfies it. A constraint that cannot be parsed is reported
+    as an error and left unchanged.
+    """
     if not new_version:
         return
-    for dep in chart_data.get("dependencies", []):
-        if dep.get("name") == "runtime-api":
-            old_version = dep.get("version")
-            if old_version == new_version:
-                result.unchanged.append(("runtime-api version", old_version))
-            else:
-                dep["version"] = new_version
-                result.changes.append(("runtime-api version", old_version, new_version))
-                result.has_changes = True
-            break
+    path = f"dependencies[name={dependency_name}].version"
+    old_version = chart.get(path)
+    if old_version is None:
+        return
+    satisfied = old_version == new_version
+    if not satisfied and not is_exact_version(old_version):
+        try:
+            satisfied = parse_range(old_version).matches(new_version)
+        except ValueError as e:
+            result.errors.append(f"Could not update {dependency_name} version: {e}")
+            return
+    if satisfied:
+        result.add_unchanged(f"{dependency_name} version", old_version)
+    else:
+        chart.set(path, new_version)
+        result.add_change(f"{dependency_name} version", old_version, new_version)
+        result.has_changes = True
+
+
+def update_runtime_api_dependency(
+    chart: YamlEditor,
+    new_version: str | None,
+    result: UpdateResult,
+) -> None:
+    """Update runtime-api dependency version in a Chart.yaml editor."""
+    update_dependency_version(chart, "runtime-api", new_version, result)
 
 
 def bump_patch_version(version: str) -> str:
@@ -258,75 +841,94 @@ def bump_patch_version(version: str) -> str:
         version: A semantic version string in X.Y.Z format (e.g., "1.2.3")
 
     Returns:
-        The version with patch incremented (e.g., "1.2.4")
+        The version with patch incremented (e.g., "1.2.4"); a pre-release
+        such as "1.2.4-rc.1" is bumped to its release ("1.2.4")
 
     Raises:
         ValueError: If version is not a valid X.Y.Z semver format
     """
-    parts = version.split(".")
-    if len(parts) != 3:
-        raise ValueError(f"Invalid semver format: '{version}' (expected X.Y.Z)")
-
-    major, minor, patch = parts
-
-    # Validate all parts are numeric
-    try:
-        int(major)
-        int(minor)
-        new_patch = int(patch) + 1
-    except ValueError:
-        raise ValueError(f"Invalid semver format: '{version}' (all parts must be numeric)")
-
-    return f"{major}.{minor}.{new_patch}"
+    return str(parse_version(version).bump_patch())
 
 
-def update_openhands_chart(
-    chart_path: Path,
+@traced("charts")
+def apply_openhands_chart(
+    chart: YamlEditor,
     new_app_version: str,
     new_runtime_api_version: str | None,
     has_changes: bool = True,
-    dry_run: bool = False,
+    subchart_versions: dict[str, str] | None = None,
 ) -> UpdateResult:
-    """Update appVersion, bump patch version, and update runtime-api dependency.
-
-    Only updates appVersion and bumps version if has_changes is True.
-    """
-    yaml = create_yaml_parser()
-    chart_data = yaml.load(chart_path)
+    """Apply the openhands Chart.yaml updates to an editor and return what changed."""
     result = UpdateResult()
 
     if not has_changes:
-        old_version = chart_data.get("version")
-        old_app_version = chart_data.get("appVersion")
-        result.unchanged.append(("openhands chart version", f"{old_version} (no value changes)"))
-        result.unchanged.append(("appVersion", f"{old_app_version} (no value changes)"))
-        update_runtime_api_dependency(chart_data, new_runtime_api_version, result)
-        if not dry_run and result.has_changes:
-            yaml.dump(chart_data, chart_path)
+        old_version = chart.get("version")
+        old_app_version = chart.get("appVersion")
+        result.add_unchanged("openhands chart version", f"{old_version} (no value changes)")
+        result.add_unchanged("appVersion", f"{old_app_version} (no value changes)")
+        update_runtime_api_dependency(chart, new_runtime_api_version, result)
+        for name, version in (subchart_versions or {}).items():
+            update_dependency_version(chart, name, version, result)
         return result
 
-    old_app_version = chart_data.get("appVersion")
+    old_app_version = chart.get("appVersion")
     if old_app_version == new_app_version:
-        result.unchanged.append(("appVersion", old_app_version))
+        result.add_unchanged("appVersion", old_app_version)
     else:
-        chart_data["appVersion"] = new_app_version
-        result.changes.append(("appVersion", old_app_version, new_app_version))
+        chart.set("appVersion", new_app_version)
+        result.add_change("appVersion", old_app_version, new_app_version)
         result.has_changes = True
 
-    old_version = chart_data.get("version")
+    old_version = chart.get("version")
     new_version = bump_patch_version(old_version)
-    chart_data["version"] = new_version
-    result.changes.append(("version", old_version, new_version))
+    chart.set("version", new_version)
+    result.add_change("version", old_version, new_version)
     result.has_changes = True
 
-    update_runtime_api_dependency(chart_data, new_runtime_api_version, result)
+    update_runtime_api_dependency(chart, new_runtime_api_version, result)
+    for name, version in (subchart_versions or {}).items():
+        update_dependency_version(chart, name, version, result)
+    return result
+
+
+@traced("charts")
+def update_openhands_chart(
+    chart_path: Path,
+    new_app_version: str,
+    new_runtime_api_version: str | None,
+    has_changes: bool = True,
+    dry_run: bool = False,
+    subchart_versions: dict[str, str] | None = None,
+) -> UpdateResult:
+    """Update appVersion, bump patch version, and update sub-chart dependencies.
+
+    Only updates appVersion and bumps version if has_changes is True.
+    subchart_versions maps other dependency names (e.g., "automation") to the
+    versions to depend on. Only the edited scalars change in the file.
+    """
+    original = chart_path.read_text()
+    chart = YamlEditor(original)
+    result = apply_openhands_chart(chart, new_app_version, new_runtime_api_version, has_changes, subchart_versions)
 
     if not dry_run and result.has_changes:
-        yaml.dump(chart_data, chart_path)
+        commit_files({chart_path: chart.text()}, originals={chart_path: original})
 
     return result
 
 
+@traced("charts")
+def apply_openhands_values(
+    content: str,
+    openhands_version: str,
+    runtime_image_tag: str,
+    result: UpdateResult,
+) -> str:
+    """Apply the openhands values.yaml image tag updates to content and return it."""
+    pins = {CLOUD_TAG_SOURCE: openhands_version, "OPENHANDS_RUNTIME_IMAGE_TAG": runtime_image_tag}
+    return CHART_REWRITERS["openhands"].rewrite(content, pins, result)
+
+
+@traced("charts")
 def update_openhands_values(
     values_path: Path,
     openhands_version: str,
@@ -343,38 +945,18 @@ def update_openhands_values(
 
     Returns UpdateResult containing changes made.
     """
-    content = values_path.read_text()
     result = UpdateResult()
 
-    content = update_tag_in_content(
-        content,
-        ENTERPRISE_SERVER_TAG_PATTERN,
-        openhands_version,
-        "enterprise-server image tag",
-        result,
-    )
-    content = update_tag_in_content(
-        content,
-        RUNTIME_TAG_PATTERN,
-        runtime_image_tag,
-        "runtime image tag",
-        result,
-    )
-    content = update_tag_in_content(
-        content,
-        WARM_RUNTIMES_TAG_PATTERN,
-        runtime_image_tag,
-        "warmRuntimes image tag",
-        result,
-        replacement_suffix='"',
-    )
+    original = values_path.read_text()
+    content = apply_openhands_values(original, openhands_version, runtime_image_tag, result)
 
     if not dry_run and result.has_changes:
-        values_path.write_text(content)
+        commit_files({values_path: content}, originals={values_path: original})
 
     return result
 
 
+@traced("charts")
 def update_runtime_api_chart(
     chart_path: Path,
     has_changes: bool = True,
@@ -384,26 +966,57 @@ def update_runtime_api_chart(
 
     Only bumps the version if has_changes is True.
     """
-    yaml = create_yaml_parser()
-    chart_data = yaml.load(chart_path)
-    old_version = chart_data.get("version")
+    return update_chart_version(chart_path, "runtime-api", has_changes, dry_run)
+
+
+@traced("charts")
+def apply_chart_version(chart: YamlEditor, chart_name: str, has_changes: bool = True) -> tuple[str, UpdateResult]:
+    """Bump the patch version in a Chart.yaml editor if has_changes; return the new/current version."""
+    old_version = chart.get("version")
     result = UpdateResult()
 
     if not has_changes:
-        result.unchanged.append(("runtime-api chart version", f"{old_version} (no value changes)"))
+        result.add_unchanged(f"{chart_name} chart version", f"{old_version} (no value changes)")
         return old_version, result
 
     new_version = bump_patch_version(old_version)
-    chart_data["version"] = new_version
-    result.changes.append(("runtime-api chart version", old_version, new_version))
+    chart.set("version", new_version)
+    result.add_change(f"{chart_name} chart version", old_version, new_version)
     result.has_changes = True
+    return new_version, result
+
+
+@traced("charts")
+def update_chart_version(
+    chart_path: Path,
+    chart_name: str,
+    has_changes: bool = True,
+    dry_run: bool = False,
+) -> tuple[str, UpdateResult]:
+    """Bump the patch version of a chart whose values changed and return the new/current version."""
+    original = chart_path.read_text()
+    chart = YamlEditor(original)
+    version, result = apply_chart_version(chart, chart_name, has_changes)
 
     if not dry_run and result.has_changes:
-        yaml.dump(chart_data, chart_path)
+        commit_files({chart_path: chart.text()}, originals={chart_path: original})
 
-    return new_version, result
+    return version, result
+
+
+@traced("charts")
+def apply_runtime_api_values(
+    content: str,
+    runtime_api_sha: str,
+    runtime_image_tag: str,
+    result: UpdateResult,
+) -> str:
+    """Apply the runtime-api values.yaml image tag updates to content and return it."""
+    pins = {"RUNTIME_API_SHA": runtime_api_sha, "OPENHANDS_RUNTIME_IMAGE_TAG": runtime_image_tag}
+    return CHART_REWRITERS["runtime-api"].rewrite(content, pins, result)
 
 
+@traced("charts")
 def update_runtime_api_values(
     values_path: Path,
     runtime_api_sha: str,
@@ -420,27 +1033,13 @@ def update_runtime_api_values(
 
     Returns UpdateResult containing changes made.
     """
-    content = values_path.read_text()
     result = UpdateResult()
 
-    content = update_tag_in_content(
-        content,
-        RUNTIME_API_TAG_PATTERN,
-        format_sha_tag(runtime_api_sha),
-        "runtime-api image tag",
-        result,
-    )
-    content = update_tag_in_content(
-        content,
-        WARM_RUNTIMES_TAG_PATTERN,
-        runtime_image_tag,
-        "runtime-api warmRuntimes image tag",
-        result,
-        replacement_suffix='"',
-    )
+    original = values_path.read_text()
+    content = apply_runtime_api_values(original, runtime_api_sha, runtime_image_tag, result)
 
     if not dry_run and result.has_changes:
-        values_path.write_text(content)
+        commit_files({values_path: content}, originals={values_path: original})
 
     return result
 
@@ -452,6 +1051,14 @@ def print_section_header(title: str) -> None:
     print(SEPARATOR)
 
 
+def parse_pin_key(text: str) -> tuple[str, str]:
+    """Parse a --pin-key RULE_KEY=DEPLOY_KEY argument."""
+    rule_key, separator, deploy_key = text.partition("=")
+    if not separator or not rule_key or not deploy_key:
+        raise argparse.ArgumentTypeError(f"expected RULE_KEY=DEPLOY_KEY, got '{text}'")
+    return rule_key, deploy_key
+
+
 def parse_args() -> argparse.Namespace:
     """Parse command line arguments."""
     parser = argparse.ArgumentParser(
@@ -462,28 +1069,216 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="Show what would be updated without making changes.",
     )
+    parser.add_argument(
+        "--diff",
+        action="store_true",
+        help="Print a unified diff of every chart file change instead of writing the files.",
+    )
+    parser.add_argument(
+        "--patch-out",
+        type=Path,
+        default=None,
+        metavar="FILE",
+        help="Write a unified diff of every chart file change to FILE (applies with `git apply` "
+        "from the repository root) instead of writing the files.",
+    )
+    parser.add_argument(
+        "--report",
+        type=Path,
+        default=None,
+        metavar="FILE",
+        help="Append a JSON Lines record of every change, no-op, error and phase timing to FILE.",
+    )
+    parser.add_argument(
+        "--trace",
+        type=Path,
+        default=None,
+        metavar="FILE",
+        help="Write a Chrome trace-event JSON file of the run (GitHub requests, YAML parsing, tag rewrites, "
+        "file writes) to FILE, for chrome://tracing or ui.perfetto.dev.",
+    )
     parser.add_argument(
         "--cloud-tag",
         type=str,
         default=None,
         help="A cloud tag from OpenHands (e.g., cloud-1.19.0) to use instead of fetching the latest.",
     )
-    return parser.parse_args()
+    parser.add_argument(
+        "--backfill",
+        type=Path,
+        default=None,
+        metavar="PLAN",
+        help="Instead of updating, write a JSON plan of the chart state after every release "
+        "from the current appVersion up to --cloud-tag (or the latest) to PLAN.",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep running and update the charts once for every new cloud tag.",
+    )
+    parser.add_argument(
+        "--watch-interval",
+        type=float,
+        default=DEFAULT_WATCH_INTERVAL_SECONDS,
+        help=f"Seconds between tag list polls in --watch mode (default: {DEFAULT_WATCH_INTERVAL_SECONDS:.0f}).",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        metavar="N",
+        help="Rewrite the charts' values.yaml files on N worker processes (default: 1, in-process). "
+        "Worth it on multi-core machines with large charts, where parsing dominates.",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Do not read or write the on-disk GitHub response cache.",
+    )
+    parser.add_argument(
+        "--max-wait",
+        type=float,
+        default=DEFAULT_WAIT_BUDGET_SECONDS,
+        help="Maximum total seconds to spend waiting on GitHub retries and rate limits "
+        f"before failing (default: {DEFAULT_WAIT_BUDGET_SECONDS:.0f}).",
+    )
+    parser.add_argument(
+        "--api-url",
+        default=GITHUB_API_URL,
+        help=f"GitHub API root, e.g. a local stand-in server (default: {GITHUB_API_URL}).",
+    )
+    parser.add_argument(
+        "--release-index",
+        type=Path,
+        nargs="?",
+        const=DEFAULT_INDEX_PATH,
+        default=None,
+        metavar="PATH",
+        help="Resolve tags and deploy configs through a local SQLite release index, "
+        f"refreshed incrementally each run (default path: {DEFAULT_INDEX_PATH}).",
+    )
+    parser.add_argument(
+        "--git-clones",
+        type=Path,
+        default=None,
+        metavar="DIR",
+        help="Read tags and deploy.yaml from blobless clones under DIR (cloned on first use) "
+        "instead of the GitHub API. GITHUB_TOKEN is not needed.",
+    )
+    parser.add_argument(
+        "--pin-key",
+        type=parse_pin_key,
+        action="append",
+        default=[],
+        metavar="RULE_KEY=DEPLOY_KEY",
+        help="Read the image pin a sub-chart rule follows (e.g. AUTOMATION_SHA) from a differently named "
+        "deploy.yaml env key. Repeatable.",
+    )
+    parser.add_argument(
+        "--no-fetch",
+        action="store_true",
+        help="With --git-clones, use the existing clones without fetching new tags.",
+    )
+    args = parser.parse_args()
+    if args.backfill is not None:
+        ignored = [
+            flag
+            for flag, used in (
+                ("--watch", args.watch),
+                ("--diff", args.diff),
+                ("--patch-out", args.patch_out is not None),
+                ("--jobs", args.jobs != 1),
+                ("--report", args.report is not None),
+            )
+            if used
+        ]
+        if ignored:
+            parser.error(f"{', '.join(ignored)} cannot be used with --backfill, which only writes a plan")
+    if args.watch and args.patch_out is not None:
+        parser.error("--patch-out cannot be used with --watch: every new tag would overwrite the same patch")
+    return args
+
+
+def refresh_release_index(client: ReleaseSource, index: ReleaseIndex) -> TagChanges:
+    """Sync the release index with the full cloud tag listing; returns what changed.
+
+    New tags are added, tags that moved get their new commit and lose their
+    indexed deploy config, and tags deleted upstream are removed. Costs the
+    single matching-refs listing, which the response cache usually turns into
+    a 304, plus one request per annotated tag object not peeled before. If it
+    fails, the index is used as it is.
+    """
+    try:
+        peeled = index.peeled_tags()
+        tag_shas = list_cloud_tag_refs(client, OPENHANDS_REPO, peeled)
+        index.add_peeled_tags(peeled)
+        changes = index.sync_tags(tag_shas)
+    except RequestBudgetExceeded:
+        raise
+    except Exception as e:
+        print(f"Error refreshing release index, using indexed releases: {e}")
+        return TagChanges()
+    for summary, tags in (
+        ("added {} new", changes.added),
+        ("updated {} moved", changes.moved),
+        ("removed {} deleted", changes.removed),
+    ):
+        if tags:
+            print(f"Release index: {summary.format(len(tags))} cloud tag(s)")
+    return changes
+
+
+@traced("github")
+def fetch_release_deploy_config(
+    client: ReleaseSource,
+    cloud_tag: str,
+    env_cache: DeployEnvCache | None = None,
+    index: ReleaseIndex | None = None,
+) -> DeployConfig:
+    """Fetch the deploy config for a cloud tag, answering from the release index when it is known.
+
+    Configs fetched for indexed tags are stored back into the index.
+    """
+    release = index.get(cloud_tag) if index else None
+    # Rows indexed before image maps were stored have images=None and are refetched
+    if release and release.has_deploy_config and release.images is not None:
+        return DeployConfig(release.runtime_api_sha, release.openhands_runtime_image_tag, release.images)
+
+    deploy_config = fetch_deploy_config(client, DEPLOY_REPO, extract_version_from_cloud_tag(cloud_tag), env_cache)
+    if release:
+        index.set_deploy_config(
+            cloud_tag, deploy_config.runtime_api_sha, deploy_config.openhands_runtime_image_tag, deploy_config.images
+        )
+    return deploy_config
 
 
-def resolve_openhands_version(token: str, cloud_tag: str | None) -> str | None:
+@traced("github")
+def resolve_openhands_version(
+    client: ReleaseSource, cloud_tag: str | None, index: ReleaseIndex | None = None
+) -> str | None:
     """Resolve the OpenHands cloud version to use for updates.
 
+    With a release index, the index is refreshed first and then answers both
+    the existence check and the latest-tag lookup.
+
     Returns the cloud tag (e.g., 'cloud-1.19.0') or None if resolution fails.
     """
+    if index is not None:
+        refresh_release_index(client, index)
+
     if cloud_tag:
         print(f"Using specified cloud tag: {cloud_tag}")
-        if not cloud_tag_exists(token, OPENHANDS_REPO, cloud_tag):
+        indexed = index is not None and index.get(cloud_tag) is not None
+        if not indexed and not cloud_tag_exists(client, OPENHANDS_REPO, cloud_tag):
             print(f"Error: Cloud tag '{cloud_tag}' does not exist in {OPENHANDS_REPO}")
             return None
         return cloud_tag
 
-    openhands_version = get_latest_cloud_tag(token, OPENHANDS_REPO)
+    if index is not None:
+        latest = index.latest()
+        openhands_version = latest.tag if latest else None
+    else:
+        openhands_version = get_latest_cloud_tag(client, OPENHANDS_REPO)
     if openhands_version:
         print(f"OpenHands cloud tag: {openhands_version}")
     else:
@@ -491,115 +1286,798 @@ def resolve_openhands_version(token: str, cloud_tag: str | None) -> str | None:
     return openhands_version
 
 
-def update_runtime_api_workflow(
-    deploy_config: DeployConfig,
-    dry_run: bool,
-) -> str:
-    """Update runtime-api chart and values. Returns the new chart version."""
-    print_section_header("Updating runtime-api chart...")
-
-    print("Updating runtime-api values.yaml...")
-    values_result = update_runtime_api_values(
-        RUNTIME_API_VALUES_PATH,
-        deploy_config.runtime_api_sha,
-        deploy_config.openhands_runtime_image_tag,
-        dry_run=dry_run,
-    )
-    values_result.print_summary()
+def chart_values_path(chart: str) -> Path:
+    """Return the values.yaml path of a chart under charts/."""
+    paths = {"openhands": VALUES_PATH, "runtime-api": RUNTIME_API_VALUES_PATH}
+    return paths.get(chart) or CHARTS_DIR / chart / "values.yaml"
+
+
+def release_pins(deploy_config: DeployConfig, openhands_version: str) -> dict[str, str]:
+    """Return every value an image tag rule can follow for one release."""
+    return {**deploy_config.pins, CLOUD_TAG_SOURCE: openhands_version}
+
+
+@traced("charts")
+def rewrite_chart_values(chart: str, content: str, pins: dict[str, str]) -> tuple[str, UpdateResult]:
+    """Rewrite the image tags in one chart's values.yaml content.
+
+    Takes and returns plain picklable values, so it can run in a worker process.
+    """
+    result = UpdateResult()
+    return CHART_REWRITERS[chart].rewrite(content, pins, result), result
+
+
+def rewrite_values(
+    contents: dict[str, str],
+    pins: dict[str, str],
+    jobs: int = 1,
+) -> dict[str, tuple[str, UpdateResult]]:
+    """Rewrite the values.yaml content of several charts, keyed by chart name.
+
+    The rewrites are independent of each other, so with jobs > 1 they run on
+    a pool of worker processes. Results keep the order of contents however
+    the workers finish.
+    """
+    charts = list(contents)
+    args = (charts, list(contents.values()), [pins] * len(charts))
+    if jobs > 1 and len(charts) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=min(jobs, len(charts))) as executor:
+            return dict(zip(charts, executor.map(rewrite_chart_values, *args)))
+    return dict(zip(charts, map(rewrite_chart_values, *args)))
+
+
+@traced("charts")
+def stage_values(
+    chart: str,
+    chart_files: ChartFiles,
+    pins: dict[str, str],
+    rewritten: dict[str, tuple[str, UpdateResult]] | None = None,
+) -> UpdateResult:
+    """Stage a chart's rewritten values.yaml in chart_files and return what changed.
+
+    Uses the content in rewritten when the chart was rewritten ahead of time
+    (see rewrite_values); otherwise rewrites it here.
+    """
+    path = chart_values_path(chart)
+    if rewritten is None or chart not in rewritten:
+        rewritten = rewrite_values({chart: chart_files.read(path)}, pins)
+    content, result = rewritten[chart]
+    chart_files.write(path, content)
+    return result
+
+
+def rewrite_release_values(
+    chart_files: ChartFiles,
+    pins: dict[str, str],
+    jobs: int = 1,
+) -> dict[str, tuple[str, UpdateResult]]:
+    """Rewrite the values.yaml of every chart a release updates, ahead of the Chart.yaml steps.
+
+    Sub-charts with missing pins or unreadable files are left out; their
+    workflows report them.
+    """
+    contents = {}
+    for chart, rewriter in CHART_REWRITERS.items():
+        sources = {rule.source for rule in rewriter.rules}
+        if not sources or (chart in SUBCHARTS and sources - pins.keys()):
+            continue
+        try:
+            contents[chart] = chart_files.read(chart_values_path(chart))
+        except OSError:
+            continue
+    return rewrite_values(contents, pins, jobs)
+
+
+def repo_path(path: Path) -> str:
+    """Return path relative to the repository root, as written in diffs and reports."""
+    root = CHARTS_DIR.parent
+    return path.relative_to(root).as_posix() if path.is_relative_to(root) else path.as_posix()
+
+
+def chart_yaml_path(chart: str) -> Path:
+    """Return the Chart.yaml path of a chart under charts/."""
+    paths = {"openhands": CHART_PATH, "runtime-api": RUNTIME_API_CHART_PATH}
+    return paths.get(chart) or CHARTS_DIR / chart / "Chart.yaml"
+
+
+@traced("charts")
+def load_chart_graph(chart_files: ChartFiles) -> ChartGraph:
+    """Build the dependency graph of every chart under charts/, reading Chart.yaml files through chart_files."""
+    charts = {path.parent.name for path in CHARTS_DIR.glob("*/Chart.yaml")} | {"openhands", "runtime-api"}
+    return build_chart_graph({chart: chart_files.read(chart_yaml_path(chart)) for chart in charts})
+
+
+def chart_needs_update(chart: str, graph: ChartGraph, versions: dict[str, str]) -> bool:
+    """Check whether a chart has image tags to follow or depends on a chart updated in this run."""
+    return bool(IMAGE_TAG_RULES.get(chart)) or any(dep in versions for dep in graph.dependencies.get(chart, ()))
+
+
+class ReleaseChanges:
+    """Collects the changes and errors of one planned release.
+
+    Takes the add_result/add_error/skip calls update_chart_workflow makes on
+    a RunReport, so a backfill records exactly what an update run reports.
+    """
+
+    def __init__(self):
+        self.changes: list[dict[str, str]] = []
+        self.errors: list[str] = []
+
+    def add_result(self, chart: str, file: str, result: UpdateResult) -> None:
+        self.changes += [{"chart": chart, "name": name, "old": old, "new": new} for name, old, new in result.changes]
+        self.errors += result.errors
+
+    def add_error(self, message: str, chart: str | None = None, file: str | None = None) -> None:
+        self.errors.append(message)
+
+    def skip(self, reason: str, chart: str | None = None) -> None:
+        pass
+
+
+@traced("charts")
+def update_chart_workflow(
+    chart: str,
+    chart_files: ChartFiles,
+    graph: ChartGraph,
+    pins: dict[str, str],
+    versions: dict[str, str],
+    rewritten: dict[str, tuple[str, UpdateResult]] | None = None,
+    report: RunReport | ReleaseChanges | None = None,
+) -> str | None:
+    """Update one chart's values and Chart.yaml in chart_files. Returns its new/current version.
+
+    versions holds the versions of the charts updated before this one. The
+    chart's dependencies on them are moved to those versions, and a moved
+    dependency bumps the chart version just as changed image tags do.
+    Returns None when the chart was skipped. Every outcome is also recorded
+    in report, if given.
+    """
+    sources = {rule.source for rule in IMAGE_TAG_RULES.get(chart, ())}
+    missing = sorted(sources - pins.keys())
+    if missing and chart in SUBCHARTS:
+        # Not an error: the sub-chart key names are not confirmed against the
+        # deploy workflow yet, and --pin-key maps them to the real names
+        print(f"{chart}: {', '.join(missing)} not pinned in deploy.yaml, skipping (see --pin-key)")
+        if report is not None:
+            report.skip(f"{', '.join(missing)} not pinned in deploy.yaml", chart=chart)
+        return None
 
     print()
-    print("Updating runtime-api Chart.yaml...")
-    chart_version, chart_result = update_runtime_api_chart(
-        RUNTIME_API_CHART_PATH,
-        has_changes=values_result.has_changes,
-        dry_run=dry_run,
-    )
+    print_section_header(f"Updating {chart} chart...")
+    try:
+        editor = chart_files.chart(chart_yaml_path(chart))
+        values_result = UpdateResult()
+        if sources:
+            print(f"Updating {chart} values.yaml...")
+            values_result = stage_values(chart, chart_files, pins, rewritten)
+    except OSError as e:
+        print(f"Error reading {chart} chart: {e}")
+        if report is not None:
+            report.add_error(f"Error reading {chart} chart: {e}", chart=chart)
+        return None
+    if sources:
+        values_result.print_summary()
+        print()
+        if report is not None:
+            report.add_result(chart, repo_path(chart_values_path(chart)), values_result)
+
+    print(f"Updating {chart} Chart.yaml...")
+    dependency_result = UpdateResult()
+    for dependency in graph.dependencies.get(chart, ()):
+        update_dependency_version(editor, dependency, versions.get(dependency), dependency_result)
+    has_changes = values_result.has_changes or dependency_result.has_changes
+    if chart == "openhands":
+        chart_result = apply_openhands_chart(editor, pins[CLOUD_TAG_SOURCE], None, has_changes=has_changes)
+        version = editor.get("version")
+    else:
+        version, chart_result = apply_chart_version(editor, chart, has_changes=has_changes)
     chart_result.print_summary()
+    dependency_result.print_summary()
+    if report is not None:
+        report.add_result(chart, repo_path(chart_yaml_path(chart)), chart_result)
+        report.add_result(chart, repo_path(chart_yaml_path(chart)), dependency_result)
+    return version
 
-    return chart_version
 
-
-def update_openhands_workflow(
+def update_charts_workflow(
     deploy_config: DeployConfig,
     openhands_version: str,
-    runtime_api_version: str,
+    chart_files: ChartFiles,
+    rewritten: dict[str, tuple[str, UpdateResult]] | None = None,
+    timer: PhaseTimer | None = None,
+    report: RunReport | ReleaseChanges | None = None,
+) -> dict[str, str]:
+    """Update every chart in dependency order. Returns the version of each chart updated.
+
+    Charts are visited in the topological order of their Chart.yaml
+    dependencies, so each chart sees the final versions of the charts it
+    depends on and version bumps propagate to every dependent in one pass.
+    """
+    graph = load_chart_graph(chart_files)
+    pins = release_pins(deploy_config, openhands_version)
+    versions: dict[str, str] = {}
+    for chart in graph.order:
+        if not chart_needs_update(chart, graph, versions):
+            continue
+        with timer.phase(f"update {chart} chart") if timer else nullcontext():
+            version = update_chart_workflow(chart, chart_files, graph, pins, versions, rewritten, report)
+        if version:
+            versions[chart] = version
+    return versions
+
+
+@traced("io")
+def write_chart_files(
+    chart_files: ChartFiles,
     dry_run: bool,
-) -> None:
-    """Update openhands chart and values."""
-    print_section_header("Updating openhands chart...")
-
-    print("Updating openhands values.yaml...")
-    values_result = update_openhands_values(
-        VALUES_PATH,
-        openhands_version,
-        deploy_config.openhands_runtime_image_tag,
-        dry_run=dry_run,
-    )
-    values_result.print_summary()
+    show_diff: bool = False,
+    patch_out: Path | None = None,
+) -> list[Path]:
+    """Write every chart file changed during the run, or list them on a dry run.
 
-    print()
-    print("Updating openhands Chart.yaml...")
-    chart_result = update_openhands_chart(
-        CHART_PATH,
-        openhands_version,
-        runtime_api_version,
-        has_changes=values_result.has_changes,
-        dry_run=dry_run,
-    )
-    chart_result.print_summary()
+    With show_diff or patch_out, nothing is written; a unified diff of the
+    changes is printed or saved to patch_out instead. Returns the changed files.
+    """
+    print_section_header("Writing chart files...")
+    dry_run = dry_run or show_diff or patch_out is not None
+    changed = list(chart_files.changed_files()) if dry_run else chart_files.flush()
+    verb = "Would write" if dry_run else "Wrote"
+    if not changed:
+        print("No chart files changed")
+    for path in changed:
+        print(f"{verb} {path}")
+
+    if show_diff or patch_out is not None:
+        patch = chart_files.diff(CHARTS_DIR.parent)
+        if patch_out is not None:
+            patch_out.write_text(patch)
+            print(f"Wrote patch for {len(changed)} files to {patch_out}")
+        if show_diff:
+            print()
+            print(patch, end="")
+    return changed
+
+
+async def discard_task(task: "asyncio.Task") -> None:
+    """Cancel a task if it is still running and drop its result or exception.
+
+    A task running in a worker thread only stops being awaited; the thread
+    finishes its current call in the background.
+    """
+    import asyncio
 
+    task.cancel()
+    with suppress(asyncio.CancelledError, Exception):
+        await task
+
+
+async def run_in_phase(timer: PhaseTimer, name: str, func: Callable[..., Any], *args: Any) -> Any:
+    """Run a blocking function in a worker thread, timed as the named phase."""
+    import asyncio
+
+    with timer.phase(name):
+        return await asyncio.to_thread(func, *args)
+
+
+async def run_update_pipeline(
+    client: ReleaseSource,
+    dry_run: bool,
+    cloud_tag: str | None,
+    timer: PhaseTimer,
+    env_cache: DeployEnvCache | None = None,
+    index: ReleaseIndex | None = None,
+    show_diff: bool = False,
+    patch_out: Path | None = None,
+    jobs: int = 1,
+    report: RunReport | None = None,
+    pin_keys: dict[str, str] | None = None,
+) -> None:
+    """Resolve versions and update the charts, overlapping independent steps.
+
+    Local chart files are parsed while GitHub is queried. With an explicit
+    cloud tag the tag existence check and the deploy config fetch also run in
+    parallel. Output is printed in the same order as a sequential run. Every
+    update step edits the same in-memory files, which are written together in
+    the last phase.
+
+    The values.yaml rewrites of all charts are independent and run first, on
+    `jobs` worker processes when jobs > 1. The charts are then updated in
+    the topological order of their dependencies (see chart_graph), so
+    openhands picks up the new runtime-api and sub-chart versions.
+    """
+    import asyncio
 
-def process_updates(token: str, dry_run: bool = False, cloud_tag: str | None = None) -> None:
     print_section_header("Fetching latest versions...")
 
-    openhands_version = resolve_openhands_version(token, cloud_tag)
-    if not openhands_version:
-        return
+    local_task = asyncio.create_task(run_in_phase(timer, "parse local charts", load_chart_files))
 
-    current_app_version = get_current_app_version(CHART_PATH)
-    if current_app_version:
-        print(f"OpenHands-Cloud openhands chart appVersion: {current_app_version}")
-        if current_app_version == openhands_version:
-            print()
-            print_section_header("Charts are already up to date - no changes needed")
-            return
+    deploy_task = None
+    version_number = extract_version_from_cloud_tag(cloud_tag) if cloud_tag else None
+    if version_number:
+        deploy_task = asyncio.create_task(run_in_phase(
+            timer, "fetch deploy config", fetch_release_deploy_config, client, cloud_tag, env_cache, index
+        ))
 
-    version_number = extract_version_from_cloud_tag(openhands_version)
-    if not version_number:
-        print(f"Could not extract version from cloud tag: {openhands_version}")
-        return
+    try:
+        openhands_version = await run_in_phase(
+            timer, "resolve cloud tag", resolve_openhands_version, client, cloud_tag, index
+        )
+        if not openhands_version:
+            if report is not None:
+                report.skip("no cloud tag found")
+            return
 
-    print(f"Using deploy tag: {version_number}")
+        chart_files = await local_task
+        current_app_version = chart_files.current_app_version
+        if current_app_version:
+            print(f"OpenHands-Cloud openhands chart appVersion: {current_app_version}")
+            if current_app_version == openhands_version:
+                print()
+                print_section_header("Charts are already up to date - no changes needed")
+                if report is not None:
+                    report.skip(f"charts already at {openhands_version}")
+                return
+
+        version_number = extract_version_from_cloud_tag(openhands_version)
+        if not version_number:
+            print(f"Could not extract version from cloud tag: {openhands_version}")
+            if report is not None:
+                report.add_error(f"Could not extract version from cloud tag: {openhands_version}")
+            return
 
-    deploy_config = get_deploy_config(token, DEPLOY_REPO, ref=version_number)
+        print(f"Using deploy tag: {version_number}")
+
+        if deploy_task is None:
+            deploy_task = asyncio.create_task(run_in_phase(
+                timer, "fetch deploy config", fetch_release_deploy_config, client, openhands_version, env_cache, index
+            ))
+        try:
+            deploy_config = await deploy_task
+        except RequestBudgetExceeded:
+            raise
+        except Exception as e:
+            print(f"Error fetching deploy config: {e}")
+            deploy_config = None
+    finally:
+        # A speculative fetch or chart parse is left behind on every early
+        # return; cancel it and retrieve its outcome so no error goes unreported
+        # as "Task exception was never retrieved"
+        for task in (local_task, deploy_task):
+            if task is not None:
+                await discard_task(task)
     if not deploy_config:
         print(f"Could not fetch deploy config from tag {version_number}")
+        if report is not None:
+            report.add_error(f"Could not fetch deploy config from tag {version_number}")
         return
+    if pin_keys:
+        deploy_config = deploy_config.with_pin_keys(pin_keys)
 
     print(f"Deploy config (from {version_number}):")
     print(f"  RUNTIME_API_SHA: {deploy_config.runtime_api_sha}")
     print(f"  OPENHANDS_RUNTIME_IMAGE_TAG: {deploy_config.openhands_runtime_image_tag}")
+    for key, value in deploy_config.images.items():
+        if key not in ("RUNTIME_API_SHA", "OPENHANDS_RUNTIME_IMAGE_TAG"):
+            print(f"  {key}: {value}")
 
-    print()
-    runtime_api_version = update_runtime_api_workflow(deploy_config, dry_run)
+    with timer.phase("rewrite values"):
+        rewritten = rewrite_release_values(chart_files, release_pins(deploy_config, openhands_version), jobs)
+
+    update_charts_workflow(deploy_config, openhands_version, chart_files, rewritten, timer, report)
 
     print()
-    update_openhands_workflow(deploy_config, openhands_version, runtime_api_version, dry_run)
+    with timer.phase("write chart files"):
+        changed = write_chart_files(chart_files, dry_run, show_diff, patch_out)
+    if report is not None:
+        report.add_files([repo_path(path) for path in changed])
+
+
+def process_updates(
+    client: ReleaseSource,
+    dry_run: bool = False,
+    cloud_tag: str | None = None,
+    env_cache: DeployEnvCache | None = None,
+    index: ReleaseIndex | None = None,
+    show_diff: bool = False,
+    patch_out: Path | None = None,
+    jobs: int = 1,
+    report: RunReport | None = None,
+    pin_keys: dict[str, str] | None = None,
+) -> None:
+    import asyncio
+
+    timer = PhaseTimer()
+    if report is not None:
+        report.start_run(cloud_tag, dry_run or show_diff or patch_out is not None)
+    failed = True
+    try:
+        asyncio.run(run_update_pipeline(
+            client, dry_run, cloud_tag, timer, env_cache, index, show_diff, patch_out, jobs, report, pin_keys
+        ))
+        failed = False
+    finally:
+        print()
+        print_section_header("Phase timings")
+        timer.print_summary()
+        if report is not None:
+            report.add_timings(timer.phases)
+            report.finish_run(failed=failed)
+
+
+def chart_state(chart_files: ChartFiles) -> dict[str, Any]:
+    """Return the openhands appVersion, every chart's version and its dependencies on the other charts."""
+    graph = load_chart_graph(chart_files)
+    charts = {chart: chart_files.chart(chart_yaml_path(chart)) for chart in graph.order}
+    return {
+        "appVersion": chart_files.current_app_version,
+        "chart_versions": {chart: editor.get("version") for chart, editor in charts.items()},
+        "dependencies": {
+            chart: {dep: charts[chart].get(f"dependencies[name={dep}].version") for dep in graph.dependencies[chart]}
+            for chart in graph.order
+            if graph.dependencies.get(chart)
+        },
+    }
+
+
+def plan_release(chart_files: ChartFiles, cloud_tag: str, deploy_config: DeployConfig) -> tuple[ChartFiles, dict]:
+    """Apply one release to an in-memory copy of chart_files with the normal update workflow.
+
+    Returns the updated copy, which the next release builds on, and a plan
+    entry listing every change. The workflow's console output is discarded.
+    """
+    release_files = chart_files.copy()
+    changes = ReleaseChanges()
+    if release_files.current_app_version != cloud_tag:
+        with redirect_stdout(io.StringIO()):
+            update_charts_workflow(deploy_config, cloud_tag, release_files, report=changes)
+    entry = {
+        "cloud_tag": cloud_tag,
+        "deploy_tag": extract_version_from_cloud_tag(cloud_tag),
+        "runtime_api_sha": deploy_config.runtime_api_sha,
+        "openhands_runtime_image_tag": deploy_config.openhands_runtime_image_tag,
+        "images": deploy_config.images,
+        "changes": changes.changes,
+        "errors": changes.errors,
+        **chart_state(release_files),
+    }
+    return release_files, entry
+
+
+def select_backfill_tags(tag_names: list[str], current_tag: str | None, target_tag: str) -> list[str]:
+    """Return cloud tags newer than current_tag up to and including target_tag, oldest first."""
+    low = parse_cloud_version(current_tag) if current_tag else None
+    high = parse_cloud_version(target_tag)
+    selected = []
+    for tag in sort_tags(tag_names, CLOUD_TAG_PREFIX, releases_only=True):
+        version = parse_cloud_version(tag)
+        if version <= high and (low is None or version > low):
+            selected.append(tag)
+    return selected
+
+
+async def fetch_deploy_configs(
+    client: ReleaseSource,
+    cloud_tags: list[str],
+    env_cache: DeployEnvCache | None = None,
+    index: ReleaseIndex | None = None,
+    concurrency: int = DEFAULT_POOL_SIZE,
+) -> dict[str, DeployConfig | Exception]:
+    """Fetch deploy configs for many cloud tags concurrently.
+
+    At most `concurrency` fetches run at once, matching the client's
+    connection pool. Failures are returned in place of the config.
+    """
+    import asyncio
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch(cloud_tag: str) -> DeployConfig | Exception:
+        async with semaphore:
+            try:
+                return await asyncio.to_thread(fetch_release_deploy_config, client, cloud_tag, env_cache, index)
+            except RequestBudgetExceeded:
+                raise
+            except Exception as e:
+                return e
+
+    results = await asyncio.gather(*(fetch(cloud_tag) for cloud_tag in cloud_tags))
+    return dict(zip(cloud_tags, results))
+
+
+def build_backfill_plan(
+    chart_files: ChartFiles,
+    cloud_tags: list[str],
+    deploy_configs: dict[str, DeployConfig | Exception],
+) -> dict:
+    """Walk the releases in order and record the chart state after each one.
+
+    Each release runs update_charts_workflow on an in-memory copy of the
+    previous release's files, so the plan follows the same rules, in the same
+    dependency order, as one update run per release. Releases whose deploy
+    config could not be fetched are listed with the error and leave the
+    chart state unchanged.
+    """
+    state = chart_state(chart_files)
+    plan = {
+        "from": state["appVersion"],
+        "to": cloud_tags[-1] if cloud_tags else state["appVersion"],
+        "start": state,
+        "releases": [],
+    }
+    for cloud_tag in cloud_tags:
+        deploy_config = deploy_configs[cloud_tag]
+        if isinstance(deploy_config, Exception):
+            plan["releases"].append({
+                "cloud_tag": cloud_tag,
+                "deploy_tag": extract_version_from_cloud_tag(cloud_tag),
+                "changes": [],
+                "errors": [f"Error fetching deploy config: {deploy_config}"],
+                **state,
+            })
+            continue
+        chart_files, entry = plan_release(chart_files, cloud_tag, deploy_config)
+        state = chart_state(chart_files)
+        plan["releases"].append(entry)
+    plan["end"] = state
+    return plan
+
+
+def run_backfill(
+    client: ReleaseSource,
+    plan_path: Path,
+    cloud_tag: str | None = None,
+    env_cache: DeployEnvCache | None = None,
+    index: ReleaseIndex | None = None,
+    pin_keys: dict[str, str] | None = None,
+) -> dict | None:
+    """Plan chart updates for every release between the current appVersion and the target.
+
+    Tags are listed once and deploy configs are fetched concurrently. The
+    plan is written to plan_path as JSON; no chart files are modified.
+    """
+    import asyncio
+
+    print_section_header("Planning backfill...")
+    chart_files = load_chart_files()
+    if index is not None:
+        refresh_release_index(client, index)
+        tag_names = sorted(index.tags())
+    else:
+        try:
+            tag_names = list_cloud_tags(client, OPENHANDS_REPO)
+        except RequestBudgetExceeded:
+            raise
+        except Exception as e:
+            print(f"Error fetching tags from {OPENHANDS_REPO}: {e}")
+            return None
+
+    target_tag = cloud_tag or select_latest_cloud_tag(tag_names)
+    if not target_tag or target_tag not in tag_names:
+        print(f"Error: Cloud tag '{target_tag}' does not exist in {OPENHANDS_REPO}")
+        return None
+
+    cloud_tags = select_backfill_tags(tag_names, chart_files.current_app_version, target_tag)
+    print(f"Releases from {chart_files.current_app_version} to {target_tag}: {len(cloud_tags)}")
+    deploy_configs = asyncio.run(fetch_deploy_configs(client, cloud_tags, env_cache, index))
+    if pin_keys:
+        deploy_configs = {
+            tag: config if isinstance(config, Exception) else config.with_pin_keys(pin_keys)
+            for tag, config in deploy_configs.items()
+        }
+    plan = build_backfill_plan(chart_files, cloud_tags, deploy_configs)
+
+    for entry in plan["releases"]:
+        status = "; ".join(entry["errors"]) or f"{len(entry['changes'])} changes"
+        versions = entry["chart_versions"]
+        print(f"  {entry['cloud_tag']}: openhands {versions.get('openhands')}, "
+              f"runtime-api {versions.get('runtime-api')} ({status})")
+    plan_path.write_text(json.dumps(plan, indent=2) + "\n")
+    print(f"Wrote backfill plan to {plan_path}")
+    return plan
+
+
+def poll_cloud_tags(client: ReleaseSource) -> list[str]:
+    """List cloud tags for one watch cycle.
+
+    With the GitHub client the listing is a conditional request, so an
+    unchanged tag list costs a 304 that does not count against the rate
+    limit. Local clones fetch new tags first.
+    """
+    if isinstance(client, LocalReleaseSource):
+        client.fetch()
+    else:
+        client.scheduler.reset_budget()
+    return list_cloud_tags(client, OPENHANDS_REPO)
+
+
+def watch_cloud_tags(
+    client: ReleaseSource,
+    on_new_tag: Callable[[str], None],
+    interval: float = DEFAULT_WATCH_INTERVAL_SECONDS,
+    sleep: Callable[[float], None] = time.sleep,
+    max_polls: int | None = None,
+) -> None:
+    """Poll the cloud tag list and call on_new_tag for each newly released tag.
 
+    Only tags newer than every tag seen so far trigger an update, in version
+    order, so a late tag for an older release never downgrades the charts.
+    Errors while polling are reported and retried on the next cycle; an
+    update that fails is reported and the watch moves on to the next tag.
+    """
+    known = set(poll_cloud_tags(client))
+    newest = parse_cloud_version(select_latest_cloud_tag(list(known)) or "")
+    print(f"Watching {OPENHANDS_REPO} for new cloud tags every {interval:.0f}s "
+          f"({len(known)} known, latest {select_latest_cloud_tag(list(known))})")
+
+    polls = 0
+    while max_polls is None or polls < max_polls:
+        sleep(interval)
+        polls += 1
+        try:
+            tags = poll_cloud_tags(client)
+        except Exception as e:
+            # Includes RequestBudgetExceeded: the next cycle starts a new budget
+            print(f"Error polling tags: {e}")
+            continue
+
+        added = [tag for tag in tags if tag not in known]
+        known.update(tags)
+        for tag in sorted(added, key=lambda tag: parse_cloud_version(tag) or Version(-1, -1, -1)):
+            version = parse_cloud_version(tag)
+            if version is None or (newest is not None and version <= newest):
+                print(f"Ignoring new tag {tag}: not newer than the latest release")
+                continue
+            newest = version
+            print()
+            print_section_header(f"New cloud tag: {tag}")
+            try:
+                on_new_tag(tag)
+            except Exception as e:
+                # Includes RequestBudgetExceeded: the next poll starts a new budget
+                print(f"Error updating to {tag}: {e}")
 
-def main(dry_run: bool = False, cloud_tag: str | None = None) -> None:
-    if dry_run:
+
+def run_with_source(
+    client: ReleaseSource,
+    dry_run: bool,
+    cloud_tag: str | None,
+    env_cache: DeployEnvCache,
+    index: ReleaseIndex | None,
+    backfill: Path | None,
+    watch_interval: float | None = None,
+    show_diff: bool = False,
+    patch_out: Path | None = None,
+    jobs: int = 1,
+    report: RunReport | None = None,
+    pin_keys: dict[str, str] | None = None,
+) -> None:
+    """Run a backfill plan, a watch loop or a normal update against a release source."""
+    if backfill is not None:
+        run_backfill(client, backfill, cloud_tag=cloud_tag, env_cache=env_cache, index=index, pin_keys=pin_keys)
+    elif watch_interval is not None:
+        try:
+            watch_cloud_tags(
+                client,
+                lambda tag: process_updates(
+                    client,
+                    dry_run=dry_run,
+                    cloud_tag=tag,
+                    env_cache=env_cache,
+                    index=index,
+                    show_diff=show_diff,
+                    patch_out=patch_out,
+                    jobs=jobs,
+                    report=report,
+                    pin_keys=pin_keys,
+                ),
+                interval=watch_interval,
+            )
+        except KeyboardInterrupt:
+            print("Stopped watching")
+    else:
+        process_updates(
+            client,
+            dry_run=dry_run,
+            cloud_tag=cloud_tag,
+            env_cache=env_cache,
+            index=index,
+            show_diff=show_diff,
+            patch_out=patch_out,
+            jobs=jobs,
+            report=report,
+            pin_keys=pin_keys,
+        )
+
+
+def main(
+    dry_run: bool = False,
+    cloud_tag: str | None = None,
+    use_cache: bool = True,
+    max_wait: float = DEFAULT_WAIT_BUDGET_SECONDS,
+    git_clones: Path | None = None,
+    fetch: bool = True,
+    api_url: str = GITHUB_API_URL,
+    release_index: Path | None = None,
+    backfill: Path | None = None,
+    watch_interval: float | None = None,
+    show_diff: bool = False,
+    patch_out: Path | None = None,
+    jobs: int = 1,
+    report_path: Path | None = None,
+    trace_path: Path | None = None,
+    pin_keys: dict[str, str] | None = None,
+) -> None:
+    if dry_run or show_diff or patch_out is not None:
         print_section_header("DRY RUN MODE - No changes will be made")
         print()
 
-    token = os.environ.get("GITHUB_TOKEN")
-    if not token:
-        print("Environment variable GITHUB_TOKEN is required. Try getting with: gh auth status --show-token")
-        return
+    env_cache = DeployEnvCache() if use_cache else DeployEnvCache(directory=None)
+    index = ReleaseIndex(release_index) if release_index is not None else None
+    report = RunReport(report_path, repo=REPO_ROOT.name) if report_path is not None else None
+    tracer = start_tracing() if trace_path is not None else None
+    try:
+        if git_clones is not None:
+            try:
+                with LocalReleaseSource.open(git_clones, [OPENHANDS_REPO, DEPLOY_REPO], fetch=fetch) as source:
+                    run_with_source(
+                        source, dry_run, cloud_tag, env_cache, index, backfill, watch_interval,
+                        show_diff, patch_out, jobs, report, pin_keys,
+                    )
+            except GitError as e:
+                print(f"Error: {e}")
+                raise SystemExit(1)
+            return
 
-    process_updates(token, dry_run=dry_run, cloud_tag=cloud_tag)
+        token = os.environ.get("GITHUB_TOKEN")
+        if not token:
+            print("Environment variable GITHUB_TOKEN is required. Try getting with: gh auth status --show-token")
+            return
+
+        cache = ResponseCache() if use_cache else None
+        scheduler = RequestScheduler(RetryPolicy(budget_seconds=max_wait))
+        with GitHubClient(token, base_url=api_url, cache=cache, scheduler=scheduler) as client:
+            try:
+                run_with_source(
+                    client, dry_run, cloud_tag, env_cache, index, backfill, watch_interval,
+                    show_diff, patch_out, jobs, report, pin_keys,
+                )
+            except RequestBudgetExceeded as e:
+                print(f"Error: {e}")
+                raise SystemExit(1)
+            finally:
+                print()
+                print_section_header("GitHub API usage")
+                client.stats.print_summary()
+    finally:
+        if index is not None:
+            index.close()
+        if report is not None:
+            report.close()
+        if tracer is not None:
+            stop_tracing()
+            tracer.write(trace_path)
+            print(f"Wrote trace to {trace_path}")
 
 
 if __name__ == "__main__":
     args = parse_args()
-    main(dry_run=args.dry_run, cloud_tag=args.cloud_tag)
+    main(
+        dry_run=args.dry_run,
+        cloud_tag=args.cloud_tag,
+        use_cache=not args.no_cache,
+        max_wait=args.max_wait,
+        git_clones=args.git_clones,
+        fetch=not args.no_fetch,
+        api_url=args.api_url,
+        release_index=args.release_index,
+        backfill=args.backfill,
+        watch_interval=args.watch_interval if args.watch else None,
+        show_diff=args.diff,
+        patch_out=args.patch_out,
+        jobs=args.jobs,
+        report_path=args.report,
+        trace_path=args.trace,
+        pin_keys=dict(args.pin_key),
+    )
@@ -0,0 +1,224 @@
+"""Locate scalars in YAML files by structural path.
+
+A path is a dotted list of mapping keys. List items are selected by
+position, by the value of one of their fields, or all at once with [*]:
+
+    image.tag
+    client.image.tag
+    runtime-api.warmRuntimes.configs[name=default].image
+    warmRuntimes.configs[0].image
+    dependencies[*].name
+
+A file is composed once into ruamel's node graph, which records where every
+scalar starts and ends, so a path resolves to the exact characters of its
+value. Callers replace those characters and leave the rest of the file,
+including comments, quoting and indentation, byte-for-byte unchanged.
+
+YamlEditor builds on this to edit scalars without a load/dump round trip.
+Composed documents are cached by content hash, so re-indexing content that
+was seen before (the same Chart.yaml in a later step or a later run of a
+watch loop) costs a dictionary lookup.
+"""
+
+import hashlib
+import re
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from trace_events import span
+
+if TYPE_CHECKING:
+    from ruamel.yaml.nodes import Node
+
+SEGMENT_PATTERN = re.compile(r"([^.\[\]]+)((?:\[[^\[\]]+\])*)")
+SELECTOR_PATTERN = re.compile(r"\[([^\[\]]+)\]")
+DOCUMENT_CACHE_SIZE = 32
+
+
+class YamlPathError(ValueError):
+    """Raised for a malformed path or a value that is not a one-line scalar."""
+
+
+@dataclass(frozen=True)
+class ScalarSpan:
+    """The characters of a scalar value, without any surrounding quotes."""
+
+    start: int
+    end: int
+    line: int  # 1-based
+    value: str
+
+
+Step = str | int | slice | tuple[str, str]
+
+
+def parse_path(path: str) -> list[Step]:
+    """Split a path into steps: mapping keys, list indexes, [*] slices and (field, value) selectors."""
+    steps: list[Step] = []
+    for segment in path.split("."):
+        match = SEGMENT_PATTERN.fullmatch(segment)
+        if not match:
+            raise YamlPathError(f"Invalid path segment '{segment}' in '{path}'")
+        steps.append(match.group(1))
+        for selector in SELECTOR_PATTERN.findall(match.group(2)):
+            if selector.isdigit():
+                steps.append(int(selector))
+            elif selector == "*":
+                steps.append(slice(None))
+            elif "=" in selector:
+                field, value = selector.split("=", 1)
+                steps.append((field, value))
+            else:
+                raise YamlPathError(f"Invalid selector '[{selector}]' in '{path}'")
+    return steps
+
+
+# Nodes are told apart by their id tag ("scalar", "sequence", "mapping")
+# rather than by class, so ruamel is only imported once a file is composed.
+
+
+def _mapping_value(node: "Node", key: str) -> "Node | None":
+    if node.id == "mapping":
+        for key_node, value_node in node.value:
+            if key_node.id == "scalar" and key_node.value == key:
+                return value_node
+    return None
+
+
+def _has_scalar(node: "Node", key: str, expected: str) -> bool:
+    """Check whether node is a mapping whose key holds the scalar expected."""
+    value = _mapping_value(node, key)
+    return value is not None and value.id == "scalar" and value.value == expected
+
+
+def _step(node: "Node", step: Step) -> list["Node"]:
+    """Return the nodes one step below node; selectors and [*] can match several items."""
+    if isinstance(step, str):
+        value = _mapping_value(node, step)
+        return [] if value is None else [value]
+    if node.id != "sequence":
+        return []
+    if isinstance(step, int):
+        return node.value[step:step + 1]
+    if isinstance(step, slice):
+        return node.value[step]
+    field, expected = step
+    return [item for item in node.value if _has_scalar(item, field, expected)]
+
+
+class YamlDocument:
+    """A YAML file composed once, answering any number of path lookups."""
+
+    def __init__(self, content: str):
+        from ruamel.yaml import YAML
+
+        self.content = content
+        self.root = YAML(typ="safe").compose(content)
+
+    def find(self, path: str, where: dict[str, str] | None = None) -> list[ScalarSpan]:
+        """Return the span of every scalar the path resolves to.
+
+        With `where`, only values whose parent mapping has all of the given
+        sibling key/value pairs are returned (e.g. {"repository": ...}).
+        Raises YamlPathError if the path resolves to something other than a
+        one-line scalar (a mapping, a block scalar, a multi-line string).
+        """
+        *parent_steps, last_step = parse_path(path)
+        nodes = [] if self.root is None else [self.root]
+        for step in parent_steps:
+            nodes = [child for node in nodes for child in _step(node, step)]
+        for key, expected in (where or {}).items():
+            nodes = [node for node in nodes if _has_scalar(node, key, expected)]
+        nodes = [child for node in nodes for child in _step(node, last_step)]
+        return [self._span(node, path) for node in nodes]
+
+    def _span(self, node: "Node", path: str) -> ScalarSpan:
+        start, end = node.start_mark, node.end_mark
+        if node.id != "scalar" or node.style in ("|", ">") or start.line != end.line:
+            raise YamlPathError(f"'{path}' is not a one-line scalar (line {start.line + 1})")
+        if start.index == end.index:
+            raise YamlPathError(f"'{path}' has no value (line {start.line + 1})")
+        if node.style in ('"', "'"):
+            return ScalarSpan(start.index + 1, end.index - 1, start.line + 1, self.content[start.index + 1:end.index - 1])
+        return ScalarSpan(start.index, end.index, start.line + 1, self.content[start.index:end.index])
+
+
+_documents: OrderedDict[str, YamlDocument] = OrderedDict()
+
+
+def index_document(content: str) -> YamlDocument:
+    """Return the composed document for content, reusing one cached by content hash."""
+    digest = hashlib.sha256(content.encode()).hexdigest()
+    document = _documents.get(digest)
+    if document is None:
+        with span("compose yaml", "yaml", bytes=len(content)):
+            document = _documents[digest] = YamlDocument(content)
+        if len(_documents) > DOCUMENT_CACHE_SIZE:
+            _documents.popitem(last=False)
+    else:
+        _documents.move_to_end(digest)
+    return document
+
+
+def clear_document_cache() -> None:
+    """Forget every cached document, so the next index_document() call composes again."""
+    _documents.clear()
+
+
+class YamlEditor:
+    """Reads and replaces one-line scalars by path, patching only their characters.
+
+    Edits are kept until text() is called, so any number of scalars can be
+    changed on one index. Values are written as given, inside any quotes
+    the original value had.
+    """
+
+    def __init__(self, content: str):
+        self._document = index_document(content)
+        self._edits: dict[int, tuple[int, str]] = {}  # {start: (end, new value)}
+
+    @property
+    def content(self) -> str:
+        """Return the content the editor was created with."""
+        return self._document.content
+
+    @property
+    def dirty(self) -> bool:
+        return bool(self._edits)
+
+    def _span(self, path: str) -> ScalarSpan | None:
+        spans = self._document.find(path)
+        if len(spans) > 1:
+            raise YamlPathError(f"'{path}' matches {len(spans)} values")
+        return spans[0] if spans else None
+
+    def get(self, path: str) -> str | None:
+        """Return the current value at path, or None if the path does not exist."""
+        span = self._span(path)
+        if span is None:
+            return None
+        if span.start in self._edits:
+            return self._edits[span.start][1]
+        return span.value
+
+    def set(self, path: str, value: str) -> None:
+        """Replace the value at path; raises YamlPathError if it does not exist."""
+        span = self._span(path)
+        if span is None:
+            raise YamlPathError(f"'{path}' not found")
+        if value == span.value:
+            self._edits.pop(span.start, None)
+        else:
+            self._edits[span.start] = (span.end, value)
+
+    def text(self) -> str:
+        """Return the content with every edit applied."""
+        content = self._document.content
+        pieces = []
+        position = 0
+        for start, (end, value) in sorted(self._edits.items()):
+            pieces += [content[position:start], value]
+            position = end
+        pieces.append(content[position:])
+        return "".join(pieces)